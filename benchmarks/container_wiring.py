@@ -0,0 +1,77 @@
+"""Startup time of a synthetic application as the number of components grows, with batched wiring against one wire call per provider.
+
+Each synthetic application declares N components whose providers import the previous component four times out of five, and bootstraps every tenth component.
+Every measure runs in a fresh interpreter, since declared components keep their providers.
+The per provider mode replaces the single batched wire call by one wire call for every provider, as done before wiring was batched.
+
+Run from the repository root: python -m benchmarks.container_wiring
+"""
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import importlib
+import subprocess
+
+SIZES = (50, 200, 800, 1600)
+MODES = ("per-provider", "batched")
+
+def generate(size: int, folder: str) -> str:
+    """Write the synthetic application module with size components, returning its module name."""
+    lines = ["from src.library.dependency.core import Component, component, provider, Module, module", ""]
+    for index in range(size):
+        imports = f", imports=[C{index - 1}]" if index % 5 else ""
+        lines += [
+            f"class I{index}: ...",
+            f"@component(I{index})",
+            f"class C{index}(Component): ...",
+            f"@provider(C{index}{imports})",
+            f"class P{index}(I{index}):",
+            "    def __init__(self, config): pass"]
+    declaration = ", ".join(f"C{index}" for index in range(size))
+    bootstrap = ", ".join(f"C{index}" for index in range(0, size, 10))
+    lines += [f"@module(declaration=[{declaration}], bootstrap=[{bootstrap}])", "class Main(Module): ..."]
+    name = f"synthetic_app_{size}"
+    with open(os.path.join(folder, f"{name}.py"), mode="w") as file:
+        file.write("\n".join(lines))
+    return name
+
+def measure(name: str, mode: str) -> None:
+    """Declare and start the synthetic application, printing the elapsed times."""
+    from src.library.dependency.core import loader
+    from src.library.dependency.core.container import Container
+
+    if mode == "per-provider":
+        batched = loader.wire_injectables
+        def wire_each(container, injectables) -> None: # type: ignore
+            for injectable in injectables:
+                batched(container, [injectable])
+        loader.wire_injectables = wire_each # type: ignore
+
+    start = time.perf_counter()
+    application = importlib.import_module(name)
+    declared = time.perf_counter()
+    asyncio.run(loader.resolve_dependency_async(Container.empty(), application.Main))
+    print(f"{declared - start:.3f} {time.perf_counter() - declared:.3f}")
+
+def main() -> None:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as folder:
+        environment = {**os.environ, "PYTHONPATH": os.pathsep.join([root, folder])}
+        for size in SIZES:
+            name = generate(size, folder)
+            results = []
+            for mode in MODES:
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.container_wiring", name, mode],
+                    cwd=root, env=environment, capture_output=True, text=True, check=True).stdout
+                declare, resolve = output.split()[-2:]
+                results.append(f"{mode} {float(resolve):.3f} s")
+            print(f"N={size}: declare {float(declare):.3f} s, resolve and initialize: {', '.join(results)}")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        measure(*sys.argv[1:])
+    else:
+        main()
@@ -0,0 +1,66 @@
+"""Resolution time of DependencyResolver on a synthetic dependency graph, cold and memoized.
+
+Every project depends on the next one and on a few random later projects, some of them pinned to a version.
+The install order is checked to put every dependency before its dependents.
+
+Run from the repository root: python -m benchmarks.dependency_graph
+"""
+import os
+import time
+import random
+import asyncio
+from typing import Optional
+os.environ.setdefault("PTERODACTYL_API_URL", "http://127.0.0.1/")
+
+from src.service.dependencies import DependencyResolver
+
+SIZES = (5000, 20000)
+DEGREE = 4
+PINNED = 0.3
+ROOTS = 20
+
+class SyntheticModrinth:
+    """Stand-in for the version lookups of ModrinthAPI, answering from a generated graph"""
+    def __init__(self, size: int, seed: int = 1) -> None:
+        generator = random.Random(seed)
+        self.calls = {"versions": 0, "latest_version": 0}
+        self.by_id: dict[str, dict] = {}
+        for index in range(size):
+            later = range(index + 1, size)
+            targets = {index + 1} | set(generator.sample(later, min(DEGREE, len(later)))) if later else set()
+            dependencies = [{
+                "project_id": f"p{target}",
+                "version_id": f"v{target}" if generator.random() < PINNED else None,
+                "dependency_type": "required"} for target in sorted(targets)]
+            self.by_id[f"v{index}"] = {"id": f"v{index}", "project_id": f"p{index}", "dependencies": dependencies}
+
+    async def versions(self, ids: list[str]) -> list[dict]:
+        self.calls["versions"] += 1
+        return [self.by_id[id] for id in ids if id in self.by_id]
+
+    async def latest_version(self, slug: str, loaders: list[str] = [], game_versions: list[str] = []) -> Optional[dict]:
+        self.calls["latest_version"] += 1
+        return self.by_id.get(f"v{slug[1:]}")
+
+async def run(size: int) -> None:
+    modrinth = SyntheticModrinth(size)
+    resolver = DependencyResolver(modrinth, concurrency=64) # type: ignore
+    roots = [f"p{index}" for index in range(ROOTS)]
+
+    start = time.perf_counter()
+    graph = await resolver.resolve(roots, loaders=["fabric"])
+    cold = time.perf_counter() - start
+    calls = dict(modrinth.calls)
+
+    start = time.perf_counter()
+    await resolver.resolve(roots, loaders=["fabric"])
+    memoized = time.perf_counter() - start
+
+    position = {project_id: index for index, project_id in enumerate(graph.order)}
+    assert all(position[dependency] < position[project_id] for project_id, dependencies in graph.edges.items() for dependency in dependencies)
+    edges = sum(len(dependencies) for dependencies in graph.edges.values())
+    print(f"{len(graph.nodes)} nodes, {edges} edges: cold {cold * 1000:.0f} ms {calls}, memoized {memoized * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    for size in SIZES:
+        asyncio.run(run(size))
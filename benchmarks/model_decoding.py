@@ -0,0 +1,61 @@
+"""Memory and throughput of the Modrinth version models against plain decoded dicts, on a 10k-version payload.
+
+The payload repeats ten times the 1000 recorded versions of data/modrinth_versions.json.gz, to keep the recording small.
+Each case decodes the raw body, then reads the sha1 of the primary file and the loaders of every version, as a scan does.
+Retained memory is what the decoded versions keep alive, peak memory includes the decoding itself.
+Lazy views keep the decoded objects, without the keys the model drops like the changelog, next to the fields converted so far:
+they save the conversion of the fields a scan does not read, not memory. Full models are the compact option.
+
+Run from the repository root: python -m benchmarks.model_decoding
+"""
+import os
+import gc
+import gzip
+import json
+import time
+import tracemalloc
+from typing import Any, Callable
+from src.library.utils import json_loads
+from src.model.modrinth import Version
+
+PAYLOAD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "modrinth_versions.json.gz")
+REPEAT = 10
+RUNS = 3
+
+def touch(versions: list[Any]) -> int:
+    if isinstance(versions[0], dict):
+        return sum(
+            len(next(file for file in version["files"] if file["primary"])["hashes"]["sha1"]) + len(version["loaders"])
+            for version in versions)
+    return sum(len(version.primary_file.sha1) + len(version.loaders) for version in versions)
+
+def main() -> None:
+    with gzip.open(PAYLOAD) as file:
+        recorded = json.load(file)
+    body = json.dumps(recorded * REPEAT).encode()
+    print(f"payload: {len(recorded) * REPEAT} versions, {len(body) / 1e6:.1f} MB")
+
+    cases: dict[str, Callable[[], list[Any]]] = {
+        "json dicts": lambda: json.loads(body),
+        "json_loads dicts": lambda: json_loads(body),
+        "models": lambda: Version.loads(body),
+        "lazy models": lambda: Version.loads(body, lazy=True),
+    }
+    for name, decode in cases.items():
+        gc.collect()
+        tracemalloc.start()
+        versions = decode()
+        touch(versions)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del versions
+        gc.collect()
+
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            touch(decode())
+        elapsed = (time.perf_counter() - start) / RUNS
+        print(f"{name:17s} retained {retained / 1e6:5.1f} MB, peak {peak / 1e6:5.1f} MB, decode and read {elapsed * 1000:4.0f} ms ({len(recorded) * REPEAT / elapsed:6.0f} versions/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Layering time of resolve_dependency_layers on thousands of synthetic providers, against the previous pass based layering.
+
+Every synthetic provider imports a few components provided by earlier providers, and providers are shuffled.
+The layers of both implementations are compared for the sizes the previous one can handle.
+
+Run from the repository root: python -m benchmarks.provider_layers
+"""
+import time
+import random
+from typing import Callable
+from src.library.dependency.core.declaration.component import ABCComponent
+from src.library.dependency.core.declaration.provider import Provider
+from src.library.dependency.core.resolver import resolve_dependency_layers
+
+SIZES = (200, 1000, 3000, 10000)
+REFERENCE_MAX_SIZE = 1000
+IMPORTS = 3
+
+def pass_layers(unresolved_providers: list[Provider]) -> list[list[Provider]]:
+    """Previous layering: every pass rescans the unresolved providers, checking their imports against every resolved provider."""
+    resolved_layers: list[list[Provider]] = []
+    while unresolved_providers:
+        new_layer = [
+            provider
+            for provider in unresolved_providers
+            if all(
+                any(issubclass(resolved.provided_cls, dep.base_cls) for layer in resolved_layers for resolved in layer)
+                for dep in provider.imports)
+        ]
+        if not new_layer:
+            raise ValueError(f"{len(unresolved_providers)} providers cannot be resolved")
+        resolved_layers.append(new_layer)
+        unresolved_providers = [provider for provider in unresolved_providers if provider not in new_layer]
+    return resolved_layers
+
+def synthetic_providers(size: int, seed: int = 0) -> list[Provider]:
+    generator = random.Random(seed)
+    interfaces = [type(f"I{index}", (), {}) for index in range(size)]
+    components = [ABCComponent(interface) for interface in interfaces]
+    providers = [
+        Provider(
+            [components[dep] for dep in generator.sample(range(index), min(IMPORTS, index))], # type: ignore
+            [],
+            type(f"P{index}", (interfaces[index],), {}),
+            None) # type: ignore
+        for index in range(size)]
+    generator.shuffle(providers)
+    return providers
+
+def measure(fun: Callable[[list[Provider]], list[list[Provider]]], providers: list[Provider]) -> tuple[list[list[Provider]], float]:
+    start = time.perf_counter()
+    layers = fun(list(providers))
+    return layers, time.perf_counter() - start
+
+if __name__ == "__main__":
+    for size in SIZES:
+        providers = synthetic_providers(size)
+        layers, elapsed = measure(resolve_dependency_layers, providers)
+        line = f"{size} providers, {len(layers)} layers: {elapsed * 1000:.1f} ms"
+        if size <= REFERENCE_MAX_SIZE:
+            reference, reference_elapsed = measure(pass_layers, providers)
+            assert layers == reference, "layers differ from the previous implementation"
+            line += f" (previous {reference_elapsed * 1000:.0f} ms, same layers)"
+        print(line)
@@ -0,0 +1,48 @@
+"""Requests per second of a session per request against the pooled HttpAPI session, on a local stand-in server.
+
+Run from the repository root: python -m benchmarks.session_pool
+"""
+import time
+import asyncio
+from aiohttp import web, ClientSession
+from src.library.api import HttpAPI, METHOD
+
+HOST = "127.0.0.1"
+PORT = 8765
+REQUESTS = 2000
+
+async def item(request: web.Request) -> web.Response:
+    return web.json_response({"ok": True})
+
+async def main() -> None:
+    app = web.Application()
+    app.router.add_get("/item", item)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+    base_url = f"http://{HOST}:{PORT}/"
+
+    try:
+        # Before: a new session, connector and connection for every request
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            async with ClientSession(base_url) as session:
+                async with session.get("item") as response:
+                    await response.json()
+        before = REQUESTS / (time.perf_counter() - start)
+
+        # After: one long-lived session with keep-alive connections
+        async with HttpAPI(base_url) as api:
+            start = time.perf_counter()
+            for _ in range(REQUESTS):
+                handler = await api._request(METHOD.GET, "item")
+                handler.json()
+            after = REQUESTS / (time.perf_counter() - start)
+    finally:
+        await runner.cleanup()
+
+    print(f"session per request: {before:.0f} req/s")
+    print(f"pooled HttpAPI:      {after:.0f} req/s ({after / before:.1f}x)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,15 @@
-
 if __name__ == "__main__":
+    import sys
+    import argparse
+    from src.library.profiler import StartupProfiler
+    profiler = StartupProfiler().start()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--startup-benchmark", action="store_true", help="Start once and exit with status 1 if startup goes over STARTUP_BUDGET")
+    args = parser.parse_args()
+
     from src.app import MainApplication
-    main_application = MainApplication()
-    main_application.loop()
\ No newline at end of file
+    main_application = MainApplication(profiler=profiler)
+    if args.startup_benchmark:
+        sys.exit(main_application.benchmark())
+    main_application.loop()
@@ -1,24 +1,97 @@
 import time
+import asyncio
 import logging
+from typing import TYPE_CHECKING, Optional
 from src.library.dependency.core.container import Container
-from src.library.dependency.core.loader import resolve_dependency
-from src.library.utils import load_env
+from src.library.dependency.core.loader import resolve_dependency_async
+from src.library.profiler import StartupBudgetExceeded, StartupProfiler, span
+from src.library.utils import load_env, getenv, strToBool
 from src.app.module import MainModule
+if TYPE_CHECKING:
+    from src.service.scan import ScanEngine
 
 logger = logging.getLogger("MainApplication")
 
 class MainApplication():
-    init_time = time.time()
     load_env(".env.yaml")
-    
-    def __init__(self) -> None:
+    scan_interval = int(getenv("SCAN_INTERVAL", "3600"))
+    cache_path = getenv("CACHE_PATH", ".cache/responses.sqlite")
+    startup_deadline = float(getenv("STARTUP_DEADLINE", "60"))
+    lazy_startup = strToBool(getenv("LAZY_STARTUP", "false"))
+    startup_profile = getenv("STARTUP_PROFILE", fail_on_none=False)
+    startup_budget = float(getenv("STARTUP_BUDGET", "0"))
+
+    def __init__(self, profiler: Optional[StartupProfiler] = None) -> None:
         super().__init__()
+        self.container = Container.empty()
+        self.profiler = profiler
+
+    async def start(self) -> None:
+        """Resolve and initialize the application dependencies on the running event loop."""
+        start = time.perf_counter()
+        with span("dependencies", "app"):
+            await resolve_dependency_async(self.container, appmodule=MainModule, deadline=self.startup_deadline, lazy=self.lazy_startup)
+        if self.profiler is None:
+            logger.info(f"Application started in {time.perf_counter() - start:.3f} seconds")
+            return
+        self.report(self.profiler)
+
+    def report(self, profiler: StartupProfiler) -> None:
+        """Log the startup time since the profiler started and the slowest imports, write the profile to STARTUP_PROFILE and check STARTUP_BUDGET."""
+        elapsed = profiler.stop()
+        imports = [item for item in profiler.spans if item.category == "import" and item.parent is None]
+        logger.info(f"Application started in {elapsed:.3f} seconds, {sum(item.duration for item in imports):.3f} seconds importing")
+        for item in sorted(imports, key=lambda item: item.duration, reverse=True)[:5]:
+            logger.info(f"Import {item.name} took {item.duration:.3f} seconds")
+        if self.startup_profile:
+            profiler.write(self.startup_profile)
+        if self.startup_budget > 0 and elapsed > self.startup_budget:
+            logger.warning(str(StartupBudgetExceeded(elapsed, self.startup_budget)))
+
+    def benchmark(self) -> int:
+        """Start the application once and check the startup time against STARTUP_BUDGET.
 
-        container = Container.empty()
-        resolve_dependency(container, appmodule=MainModule)
-        logger.info(f"Application started in {time.time() - self.init_time} seconds")
+        Returns:
+            int: Exit status, 1 if the startup went over its budget.
+        """
+        asyncio.run(self.start())
+        if self.profiler is None or self.startup_budget <= 0:
+            return 0
+        try:
+            self.profiler.check(self.startup_budget)
+        except StartupBudgetExceeded:
+            return 1
+        return 0
 
     def loop(self) -> None:
         logger.info("Starting loop for Main Application")
-        while True:
-            time.sleep(1)
\ No newline at end of file
+        asyncio.run(self.run())
+
+    async def run(self) -> None:
+        """Run update scans every scan_interval seconds on a single event loop."""
+        from src.library.api import ConnectionPool
+        from src.library.api.cache import SQLiteCache
+        from src.library.api.client.modrinth import ModrinthAPI
+        from src.library.api.client.pterodactyl import PterodactylAPI
+        from src.service.scan import ScanEngine
+
+        await self.start()
+        async with ConnectionPool() as pool:
+            async with PterodactylAPI(pool=pool) as pterodactyl, ModrinthAPI(pool=pool, cache=SQLiteCache(self.cache_path)) as modrinth:
+                engine = ScanEngine(pterodactyl, modrinth)
+                while True:
+                    await self.scan(engine)
+                    await asyncio.sleep(self.scan_interval)
+
+    async def scan(self, engine: "ScanEngine") -> None:
+        start = time.perf_counter()
+        async for result in engine.scan():
+            if result.error is not None:
+                continue
+            for path, version in result.updates.items():
+                logger.info(f"Server {result.name}: update available for {path} -> {version['version_number']}")
+        logger.info(f"Scan finished in {time.perf_counter() - start:.2f} seconds")
+        for host, metrics in engine.modrinth.rate_limiter.metrics().items():
+            logger.info(f"Rate limiter {host}: {metrics['requests']} requests, {metrics['throttled_seconds']:.2f} seconds throttled")
+        if engine.modrinth.cache is not None:
+            logger.info(f"Response cache: {engine.modrinth.cache.metrics()}")
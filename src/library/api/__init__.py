@@ -1,14 +1,31 @@
+import copy
 from enum import Enum
-from typing import Any, Callable, Optional
-from aiohttp import hdrs, ClientSession, ClientTimeout
-from src.library.api.handler import REQUEST, RESPONSE, DEFAULT_REQUEST, DEFAULT_RESPONSE
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar
+from yarl import URL
+from aiohttp import hdrs, ClientSession, ClientTimeout, ClientResponseError
+from src.library.api.cache import CacheEntry, ResponseCache
+from src.library.api.connector import ConnectionPool
+from src.library.api.singleflight import SingleFlight
+from src.library.api.retry import RetryPolicy, DEFAULT_RETRY_POLICY
+from src.library.api.breaker import CircuitBreaker, CircuitOpenError, DEFAULT_CIRCUIT_BREAKER
+from src.library.api.pagination import Paginator, PagePaginator, OffsetPaginator, paginate, PAGE_READ_AHEAD
+from src.library.api.ratelimit import RateLimiter, DEFAULT_RATE_LIMITER, RATE_LIMIT_RETRIES, STATUS_TOO_MANY_REQUESTS
+from src.library.api.handler import REQUEST, RESPONSE, DEFAULT_REQUEST, DEFAULT_RESPONSE, ResponseHandler, CacheableResponse, JsonResponse, JsonStreamResponse
 from src.library.api.session import AuthorizedSession, NO_AUTHORIZE
-from src.library.api.utils import FakeResponse, handle_errors, validate_results
+from src.library.api.utils import FakeResponse, handle_errors, handle_stream_errors, validate_results
 from src.library.utils import getenv
 
 __all__ = [
     "METHOD",
-    "HttpAPI"
+    "HttpAPI",
+    "ConnectionPool",
+    "RateLimiter",
+    "RetryPolicy",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "Paginator",
+    "PagePaginator",
+    "OffsetPaginator"
 ]
 
 REQUEST_TIMEOUT = int(getenv("REQUEST_TIMEOUT", "30"))
@@ -17,12 +34,17 @@ DEFAULT_TIMEOUT = ClientTimeout(total=REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
 
 class METHOD(Enum):
     GET = hdrs.METH_GET
+    HEAD = hdrs.METH_HEAD
     PATCH = hdrs.METH_PATCH
     POST = hdrs.METH_POST
     PUT = hdrs.METH_PUT
     DELETE = hdrs.METH_DELETE
 
+HTTP_API = TypeVar('HTTP_API', bound="HttpAPI")
+
 POST_METHOD = {METHOD.PATCH, METHOD.POST, METHOD.PUT}
+STATUS_NOT_MODIFIED = 304
+DEFAULT_STREAM_RESPONSE = JsonStreamResponse()
 def KWARGS_DEFAULT() -> dict[str, Any]: return {}
 
 class HttpAPI:
@@ -33,6 +55,12 @@ class HttpAPI:
         proxy (Optional[str], optional): Proxy URL for the API. Defaults to None.
         timeout (Optional[ClientTimeout], optional): Timeout settings for the API. Defaults to DEFAULT_TIMEOUT.
         session_auth (AuthorizedSession, optional): Authorization session for the API. Defaults to NO_AUTHORIZE.
+        pool (Optional[ConnectionPool], optional): Connection pool shared with other clients. Defaults to None (the client owns a private pool).
+        rate_limiter (RateLimiter, optional): Per host rate limiter. Defaults to DEFAULT_RATE_LIMITER (shared by every client).
+        cache (Optional[ResponseCache], optional): Cache for GET responses of CacheableResponse handlers, closed with the client. Defaults to None (no cache).
+        single_flight (bool, optional): Share one HTTP call between concurrent identical GET requests. Defaults to True.
+        retry_policy (RetryPolicy, optional): Retry policy for failed requests. Defaults to DEFAULT_RETRY_POLICY (shared by every client).
+        circuit_breaker (CircuitBreaker, optional): Per host circuit breaker. Defaults to DEFAULT_CIRCUIT_BREAKER (shared by every client).
     """
     def __init__(self,
             base_url: Optional[str],
@@ -41,6 +69,12 @@ class HttpAPI:
             session_auth: AuthorizedSession = NO_AUTHORIZE,
             session_kwargs_fun: Callable[[], dict[str, Any]] = KWARGS_DEFAULT,
             raise_for_status: bool = True,
+            pool: Optional[ConnectionPool] = None,
+            rate_limiter: RateLimiter = DEFAULT_RATE_LIMITER,
+            cache: Optional[ResponseCache] = None,
+            single_flight: bool = True,
+            retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+            circuit_breaker: CircuitBreaker = DEFAULT_CIRCUIT_BREAKER,
             **kwargs) -> None:
         self.base_url = base_url
         self.proxy = proxy
@@ -49,6 +83,68 @@ class HttpAPI:
         self.session_kwargs = kwargs
         self.session_kwargs_fun = session_kwargs_fun
         self.raise_for_status = raise_for_status
+
+        self.pool = pool or ConnectionPool()
+        self._pool_owner = pool is None
+        self._session: Optional[ClientSession] = None
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.single_flight: Optional[SingleFlight] = SingleFlight() if single_flight else None
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+
+    def url(self, path: str) -> URL:
+        """Resolve a request path against the base URL.
+
+        Args:
+            path (str): Path, or absolute URL, for the request.
+
+        Returns:
+            URL: Absolute URL for the request.
+        """
+        url = URL(path)
+        if self.base_url is None or url.absolute:
+            return url
+        return URL(self.base_url).join(url)
+
+    def session(self) -> ClientSession:
+        """Return the long-lived session for this client, creating it on first use.
+
+        Returns:
+            ClientSession: Session bound to the connector of the client pool.
+        """
+        connector = self.pool.connector()
+        if self._session is None or self._session.closed or self._session.connector is not connector:
+            if self._session is not None and not self._session.closed:
+                # The session does not own the connector, so closing it only needs to drop it
+                self._session.detach()
+            session_kwargs: dict = self.session_kwargs_fun()
+            session_kwargs.update(self.session_kwargs)
+            self._session = ClientSession(
+                self.base_url,
+                proxy=self.proxy,
+                timeout=self.timeout,
+                raise_for_status=self.raise_for_status,
+                connector=connector,
+                connector_owner=False,
+                **session_kwargs)
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the client session and the response cache, and the pool if it is owned by this client."""
+        session, self._session = self._session, None
+        if session is not None and not session.closed and not self.pool.closed:
+            await session.close()
+        if self.cache is not None:
+            self.cache.close()
+        if self._pool_owner:
+            await self.pool.aclose()
+
+    async def __aenter__(self: "HTTP_API") -> "HTTP_API":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
     
     async def _authorization(self,
             session_auth: Optional[AuthorizedSession] = None
@@ -62,11 +158,8 @@ class HttpAPI:
             dict: Authorization headers for the session.
         """
 
-        session_kwargs: dict = self.session_kwargs_fun()
-        session_kwargs.update(self.session_kwargs)
-        async with ClientSession(self.base_url, proxy=self.proxy, timeout=self.timeout, raise_for_status=True, **session_kwargs) as session:
-            session_auth = session_auth or self.session_auth
-            return await session_auth.headers(session)
+        session_auth = session_auth or self.session_auth
+        return await session_auth.headers(self.session(), {})
     
     @handle_errors
     async def _request(self,
@@ -79,6 +172,8 @@ class HttpAPI:
             session_auth: Optional[AuthorizedSession] = None,
             request: REQUEST = DEFAULT_REQUEST, # type: ignore
             response: RESPONSE = DEFAULT_RESPONSE, # type: ignore
+            retry: Optional[bool] = None,
+            circuit: Optional[str] = None,
             **kwargs) -> RESPONSE:
         """Send a request to the API.
 
@@ -90,27 +185,211 @@ class HttpAPI:
             session_auth (Optional[AuthorizedSession], optional): Authorization session for the API. Defaults to None (use default session).
             request (REQUEST, optional): Define which type of parameters will be used in the request. Defaults to JsonRequest.
             response (RESPONSE, optional): Define which type of response you expect from the request. Defaults to JsonResponse.
+            retry (Optional[bool], optional): True if the request is safe to retry, False to never retry it. Defaults to None (retry idempotent methods).
+            circuit (Optional[str], optional): Circuit breaker key of the request. Defaults to None (the host of the request).
+
+        Raises:
+            CircuitOpenError: If the circuit of the request is open.
 
         Returns:
             RESPONSE: Response handler for the request. Same type as the response parameter.
         """
-        session_kwargs: dict = self.session_kwargs_fun()
-        session_kwargs.update(self.session_kwargs)
-        async with ClientSession(self.base_url, proxy=self.proxy, timeout=self.timeout, raise_for_status=self.raise_for_status, **session_kwargs) as session:
+        # Handlers are shared declarations, each call works on its own copy
+        request = copy.copy(request)
+        response = copy.copy(response)
+        session_auth = session_auth or self.session_auth
+
+        url = self.url(path)
+        host = url.host or ""
+
+        # Fresh cache hits are served without a request, so they never go through the circuit breaker
+        cache_key = None
+        cache_entry = None
+        if self.cache is not None and method is METHOD.GET and isinstance(response, CacheableResponse):
+            cache_key = self.cache.key(method.value, str(url), query, session_auth.identity())
+            cache_entry = self.cache.get(cache_key)
+            if cache_entry is not None and cache_entry.fresh():
+                await response.load(cache_entry.body)
+                return response
+
+        def send() -> Awaitable[RESPONSE]:
+            return self.retry_policy.call(host, method.value, lambda: self.circuit_breaker.call(circuit or host, lambda: self._send(
+                method, path, query, json, body, headers, session_auth, request, response, kwargs, cache_key, cache_entry)), retry)
+
+        if self.single_flight is not None and method is METHOD.GET and isinstance(response, CacheableResponse):
+            key = (method.value, str(url), self.single_flight.normalize(query), id(session_auth), response.key())
+            return await self.single_flight.do(key, send)
+        return await send()
+
+    def _paginate(self,
+            path: str,
+            paginator: Paginator,
+            query: dict[str, Any] = {},
+            headers: dict = {},
+            read_ahead: int = PAGE_READ_AHEAD,
+            **kwargs) -> AsyncIterator[Any]:
+        """Iterate over the items of a paginated GET list, requesting the next pages while the current one is consumed.
+
+        Args:
+            path (str): Path for the request.
+            paginator (Paginator): Pagination scheme of the list.
+            query (dict[str, Any], optional): Query parameters, without pagination ones. Defaults to {}.
+            headers (dict, optional): Base headers for the requests. Defaults to {}.
+            read_ahead (int, optional): Pages requested ahead of the page being consumed. Defaults to PAGE_READ_AHEAD.
+
+        Yields:
+            Any: Next item of the list.
+        """
+        async def fetch(page: dict[str, Any]) -> Any:
+            handler: JsonResponse = await self._request(
+                method=METHOD.GET,
+                path=path,
+                query=page,
+                headers=headers,
+                **kwargs)
+            return handler.json()
+        return paginate(fetch, paginator, query, read_ahead)
+
+    async def _prepare(self,
+            method: METHOD,
+            query: dict[str, Any],
+            json: dict[str, Any],
+            body: Optional[Any],
+            headers: dict,
+            session_auth: AuthorizedSession,
+            request: REQUEST,
+            response: ResponseHandler,
+            kwargs: dict) -> tuple[dict, dict]:
+        """Build the headers and the aiohttp arguments of a request from its handlers."""
+        request.set_use_body(method in POST_METHOD)
+        headers = await request.headers(dict(headers))
+        headers = await response.headers(headers)
+        headers = await session_auth.headers(self.session(), headers)
+        kwargs = await request.kwargs(query, json, body, kwargs)
+        return headers, kwargs
+
+    @handle_stream_errors
+    async def _stream(self,
+            method: METHOD,
+            path: str,
+            query: dict[str, Any] = {},
+            json: dict[str, Any] = {},
+            body: Optional[Any] = None,
+            headers: dict = {},
+            session_auth: Optional[AuthorizedSession] = None,
+            request: REQUEST = DEFAULT_REQUEST, # type: ignore
+            response: JsonStreamResponse = DEFAULT_STREAM_RESPONSE,
+            circuit: Optional[str] = None,
+            **kwargs) -> AsyncIterator[Any]:
+        """Send a request to the API, yielding the items of the response body as they are received.
+
+        The connection is released as soon as the iteration stops: breaking out early (or closing the iterator) drops the rest of the body.
+        Streamed responses are neither cached nor shared between concurrent requests.
+
+        Args:
+            method (METHOD): Method type for the request.
+            path (str): Path for the request.
+            headers (dict, optional): Base headers for the request. Defaults to {}.
+            session_auth (Optional[AuthorizedSession], optional): Authorization session for the API. Defaults to None (use default session).
+            request (REQUEST, optional): Define which type of parameters will be used in the request. Defaults to JsonRequest.
+            response (JsonStreamResponse, optional): Define how items are parsed from the response body. Defaults to JsonStreamResponse.
+            circuit (Optional[str], optional): Circuit breaker key of the request. Defaults to None (the host of the request).
+
+        Raises:
+            CircuitOpenError: If the circuit of the request is open.
+
+        Yields:
+            Any: Next item of the response body.
+        """
+        request = copy.copy(request)
+        response = copy.copy(response)
+        session_auth = session_auth or self.session_auth
+        session = self.session()
+        try:
+            headers, kwargs = await self._prepare(method, query, json, body, headers, session_auth, request, response, kwargs)
+        except FakeResponse:
+            for item in response.FAKE_RESPONSE:
+                yield item
+            return
+        host = self.url(path).host or ""
+        circuit = circuit or host
+
+        # Rate limited requests are queued again until the retries are exhausted, which is only possible before the body is read
+        attempt = 0
+        while True:
+            # Checked first, so a request failing fast does not take a rate limit token
+            self.circuit_breaker.check(circuit)
+            # The outcome is recorded once, when the body has been read or has failed
             try:
-                session_auth = session_auth or self.session_auth
-                request.set_use_body(method in POST_METHOD)
-
-                headers = await request.headers(headers)
-                headers = await response.headers(headers)
-                headers = await session_auth.headers(session, headers)
-                kwargs = await request.kwargs(query, json, body, kwargs)
-                
+                await self.rate_limiter.acquire(host)
                 async with session.request(method.value, path, headers=headers, **kwargs) as results:
-                    await response.handle(results)
+                    self.rate_limiter.update(host, results.status, results.headers)
                     await validate_results(results)
-                    return response
-            
-            except FakeResponse:
-                await response.set_response(response.FAKE_RESPONSE)
-                return response
\ No newline at end of file
+                    async for item in response.iter_items(results):
+                        yield item
+            except ClientResponseError as e:
+                self.circuit_breaker.record(circuit, e)
+                self.rate_limiter.update(host, e.status, e.headers)
+                if e.status != STATUS_TOO_MANY_REQUESTS or attempt >= RATE_LIMIT_RETRIES:
+                    raise
+                attempt += 1
+                continue
+            except Exception as e:
+                self.circuit_breaker.record(circuit, e)
+                raise
+            except GeneratorExit:
+                # Closed by the caller while items were being received, so the host did answer
+                self.circuit_breaker.record(circuit)
+                raise
+            except BaseException:
+                self.circuit_breaker.abandon(circuit)
+                raise
+            self.circuit_breaker.record(circuit)
+            return
+
+    async def _send(self,
+            method: METHOD,
+            path: str,
+            query: dict[str, Any],
+            json: dict[str, Any],
+            body: Optional[Any],
+            headers: dict,
+            session_auth: AuthorizedSession,
+            request: REQUEST,
+            response: RESPONSE,
+            kwargs: dict,
+            cache_key: Optional[str] = None,
+            cache_entry: Optional[CacheEntry] = None) -> RESPONSE:
+        session = self.session()
+        try:
+            headers, kwargs = await self._prepare(method, query, json, body, headers, session_auth, request, response, kwargs)
+            host = self.url(path).host or ""
+            # A stale entry is revalidated, and kept if the server answers 304 Not Modified
+            if cache_entry is not None:
+                headers.update(cache_entry.validators())
+
+            # Rate limited requests are queued again until the retries are exhausted
+            attempt = 0
+            while True:
+                await self.rate_limiter.acquire(host)
+                try:
+                    async with session.request(method.value, path, headers=headers, **kwargs) as results:
+                        self.rate_limiter.update(host, results.status, results.headers)
+                        if cache_entry is not None and results.status == STATUS_NOT_MODIFIED:
+                            self.cache.revalidated(cache_key, cache_entry, results.headers) # type: ignore
+                            await response.load(cache_entry.body)
+                            return response
+                        await response.handle(results)
+                        await validate_results(results)
+                        if cache_key is not None:
+                            self.cache.store(cache_key, await results.read(), results.headers) # type: ignore
+                        return response
+                except ClientResponseError as e:
+                    self.rate_limiter.update(host, e.status, e.headers)
+                    if e.status != STATUS_TOO_MANY_REQUESTS or attempt >= RATE_LIMIT_RETRIES:
+                        raise
+                    attempt += 1
+        
+        except FakeResponse:
+            await response.set_response(response.FAKE_RESPONSE)
+            return response
\ No newline at end of file
@@ -0,0 +1,139 @@
+import time
+import logging
+from enum import Enum
+from typing import Awaitable, Callable, Optional, TypeVar
+from src.library.api.exceptions import HTTP_503_SERVICE_UNAVAILABLE
+from src.library.api.retry import RetryPolicy
+from src.library.utils import getenv
+
+__all__ = [
+    "CircuitState",
+    "CircuitOpenError",
+    "CircuitBreaker",
+    "DEFAULT_CIRCUIT_BREAKER"
+]
+
+logger = logging.getLogger("CircuitBreaker")
+
+BREAKER_THRESHOLD = int(getenv("BREAKER_THRESHOLD", "5"))
+BREAKER_PROBE_INTERVAL = float(getenv("BREAKER_PROBE_INTERVAL", "30"))
+
+T = TypeVar("T")
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+class CircuitOpenError(HTTP_503_SERVICE_UNAVAILABLE):
+    """Used when a request is not sent because the circuit of its host is open"""
+    def __init__(self, key: str, retry_in: float) -> None:
+        self.key = key
+        self.retry_in = retry_in
+        super().__init__(f"Circuit for {key} is open, next probe in {retry_in:.1f} seconds")
+
+class Circuit:
+    """Health of a single host"""
+    def __init__(self) -> None:
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened = 0.0
+        self.probing = False
+
+class CircuitBreaker:
+    """Stop sending requests to hosts that keep failing, keyed by host or by any other name given by the caller, like a Pterodactyl node.
+
+    A circuit opens after threshold consecutive failures, and calls to it fail fast with CircuitOpenError.
+    Once probe_interval seconds have passed, a single probe request is let through (half-open): its success closes the circuit, its failure opens it again.
+    Only transient failures count, as classified by RetryPolicy.transient: errors like 404 show that the host is up.
+
+    Args:
+        threshold (int, optional): Consecutive failures opening a circuit. Defaults to BREAKER_THRESHOLD.
+        probe_interval (float, optional): Seconds between probes of an open circuit. Defaults to BREAKER_PROBE_INTERVAL.
+    """
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, probe_interval: float = BREAKER_PROBE_INTERVAL) -> None:
+        self.threshold = threshold
+        self.probe_interval = probe_interval
+        self._circuits: dict[str, Circuit] = {}
+        self.stats: dict[str, int] = {"opened": 0, "rejected": 0}
+
+    def state(self, key: str) -> CircuitState:
+        circuit = self._circuits.get(key)
+        return CircuitState.CLOSED if circuit is None else circuit.state
+
+    def check(self, key: str) -> None:
+        """Let a request through, or fail fast if its circuit is open.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe already in flight.
+        """
+        circuit = self._circuits.get(key)
+        if circuit is None or circuit.state is CircuitState.CLOSED:
+            return
+        retry_in = circuit.opened + self.probe_interval - time.monotonic()
+        if circuit.probing or retry_in > 0:
+            self.stats["rejected"] += 1
+            raise CircuitOpenError(key, max(retry_in, 0.0))
+        circuit.state = CircuitState.HALF_OPEN
+        circuit.probing = True
+        logger.info(f"Probing circuit for {key}")
+
+    def record(self, key: str, error: Optional[BaseException] = None) -> None:
+        """Record the outcome of a request let through by check.
+
+        Args:
+            key (str): Circuit of the request.
+            error (Optional[BaseException], optional): Error of the request. Defaults to None (success).
+        """
+        circuit = self._circuits.get(key)
+        if error is None or not RetryPolicy.transient(error):
+            if circuit is not None and circuit.state is not CircuitState.CLOSED:
+                logger.info(f"Circuit for {key} is closed again")
+            self._circuits.pop(key, None)
+            return
+        if circuit is None:
+            circuit = self._circuits[key] = Circuit()
+        circuit.failures += 1
+        circuit.probing = False
+        if circuit.state is CircuitState.HALF_OPEN or (circuit.state is CircuitState.CLOSED and circuit.failures >= self.threshold):
+            if circuit.state is CircuitState.CLOSED:
+                self.stats["opened"] += 1
+                logger.warning(f"Circuit for {key} is open after {circuit.failures} consecutive failures: {error!r}")
+            circuit.state = CircuitState.OPEN
+            circuit.opened = time.monotonic()
+
+    def abandon(self, key: str) -> None:
+        """Forget a request let through by check that ended without outcome, like when it was cancelled.
+
+        A cancelled probe says nothing about the host, so the next request probes again.
+        """
+        circuit = self._circuits.get(key)
+        if circuit is not None:
+            circuit.probing = False
+
+    async def call(self, key: str, fun: Callable[[], Awaitable[T]]) -> T:
+        """Run a request through the circuit of key.
+
+        Args:
+            key (str): Circuit of the request.
+            fun (Callable[[], Awaitable[T]]): Send the request.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+
+        Returns:
+            T: Result of the request.
+        """
+        self.check(key)
+        try:
+            result = await fun()
+        except Exception as e:
+            self.record(key, e)
+            raise
+        except BaseException:
+            self.abandon(key)
+            raise
+        self.record(key)
+        return result
+
+DEFAULT_CIRCUIT_BREAKER = CircuitBreaker()
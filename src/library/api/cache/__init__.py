@@ -0,0 +1,10 @@
+from src.library.api.cache.base import CacheEntry, ResponseCache
+from src.library.api.cache.memory import MemoryCache
+from src.library.api.cache.sqlite import SQLiteCache
+
+__all__ = [
+    "CacheEntry",
+    "ResponseCache",
+    "MemoryCache",
+    "SQLiteCache",
+]
@@ -0,0 +1,138 @@
+import re
+import time
+from urllib.parse import urlencode
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+from src.library.utils import getenv
+
+CACHE_TTL = float(getenv("CACHE_TTL", "300"))
+
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+@dataclass
+class CacheEntry:
+    """Cached response body with its validators"""
+    body: bytes
+    expires: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def fresh(self) -> bool:
+        return time.time() < self.expires
+
+    def validators(self) -> dict[str, str]:
+        """Return the conditional request headers used to revalidate the entry."""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+class ResponseCache(ABC):
+    """Base class for HTTP response caches
+
+    Entries obey Cache-Control (no-store, no-cache, max-age), fall back to a default TTL, and keep their ETag / Last-Modified validators so stale entries can be revalidated.
+
+    Args:
+        ttl (float, optional): Seconds an entry stays fresh when the response has no max-age. Defaults to CACHE_TTL.
+    """
+    def __init__(self, ttl: float = CACHE_TTL) -> None:
+        self.ttl = ttl
+        self.stats: dict[str, int] = {"hit": 0, "miss": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+
+    @staticmethod
+    def key(method: str, url: str, query: Mapping[str, Any] = {}, identity: str = "") -> str:
+        """Build the cache key of a request from its method, URL, normalized query and the identity of its authorization.
+
+        Args:
+            method (str): HTTP method of the request.
+            url (str): Absolute URL of the request.
+            query (Mapping[str, Any], optional): Query parameters of the request. Defaults to {}.
+            identity (str, optional): Identity of the authorization session, as returned by AuthorizedSession.identity. Defaults to "" (anonymous).
+
+        Returns:
+            str: Cache key of the request.
+        """
+        params = urlencode(sorted((name, str(value)) for name, value in query.items()))
+        key = f"{method} {url}?{params}"
+        return f"{key} {identity}" if identity else key
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[CacheEntry]:
+        pass
+
+    @abstractmethod
+    def _set(self, key: str, entry: CacheEntry) -> None:
+        pass
+
+    @abstractmethod
+    def _delete(self, key: str) -> None:
+        pass
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for key, fresh or stale, counting fresh entries as hits.
+
+        Args:
+            key (str): Cache key of the request.
+
+        Returns:
+            Optional[CacheEntry]: Cached entry, None if missing.
+        """
+        entry = self._get(key)
+        if entry is not None and entry.fresh():
+            self.stats["hit"] += 1
+        else:
+            self.stats["miss"] += 1
+        return entry
+
+    def store(self, key: str, body: bytes, headers: Mapping[str, str]) -> None:
+        """Store a response body, unless its Cache-Control forbids it.
+
+        Args:
+            key (str): Cache key of the request.
+            body (bytes): Raw response body.
+            headers (Mapping[str, str]): Response headers.
+        """
+        cache_control = headers.get("Cache-Control", "").lower()
+        if "no-store" in cache_control:
+            return
+        self._set(key, CacheEntry(
+            body=body,
+            expires=time.time() + self.max_age(cache_control),
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified")))
+        self.stats["stored"] += 1
+
+    def revalidated(self, key: str, entry: CacheEntry, headers: Mapping[str, str]) -> None:
+        """Refresh a stale entry after a 304 Not Modified response.
+
+        Args:
+            key (str): Cache key of the request.
+            entry (CacheEntry): Revalidated entry.
+            headers (Mapping[str, str]): Headers of the 304 response.
+        """
+        entry.expires = time.time() + self.max_age(headers.get("Cache-Control", "").lower())
+        entry.etag = headers.get("ETag", entry.etag)
+        entry.last_modified = headers.get("Last-Modified", entry.last_modified)
+        self._set(key, entry)
+        self.stats["revalidated"] += 1
+
+    def max_age(self, cache_control: str) -> float:
+        if "no-cache" in cache_control:
+            return 0.0
+        match = MAX_AGE.search(cache_control)
+        return float(match.group(1)) if match else self.ttl
+
+    def close(self) -> None:
+        """Release the storage of the cache, writing what is still pending."""
+        pass
+
+    def metrics(self) -> dict[str, int]:
+        """Return the hit, miss, revalidated, stored and evicted counters."""
+        return dict(self.stats)
@@ -0,0 +1,41 @@
+from collections import OrderedDict
+from typing import Optional
+from src.library.api.cache.base import CACHE_TTL, CacheEntry, ResponseCache
+from src.library.utils import getenv
+
+CACHE_MEMORY_SIZE = int(getenv("CACHE_MEMORY_SIZE", str(64 * 1024 * 1024)))
+
+class MemoryCache(ResponseCache):
+    """In-memory LRU response cache, evicting the least recently used entries past a total body size.
+
+    Args:
+        max_size (int, optional): Maximum total size in bytes of the cached bodies. Defaults to CACHE_MEMORY_SIZE.
+        ttl (float, optional): Seconds an entry stays fresh when the response has no max-age. Defaults to CACHE_TTL.
+    """
+    def __init__(self, max_size: int = CACHE_MEMORY_SIZE, ttl: float = CACHE_TTL) -> None:
+        super().__init__(ttl=ttl)
+        self.max_size = max_size
+        self.size = 0
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def _get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _set(self, key: str, entry: CacheEntry) -> None:
+        self._delete(key)
+        if entry.size > self.max_size:
+            return
+        self._entries[key] = entry
+        self.size += entry.size
+        while self.size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+            self.stats["evicted"] += 1
+
+    def _delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
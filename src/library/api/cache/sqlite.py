@@ -0,0 +1,103 @@
+import os
+import time
+import sqlite3
+from typing import Optional
+from src.library.api.cache.base import CACHE_TTL, CacheEntry, ResponseCache
+from src.library.utils import getenv
+
+CACHE_SQLITE_SIZE = int(getenv("CACHE_SQLITE_SIZE", str(512 * 1024 * 1024)))
+CACHE_SQLITE_FLUSH = int(getenv("CACHE_SQLITE_FLUSH", "256"))
+
+class SQLiteCache(ResponseCache):
+    """Persistent response cache stored in a SQLite database, evicting the least recently used entries past a total body size.
+
+    Hits do not write to the database: their access times are kept in memory and written in one transaction with the next insert, or once flush_every of them are pending.
+
+    Args:
+        path (str): Database file path.
+        max_size (int, optional): Maximum total size in bytes of the cached bodies. Defaults to CACHE_SQLITE_SIZE.
+        ttl (float, optional): Seconds an entry stays fresh when the response has no max-age. Defaults to CACHE_TTL.
+        flush_every (int, optional): Pending access times written at once. Defaults to CACHE_SQLITE_FLUSH.
+    """
+    def __init__(self, path: str, max_size: int = CACHE_SQLITE_SIZE, ttl: float = CACHE_TTL, flush_every: int = CACHE_SQLITE_FLUSH) -> None:
+        super().__init__(ttl=ttl)
+        self.path = path
+        self.max_size = max_size
+        self.flush_every = flush_every
+        self._accessed: dict[str, float] = {}
+        self.closed = False
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                accessed REAL NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._db.commit()
+        self.size: int = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _get(self, key: str) -> Optional[CacheEntry]:
+        row = self._db.execute(
+            "SELECT body, expires, etag, last_modified FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._accessed[key] = time.time()
+        if len(self._accessed) >= self.flush_every:
+            self.flush()
+        return CacheEntry(body=row[0], expires=row[1], etag=row[2], last_modified=row[3])
+
+    def _write_accessed(self) -> None:
+        """Write the pending access times, without committing."""
+        if self._accessed:
+            self._db.executemany(
+                "UPDATE responses SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()])
+            self._accessed.clear()
+
+    def _remove(self, key: str) -> None:
+        """Delete an entry and its size from the running total, without committing."""
+        row = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.size -= row[0]
+
+    def _set(self, key: str, entry: CacheEntry) -> None:
+        # Eviction follows the access order, so pending access times are written first
+        self._write_accessed()
+        self._remove(key)
+        self._db.execute(
+            "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, entry.body, entry.size, entry.expires, entry.etag, entry.last_modified, time.time()))
+        self.size += entry.size
+        if self.size > self.max_size:
+            for evicted, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+                if self.size <= self.max_size:
+                    break
+                self._db.execute("DELETE FROM responses WHERE key = ?", (evicted,))
+                self.size -= size
+                self.stats["evicted"] += 1
+        self._db.commit()
+
+    def _delete(self, key: str) -> None:
+        self._accessed.pop(key, None)
+        self._remove(key)
+        self._db.commit()
+
+    def flush(self) -> None:
+        """Write the pending access times to the database."""
+        self._write_accessed()
+        self._db.commit()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.flush()
+        self._db.close()
+        self.closed = True
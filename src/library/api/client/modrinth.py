@@ -1,18 +1,44 @@
-import backoff
-from src.library.api import HttpAPI, METHOD
-from src.library.api.handler import JsonResponse, StreamResponse
+import os
+import json
+import asyncio
+import hashlib
+import urllib.parse
+from functools import partial
+from contextlib import aclosing
+from typing import AsyncIterator, Optional, Union
+from src.library.api import HttpAPI, METHOD, ConnectionPool, OffsetPaginator
+from src.library.api.pagination import PAGE_READ_AHEAD
+from src.library.api.cache import ResponseCache
+from src.library.api.download import RangedDownloader
+from src.library.api.handler import DecodeResponse, JsonResponse, JsonStreamResponse, StreamResponse
+from src.library.api.singleflight import SingleFlight
 from src.library.api.session import NoAuthSession, TokenSession
 from src.library.api.exceptions import *
-from src.library.utils import getenv, boolToStr
+from src.library.store import ArtifactStore
+from src.library.utils import getenv, boolToStr, chunked, json_loads
+from src.model.base import Lazy
+from src.model.modrinth import Version
 
 MODRINTH_API_URL = getenv("MODRINTH_API_URL", "https://api.modrinth.com/v2/")
 MODRINTH_TOKEN = getenv("MODRINTH_TOKEN", fail_on_none=False)
 MODRINTH_AGENT = getenv("MODRINTH_AGENT", fail_on_none=False)
+MODRINTH_QUERY_LENGTH = int(getenv("MODRINTH_QUERY_LENGTH", "4000"))
+MODRINTH_BULK_SIZE = int(getenv("MODRINTH_BULK_SIZE", "500"))
+MODRINTH_PAGE_SIZE = int(getenv("MODRINTH_PAGE_SIZE", "100"))
+MODRINTH_RATE_LIMIT = float(getenv("MODRINTH_RATE_LIMIT", "300"))
+
+def query_ids(ids: list[str]) -> list[list[str]]:
+    """Split ids into chunks whose JSON encoded query parameter fits in MODRINTH_QUERY_LENGTH."""
+    return chunked(ids, MODRINTH_QUERY_LENGTH, size=lambda id: len(urllib.parse.quote(f"{json.dumps(id)},")))
+
+def body_ids(ids: list[str]) -> list[list[str]]:
+    """Split ids into chunks of at most MODRINTH_BULK_SIZE items."""
+    return chunked(ids, MODRINTH_BULK_SIZE)
 
 class ModrinthCDN(HttpAPI):
     streamResponse = StreamResponse()
 
-    def __init__(self) -> None:
+    def __init__(self, pool: Optional[ConnectionPool] = None, store: Optional[ArtifactStore] = None) -> None:
         if MODRINTH_TOKEN is None:
             session_auth = NoAuthSession()
         else:
@@ -23,7 +49,11 @@ class ModrinthCDN(HttpAPI):
         super().__init__(
             base_url=None,
             session_auth=session_auth,
-            raise_for_status=True)
+            raise_for_status=True,
+            pool=pool)
+        self.store = store
+        self.ranged = RangedDownloader(self)
+        self._downloads = SingleFlight()
     
     def headers(self) -> dict[str, str]:
         headers: dict[str, str] = {}
@@ -31,7 +61,6 @@ class ModrinthCDN(HttpAPI):
             headers["User-Agent"] = MODRINTH_AGENT
         return headers
     
-    @backoff.on_exception(backoff.expo, Exception, max_tries=2)
     async def download_file(self, url: str) -> bytes:
         handler: StreamResponse = await self._request(
             method=METHOD.GET,
@@ -40,8 +69,54 @@ class ModrinthCDN(HttpAPI):
             response=self.streamResponse)
         return handler.stream()
 
+    async def download_file_to(self, url: str, path: str, hashes: dict[str, str] = {}, size: Optional[int] = None) -> dict[str, str]:
+        """Stream a file to disk, verifying it against the Modrinth file hashes.
+
+        With an artifact store, the store is checked first and each distinct file is downloaded only once, even by concurrent callers.
+
+        Args:
+            url (str): URL of the file.
+            path (str): Destination path for the file.
+            hashes (dict[str, str], optional): Expected hashes, as in the version files[].hashes. Defaults to {}.
+            size (Optional[int], optional): Size of the file, as in the version files[].size. Large files of known size are downloaded with parallel range requests. Defaults to None.
+
+        Returns:
+            dict[str, str]: sha1 and sha512 hex digests of the downloaded file.
+        """
+        if self.store is None:
+            return await self._download_file_to(url, path, hashes, size)
+        key = hashes.get("sha512") or hashes.get("sha1") or url
+        sha512 = await self._downloads.do(key, lambda: self._download_artifact(url, hashes, size))
+        self.store.checkout(sha512, path)
+        return self.store.hashes(sha512)
+
+    async def _download_artifact(self, url: str, hashes: dict[str, str], size: Optional[int]) -> str:
+        store: ArtifactStore = self.store # type: ignore
+        sha512 = store.lookup(hashes.get("sha512"), hashes.get("sha1"))
+        if sha512 is not None:
+            return sha512
+        # Stable staging name, so an interrupted download resumes on the next call
+        key = hashes.get("sha512") or hashes.get("sha1") or hashlib.sha1(url.encode()).hexdigest()
+        staging = os.path.join(store.staging, key)
+        digests = await self._download_file_to(url, staging, hashes, size)
+        return store.put(staging, digests, hashes)
+
+    async def _download_file_to(self, url: str, path: str, hashes: dict[str, str], size: Optional[int]) -> dict[str, str]:
+        digests = await self.ranged.download(url, path, self.headers(), hashes, size)
+        if digests is not None:
+            return digests
+        handler: StreamResponse = await self._request(
+            method=METHOD.GET,
+            path=url,
+            headers=self.headers(),
+            response=self.streamResponse.download_to(path, expected=hashes))
+        return handler.hashes()
+
 class ModrinthAPI(HttpAPI):
-    def __init__(self) -> None:
+    versionsResponse = DecodeResponse(Version.loads)
+    lazyVersionsResponse = DecodeResponse(partial(Version.loads, lazy=True))
+
+    def __init__(self, pool: Optional[ConnectionPool] = None, cache: Optional[ResponseCache] = None) -> None:
         if MODRINTH_TOKEN is None:
             session_auth = NoAuthSession()
         else:
@@ -52,7 +127,10 @@ class ModrinthAPI(HttpAPI):
         super().__init__(
             base_url=MODRINTH_API_URL,
             session_auth=session_auth,
-            raise_for_status=True)
+            raise_for_status=True,
+            pool=pool,
+            cache=cache)
+        self.rate_limiter.setdefault(self.url("").host or "", MODRINTH_RATE_LIMIT)
     
     def headers(self) -> dict[str, str]:
         headers: dict[str, str] = {}
@@ -60,7 +138,6 @@ class ModrinthAPI(HttpAPI):
             headers["User-Agent"] = MODRINTH_AGENT
         return headers
 
-    @backoff.on_exception(backoff.expo, Exception, max_tries=2)
     async def project_info(self, slug: str) -> dict:
         handler: JsonResponse = await self._request(
             method=METHOD.GET,
@@ -68,7 +145,6 @@ class ModrinthAPI(HttpAPI):
             headers=self.headers())
         return handler.json()
     
-    @backoff.on_exception(backoff.expo, Exception, max_tries=2)
     async def project_dependencies(self, slug: str) -> dict:
         handler: JsonResponse = await self._request(
             method=METHOD.GET,
@@ -76,15 +152,202 @@ class ModrinthAPI(HttpAPI):
             headers=self.headers())
         return handler.json()
     
-    @backoff.on_exception(backoff.expo, Exception, max_tries=2)
-    async def project_versions(self, slug: str, loaders: list[str] = [], game_versions: list[str] = [], featured: bool = True) -> dict:
+    async def project_versions(self, slug: str, loaders: list[str] = [], game_versions: list[str] = [], featured: Optional[bool] = True) -> dict:
         handler: JsonResponse = await self._request(
             method=METHOD.GET,
             path=f'project/{slug}/version',
-            query={
-                "loaders": str(loaders),
-                "game_versions": str(game_versions),
-                "featured": boolToStr(featured, int_format=False)
-            },
+            query=self._project_versions_query(loaders, game_versions, featured),
             headers=self.headers())
-        return handler.json()
\ No newline at end of file
+        return handler.json()
+
+    async def project_version_models(self, slug: str, loaders: list[str] = [], game_versions: list[str] = [], featured: Optional[bool] = None, lazy: bool = False) -> list[Union[Version, Lazy[Version]]]:
+        """List the versions of a project as compact models, decoded straight from the response body.
+
+        Args:
+            slug (str): Project id or slug.
+            loaders (list[str], optional): Accepted loaders. Defaults to [].
+            game_versions (list[str], optional): Accepted game versions. Defaults to [].
+            featured (Optional[bool], optional): Only featured (True) or non featured (False) versions. Defaults to None (both).
+            lazy (bool, optional): Convert fields on first access. Defaults to False.
+
+        Returns:
+            list[Union[Version, Lazy[Version]]]: Versions, newest first.
+        """
+        handler: DecodeResponse = await self._request(
+            method=METHOD.GET,
+            path=f'project/{slug}/version',
+            query=self._project_versions_query(loaders, game_versions, featured),
+            headers=self.headers(),
+            response=self.lazyVersionsResponse if lazy else self.versionsResponse)
+        return handler.value()
+
+    def project_versions_stream(self, slug: str, loaders: list[str] = [], game_versions: list[str] = [], featured: Optional[bool] = None, models: bool = False) -> AsyncIterator[Union[dict, Version]]:
+        """Iterate over the versions of a project while the response is received.
+
+        Stopping the iteration early, like after the first version, closes the connection without reading the rest of the list.
+
+        Args:
+            slug (str): Project id or slug.
+            loaders (list[str], optional): Accepted loaders. Defaults to [].
+            game_versions (list[str], optional): Accepted game versions. Defaults to [].
+            featured (Optional[bool], optional): Only featured (True) or non featured (False) versions. Defaults to None (both).
+            models (bool, optional): Yield compact Version models instead of dicts. Defaults to False.
+
+        Yields:
+            Union[dict, Version]: Versions, newest first.
+        """
+        decode = (lambda item: Version.from_dict(json_loads(item))) if models else json_loads
+        return self._stream(
+            method=METHOD.GET,
+            path=f'project/{slug}/version',
+            query=self._project_versions_query(loaders, game_versions, featured),
+            headers=self.headers(),
+            response=JsonStreamResponse(decode))
+
+    async def latest_version(self, slug: str, loaders: list[str] = [], game_versions: list[str] = [], featured: Optional[bool] = None) -> Optional[dict]:
+        """Get the newest version of a project matching loaders and game versions, reading only the first item of the version list.
+
+        Args:
+            slug (str): Project id or slug.
+            loaders (list[str], optional): Accepted loaders. Defaults to [].
+            game_versions (list[str], optional): Accepted game versions. Defaults to [].
+            featured (Optional[bool], optional): Only featured (True) or non featured (False) versions. Defaults to None (both).
+
+        Returns:
+            Optional[dict]: Newest version, None if no version matches.
+        """
+        async with aclosing(self.project_versions_stream(slug, loaders, game_versions, featured)) as versions:
+            return await anext(versions, None) # type: ignore
+
+    def _project_versions_query(self, loaders: list[str], game_versions: list[str], featured: Optional[bool]) -> dict[str, str]:
+        query: dict[str, str] = {}
+        if loaders:
+            query["loaders"] = json.dumps(loaders, separators=(",", ":"))
+        if game_versions:
+            query["game_versions"] = json.dumps(game_versions, separators=(",", ":"))
+        if featured is not None:
+            query["featured"] = boolToStr(featured, int_format=False)
+        return query
+
+    def search(self, query: str = "", facets: list[list[str]] = [], index: str = "relevance", limit: int = MODRINTH_PAGE_SIZE, read_ahead: int = PAGE_READ_AHEAD) -> AsyncIterator[dict]:
+        """Iterate over every project matching a search, across all the pages of the results.
+
+        Args:
+            query (str, optional): Search query. Defaults to "" (every project).
+            facets (list[list[str]], optional): Facets, like [["project_type:mod"], ["categories:fabric"]]. Defaults to [].
+            index (str, optional): Sort order: relevance, downloads, follows, newest or updated. Defaults to "relevance".
+            limit (int, optional): Results requested per page. Defaults to MODRINTH_PAGE_SIZE.
+            read_ahead (int, optional): Pages requested ahead of the page being consumed. Defaults to PAGE_READ_AHEAD.
+
+        Yields:
+            dict: Next search hit.
+        """
+        params: dict[str, str] = {"index": index}
+        if query:
+            params["query"] = query
+        if facets:
+            params["facets"] = json.dumps(facets, separators=(",", ":"))
+        return self._paginate(
+            path='search',
+            paginator=OffsetPaginator(limit),
+            query=params,
+            headers=self.headers(),
+            read_ahead=read_ahead)
+
+    async def projects(self, ids: list[str]) -> list[dict]:
+        """Get several projects by id or slug, in as few requests as possible.
+
+        Args:
+            ids (list[str]): Project ids or slugs.
+
+        Returns:
+            list[dict]: Found projects, in the order of ids.
+        """
+        ids = list(dict.fromkeys(ids))
+        chunks = await asyncio.gather(*[self._projects(chunk) for chunk in query_ids(ids)])
+        found = {key: project for chunk in chunks for project in chunk for key in (project["id"], project["slug"])}
+        return [found[id] for id in ids if id in found]
+
+    async def versions(self, ids: list[str]) -> list[dict]:
+        """Get several versions by id, in as few requests as possible.
+
+        Args:
+            ids (list[str]): Version ids.
+
+        Returns:
+            list[dict]: Found versions, in the order of ids.
+        """
+        ids = list(dict.fromkeys(ids))
+        chunks = await asyncio.gather(*[self._versions(chunk) for chunk in query_ids(ids)])
+        found = {version["id"]: version for chunk in chunks for version in chunk}
+        return [found[id] for id in ids if id in found]
+
+    async def version_files(self, hashes: list[str], algorithm: str = "sha1") -> dict[str, dict]:
+        """Get the versions of several files from their hashes.
+
+        Args:
+            hashes (list[str]): File hashes.
+            algorithm (str, optional): Hash algorithm, sha1 or sha512. Defaults to "sha1".
+
+        Returns:
+            dict[str, dict]: Versions by file hash, in the order of hashes. Unknown hashes are omitted.
+        """
+        hashes = list(dict.fromkeys(hashes))
+        chunks = await asyncio.gather(*[
+            self._version_files(chunk, algorithm)
+            for chunk in body_ids(hashes)])
+        found = {hash: version for chunk in chunks for hash, version in chunk.items()}
+        return {hash: found[hash] for hash in hashes if hash in found}
+
+    async def version_files_update(self, hashes: list[str], algorithm: str = "sha1", loaders: list[str] = [], game_versions: list[str] = []) -> dict[str, dict]:
+        """Get the latest version matching loaders and game versions for several files from their hashes.
+
+        Args:
+            hashes (list[str]): File hashes.
+            algorithm (str, optional): Hash algorithm, sha1 or sha512. Defaults to "sha1".
+            loaders (list[str], optional): Accepted loaders. Defaults to [].
+            game_versions (list[str], optional): Accepted game versions. Defaults to [].
+
+        Returns:
+            dict[str, dict]: Latest versions by file hash, in the order of hashes. Unknown hashes are omitted.
+        """
+        hashes = list(dict.fromkeys(hashes))
+        chunks = await asyncio.gather(*[
+            self._version_files_update(chunk, algorithm, loaders, game_versions)
+            for chunk in body_ids(hashes)])
+        found = {hash: version for chunk in chunks for hash, version in chunk.items()}
+        return {hash: found[hash] for hash in hashes if hash in found}
+
+    async def _projects(self, ids: list[str]) -> list[dict]:
+        handler: JsonResponse = await self._request(
+            method=METHOD.GET,
+            path='projects',
+            query={"ids": json.dumps(ids, separators=(",", ":"))},
+            headers=self.headers())
+        return handler.json() # type: ignore
+
+    async def _versions(self, ids: list[str]) -> list[dict]:
+        handler: JsonResponse = await self._request(
+            method=METHOD.GET,
+            path='versions',
+            query={"ids": json.dumps(ids, separators=(",", ":"))},
+            headers=self.headers())
+        return handler.json() # type: ignore
+
+    async def _version_files(self, hashes: list[str], algorithm: str) -> dict[str, dict]:
+        handler: JsonResponse = await self._request(
+            method=METHOD.POST,
+            path='version_files',
+            json={"hashes": hashes, "algorithm": algorithm},
+            headers=self.headers(),
+            retry=True)
+        return handler.json()
+
+    async def _version_files_update(self, hashes: list[str], algorithm: str, loaders: list[str], game_versions: list[str]) -> dict[str, dict]:
+        handler: JsonResponse = await self._request(
+            method=METHOD.POST,
+            path='version_files/update',
+            json={"hashes": hashes, "algorithm": algorithm, "loaders": loaders, "game_versions": game_versions},
+            headers=self.headers(),
+            retry=True)
+        return handler.json()
@@ -1,15 +1,27 @@
-import backoff
-from src.library.api import HttpAPI, METHOD
-from src.library.api.handler import JsonResponse, StreamResponse
-from src.library.api.session import NoAuthSession, TokenSession
+import asyncio
+import logging
+from contextlib import aclosing
+from typing import AsyncIterable, AsyncIterator, Optional, Union
+from src.library.api import HttpAPI, METHOD, ConnectionPool, PagePaginator
+from src.library.api.pagination import PAGE_READ_AHEAD
+from src.library.api.handler import HeadResponse, JsonResponse, StreamRequest, StreamResponse, UploadStream
+from src.library.api.session import NoAuthSession, TokenSession, NO_AUTHORIZE
 from src.library.api.exceptions import *
 from src.library.utils import getenv
 
 PTERODACTYL_API_URL = getenv("PTERODACTYL_API_URL")
 PTERODACTYL_TOKEN = getenv("PTERODACTYL_TOKEN", fail_on_none=False)
+UPLOAD_CONCURRENCY = int(getenv("UPLOAD_CONCURRENCY", "4"))
+PTERODACTYL_PAGE_SIZE = int(getenv("PTERODACTYL_PAGE_SIZE", "100"))
+
+logger = logging.getLogger("PterodactylAPI")
 
 class PterodactylAPI(HttpAPI):
-    def __init__(self) -> None:
+    streamResponse = StreamResponse()
+    streamRequest = StreamRequest(field="files")
+    headResponse = HeadResponse()
+
+    def __init__(self, pool: Optional[ConnectionPool] = None) -> None:
         if PTERODACTYL_TOKEN is None:
             session_auth = NoAuthSession()
         else:
@@ -19,59 +31,157 @@ class PterodactylAPI(HttpAPI):
         super().__init__(
             base_url=PTERODACTYL_API_URL,
             session_auth=session_auth,
-            raise_for_status=True)
+            raise_for_status=True,
+            pool=pool)
+        self.nodes: dict[str, str] = {}
     
-    @backoff.on_exception(backoff.expo, Exception, max_tries=2)
     async def servers_list(self) -> dict:
         handler: JsonResponse = await self._request(
             method=METHOD.GET,
             path=f'client')
         return handler.json()
     
-    @backoff.on_exception(backoff.expo, Exception, max_tries=2)
+    async def servers(self, per_page: int = PTERODACTYL_PAGE_SIZE, read_ahead: int = PAGE_READ_AHEAD) -> AsyncIterator[dict]:
+        """Iterate over every server available to the client, across all the pages of the list.
+
+        The node of each server is remembered, so the requests about a server go through the circuit breaker of its node.
+
+        Args:
+            per_page (int, optional): Servers requested per page. Defaults to PTERODACTYL_PAGE_SIZE.
+            read_ahead (int, optional): Pages requested ahead of the page being consumed. Defaults to PAGE_READ_AHEAD.
+
+        Yields:
+            dict: Next server object, with its attributes.
+        """
+        async with aclosing(self._paginate(
+                path=f'client',
+                paginator=PagePaginator(per_page),
+                read_ahead=read_ahead)) as servers:
+            async for server in servers:
+                attributes = server["attributes"]
+                if attributes.get("node"):
+                    self.nodes[attributes["identifier"]] = attributes["node"]
+                yield server
+
+    def circuit(self, server_id: str) -> Optional[str]:
+        """Circuit breaker key of the requests about a server: its node if known, else the panel host.
+
+        The panel proxies these requests to the node of the server, so a node going down only trips the circuit of its servers.
+        """
+        node = self.nodes.get(server_id)
+        return None if node is None else f"node:{node}"
+
     async def server_command(self, server_id: str, command: str) -> dict:
         handler: JsonResponse = await self._request(
             method=METHOD.GET,
             path=f'client/servers/{server_id}/command',
-            query={"command": command})
+            query={"command": command},
+            retry=False,
+            circuit=self.circuit(server_id))
         return handler.json()
     
-    @backoff.on_exception(backoff.expo, Exception, max_tries=2)
     async def server_power(self, server_id: str, signal: str) -> dict:
         handler: JsonResponse = await self._request(
             method=METHOD.POST,
             path=f'client/servers/{server_id}/power',
-            json={"signal": signal})
+            json={"signal": signal},
+            circuit=self.circuit(server_id))
         return handler.json()
     
-    @backoff.on_exception(backoff.expo, Exception, max_tries=2)
     async def server_files_list(self, server_id: str, directory: str) -> dict:
         handler: JsonResponse = await self._request(
             method=METHOD.GET, path=f'client/servers/{server_id}/files/list',
-            query={"directory": directory})
+            query={"directory": directory},
+            circuit=self.circuit(server_id))
         return handler.json()
     
-    @backoff.on_exception(backoff.expo, Exception, max_tries=2)
     async def server_files_download(self, server_id: str, filepath: str) -> dict:
         handler: JsonResponse = await self._request(
             method=METHOD.GET,
             path=f'client/servers/{server_id}/files/download',
-            query={"file": filepath})
+            query={"file": filepath},
+            circuit=self.circuit(server_id))
         return handler.json()
     
-    @backoff.on_exception(backoff.expo, Exception, max_tries=2)
-    async def server_files_upload(self, server_id: str, filepath: str, fileraw: bytes) -> dict:
+    async def server_files_download_to(self, server_id: str, filepath: str, path: str) -> dict[str, str]:
+        """Stream a server file to a local path through its signed download URL.
+
+        Args:
+            server_id (str): Server identifier.
+            filepath (str): Path of the file in the server.
+            path (str): Destination path for the file.
+
+        Returns:
+            dict[str, str]: sha1 and sha512 hex digests of the downloaded file.
+        """
+        signed = await self.server_files_download(server_id, filepath)
+        handler: StreamResponse = await self._request(
+            method=METHOD.GET,
+            path=signed["attributes"]["url"],
+            session_auth=NO_AUTHORIZE,
+            response=self.streamResponse.download_to(path))
+        return handler.hashes()
+    
+    async def server_files_upload_url(self, server_id: str) -> str:
         handler: JsonResponse = await self._request(
-            method=METHOD.POST,
+            method=METHOD.GET,
             path=f'client/servers/{server_id}/files/upload',
-            query={"file": filepath},
-            data=fileraw)
-        return handler.json()
+            circuit=self.circuit(server_id))
+        return handler.json()["attributes"]["url"]
     
-    @backoff.on_exception(backoff.expo, Exception, max_tries=2)
-    async def server_files_delete(self, server_id: str, directory: str, files: list[str]) -> dict:
-        handler: JsonResponse = await self._request(
+    async def server_files_upload(self, server_id: str, directory: str, source: Union[str, bytes, AsyncIterable[bytes]], filename: Optional[str] = None) -> UploadStream:
+        """Stream a file to a server directory through a signed upload URL.
+
+        Args:
+            server_id (str): Server identifier.
+            directory (str): Destination directory in the server.
+            source (Union[str, bytes, AsyncIterable[bytes]]): Local file path, raw bytes or async byte iterator.
+            filename (Optional[str], optional): File name in the server. Defaults to the basename of a file path.
+
+        Returns:
+            UploadStream: Sent stream, with its size and throughput.
+        """
+        url = await self.server_files_upload_url(server_id)
+        stream = UploadStream(source, filename)
+        await self._request(
             method=METHOD.POST,
-            path=f'client/servers/{server_id}/files/upload',
-            query={"root": directory, "files": files})
-        return handler.json()
+            path=url,
+            query={"directory": directory},
+            body=stream,
+            session_auth=NO_AUTHORIZE,
+            request=self.streamRequest,
+            response=self.headResponse)
+        logger.info(f"Uploaded {stream.name} to {server_id}:{directory} ({stream.sent} bytes, {stream.rate / 1024 / 1024:.2f} MiB/s)")
+        return stream
+
+    async def servers_files_upload(self, server_ids: list[str], directory: str, source: Union[str, bytes], filename: Optional[str] = None, concurrency: int = UPLOAD_CONCURRENCY) -> dict[str, Union[UploadStream, Exception]]:
+        """Upload the same file to many servers, with bounded parallelism.
+
+        Args:
+            server_ids (list[str]): Server identifiers.
+            directory (str): Destination directory in every server.
+            source (Union[str, bytes]): Local file path or raw bytes.
+            filename (Optional[str], optional): File name in the servers. Defaults to the basename of a file path.
+            concurrency (int, optional): Maximum number of uploads at once. Defaults to UPLOAD_CONCURRENCY.
+
+        Returns:
+            dict[str, Union[UploadStream, Exception]]: Sent stream, or the upload error, by server identifier.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        async def upload(server_id: str) -> Union[UploadStream, Exception]:
+            async with semaphore:
+                try:
+                    return await self.server_files_upload(server_id, directory, source, filename)
+                except Exception as e:
+                    logger.error(f"Upload to {server_id} has failed: {e}")
+                    return e
+        results = await asyncio.gather(*[upload(server_id) for server_id in server_ids])
+        return dict(zip(server_ids, results))
+    
+    async def server_files_delete(self, server_id: str, directory: str, files: list[str]) -> None:
+        await self._request(
+            method=METHOD.POST,
+            path=f'client/servers/{server_id}/files/delete',
+            json={"root": directory, "files": files},
+            response=self.headResponse,
+            circuit=self.circuit(server_id))
@@ -0,0 +1,93 @@
+import asyncio
+from typing import Optional
+from aiohttp import TCPConnector
+from src.library.utils import getenv
+
+__all__ = [
+    "ConnectionPool"
+]
+
+POOL_LIMIT = int(getenv("POOL_LIMIT", "100"))
+POOL_LIMIT_PER_HOST = int(getenv("POOL_LIMIT_PER_HOST", "10"))
+POOL_KEEPALIVE_TIMEOUT = float(getenv("POOL_KEEPALIVE_TIMEOUT", "30"))
+POOL_DNS_CACHE_TTL = int(getenv("POOL_DNS_CACHE_TTL", "300"))
+
+class ConnectionPool:
+    """Keep-alive TCP connection pool that can be shared between HttpAPI clients.
+
+    The connector is created lazily inside the running event loop, and recreated if the pool is used from a different loop.
+
+    Args:
+        limit (int, optional): Maximum number of open connections. Defaults to POOL_LIMIT.
+        limit_per_host (int, optional): Maximum number of open connections per host. Defaults to POOL_LIMIT_PER_HOST.
+        keepalive_timeout (float, optional): Seconds an idle connection is kept open. Defaults to POOL_KEEPALIVE_TIMEOUT.
+        ttl_dns_cache (int, optional): Seconds a DNS resolution is cached. Defaults to POOL_DNS_CACHE_TTL.
+    """
+    def __init__(self,
+            limit: int = POOL_LIMIT,
+            limit_per_host: int = POOL_LIMIT_PER_HOST,
+            keepalive_timeout: float = POOL_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache: int = POOL_DNS_CACHE_TTL,
+            ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+
+        self._connector: Optional[TCPConnector] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: set[asyncio.Future] = set()
+
+    @property
+    def closed(self) -> bool:
+        return self._connector is None or self._connector.closed
+
+    def connector(self) -> TCPConnector:
+        """Return the connector for the running event loop, creating it if needed.
+
+        Returns:
+            TCPConnector: Connector shared by every session using this pool.
+        """
+        loop = asyncio.get_running_loop()
+        if self._connector is None or self._connector.closed or self._loop is not loop:
+            if self._connector is not None and not self._connector.closed:
+                self._discard(self._connector, self._loop)
+            self._connector = TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.ttl_dns_cache)
+            self._loop = loop
+        return self._connector
+
+    def _discard(self, connector: TCPConnector, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Close a connector of another event loop, in the loop it belongs to if it is still running."""
+        async def close() -> None:
+            await connector.close()
+
+        if loop is not None and not loop.is_closed() and loop.is_running():
+            asyncio.run_coroutine_threadsafe(close(), loop)
+            return
+        # The connections of a closed loop cannot be awaited anymore, closing only drops them
+        task = asyncio.ensure_future(close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def aclose(self) -> None:
+        """Close every pooled connection."""
+        connector, loop = self._connector, self._loop
+        self._connector = None
+        self._loop = None
+        if connector is None or connector.closed:
+            return
+        if loop is asyncio.get_running_loop():
+            await connector.close()
+        else:
+            self._discard(connector, loop)
+
+    async def __aenter__(self) -> "ConnectionPool":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
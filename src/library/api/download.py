@@ -0,0 +1,188 @@
+import os
+import json
+import asyncio
+import logging
+from typing import Any, Callable, Mapping, Optional
+from src.library.api import HttpAPI, METHOD, RetryPolicy
+from src.library.api.exceptions import HTTP_502_BAD_GATEWAY
+from src.library.api.handler import RangeResponse, RangeNotSatisfied
+from src.library.utils import getenv
+from src.library.utils.hashing import hash_file
+
+__all__ = [
+    "RangedDownloader"
+]
+
+logger = logging.getLogger("RangedDownloader")
+
+RANGE_MIN_SIZE = int(getenv("RANGE_MIN_SIZE", str(32 * 1024 * 1024)))
+RANGE_SEGMENTS = int(getenv("RANGE_SEGMENTS", "4"))
+RANGE_STATE_INTERVAL = int(getenv("RANGE_STATE_INTERVAL", str(4 * 1024 * 1024)))
+
+class RangedDownloader:
+    """Download large files as parallel HTTP Range segments, resumable across failures and restarts.
+
+    Segments are written into a preallocated "<path>.part" file, and their progress is saved in a "<path>.part.json" sidecar.
+    A later call for the same URL and size resumes every segment where it stopped, unless the validator (ETag or Last-Modified) of the file changed.
+    The size of the file must be known beforehand, like the size of a Modrinth version file, so no HEAD request is sent:
+    the first segment request probes the range support of the server, and the other segments are requested once it is answered.
+
+    Args:
+        api (HttpAPI): Client used to send the requests.
+        segments (int, optional): Number of parallel segments. Defaults to RANGE_SEGMENTS.
+        min_size (int, optional): Smallest file size downloaded with ranges. Defaults to RANGE_MIN_SIZE.
+        retry_policy (Optional[RetryPolicy], optional): Retry policy resuming failed segments. Defaults to None (the retry policy of api).
+    """
+    def __init__(self,
+            api: HttpAPI,
+            segments: int = RANGE_SEGMENTS,
+            min_size: int = RANGE_MIN_SIZE,
+            retry_policy: Optional[RetryPolicy] = None,
+            ) -> None:
+        self.api = api
+        self.segments = segments
+        self.min_size = min_size
+        self.retry_policy = retry_policy or api.retry_policy
+
+    async def download(self, url: str, path: str, headers: dict[str, str] = {}, expected: dict[str, str] = {}, size: Optional[int] = None) -> Optional[dict[str, str]]:
+        """Download url to path with parallel range requests.
+
+        Args:
+            url (str): URL of the file.
+            path (str): Destination path for the file.
+            headers (dict[str, str], optional): Extra request headers. Defaults to {}.
+            expected (dict[str, str], optional): Expected digests by hash algorithm. Defaults to {}.
+            size (Optional[int], optional): Size of the file in bytes. Defaults to None (unknown).
+
+        Raises:
+            HTTP_502_BAD_GATEWAY: If the downloaded file does not match the expected digests.
+
+        Returns:
+            Optional[dict[str, str]]: sha1 and sha512 digests of the file, None if the size of the file is unknown or too small, or if the server does not support ranges.
+        """
+        if size is None or size < self.min_size:
+            return None
+
+        part_path, state_path = f"{path}.part", f"{path}.part.json"
+        state = self._load_state(state_path, url, size)
+        if state is None or not os.path.exists(part_path):
+            state = self._new_state(url, size)
+            self._preallocate(part_path, size)
+        self._save_state(state_path, state)
+
+        probed = asyncio.Event()
+        def check(response_headers: Mapping[str, str]) -> None:
+            validator = response_headers.get("ETag") or response_headers.get("Last-Modified")
+            if probed.is_set() or state["validator"] is not None:
+                if validator != state["validator"]:
+                    raise RangeNotSatisfied(f"{url} changed during its download")
+            state["validator"] = validator
+            probed.set()
+
+        pending = [segment for segment in state["segments"] if segment[0] + segment[2] <= segment[1]]
+        tasks = [
+            asyncio.ensure_future(self._segment(url, part_path, state_path, state, segment, headers, check, None if index == 0 else probed))
+            for index, segment in enumerate(pending)
+        ]
+        try:
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        except RangeNotSatisfied as e:
+            logger.warning(f"Range requests for {url} failed, falling back to a single stream: {e.detail}")
+            self._cleanup(part_path, state_path)
+            return None
+        finally:
+            if os.path.exists(state_path):
+                self._save_state(state_path, state)
+
+        loop = asyncio.get_running_loop()
+        digests = await loop.run_in_executor(None, hash_file, part_path)
+        for algorithm, digest in expected.items():
+            if digests.get(algorithm) != digest.lower():
+                self._cleanup(part_path, state_path)
+                raise HTTP_502_BAD_GATEWAY(f"Downloaded file {algorithm} mismatch: expected {digest}, got {digests.get(algorithm)}")
+        os.replace(part_path, path)
+        os.remove(state_path)
+        return digests
+
+    async def _segment(self,
+            url: str,
+            part_path: str,
+            state_path: str,
+            state: dict[str, Any],
+            segment: list[int],
+            headers: dict[str, str],
+            check: Callable[[Mapping[str, str]], None],
+            probed: Optional[asyncio.Event]) -> None:
+        if probed is not None:
+            await probed.wait()
+        unsaved = 0
+        def progress(written: int) -> None:
+            nonlocal unsaved
+            segment[2] += written
+            unsaved += written
+            if unsaved >= RANGE_STATE_INTERVAL:
+                unsaved = 0
+                self._save_state(state_path, state)
+
+        # Every attempt resumes the segment where the previous one stopped
+        async def attempt() -> None:
+            start, end, done = segment
+            if start + done > end:
+                return
+            try:
+                await self.api._request(
+                    method=METHOD.GET,
+                    path=url,
+                    headers={**headers, "Range": f"bytes={start + done}-{end}"},
+                    response=RangeResponse(part_path, start + done, progress, size=state["size"], check=check),
+                    retry=False)
+            except Exception:
+                self._save_state(state_path, state)
+                raise
+
+        await self.retry_policy.call(self.api.url(url).host or "", METHOD.GET.value, attempt, retry=True)
+
+    def _new_state(self, url: str, size: int) -> dict[str, Any]:
+        step = -(-size // self.segments)
+        return {
+            "url": url,
+            "size": size,
+            "validator": None,
+            "segments": [[start, min(start + step, size) - 1, 0] for start in range(0, size, step)]
+        }
+
+    def _load_state(self, state_path: str, url: str, size: int) -> Optional[dict[str, Any]]:
+        if not os.path.exists(state_path):
+            return None
+        with open(state_path) as file:
+            state = json.load(file)
+        if state["url"] != url or state["size"] != size:
+            return None
+        logger.info(f"Resuming {url} from {sum(segment[2] for segment in state['segments'])} of {size} bytes")
+        return state
+
+    def _save_state(self, state_path: str, state: dict[str, Any]) -> None:
+        with open(f"{state_path}.tmp", mode="w") as file:
+            json.dump(state, file)
+        os.replace(f"{state_path}.tmp", state_path)
+
+    def _preallocate(self, part_path: str, size: int) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(part_path)), exist_ok=True)
+        with open(part_path, mode="wb") as file:
+            file.truncate(size)
+            if hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(file.fileno(), 0, size)
+                except OSError:
+                    pass
+
+    def _cleanup(self, part_path: str, state_path: str) -> None:
+        for leftover in (part_path, state_path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
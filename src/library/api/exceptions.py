@@ -69,6 +69,11 @@ class HTTP_502_BAD_GATEWAY(HTTPException):
     def __init__(self, detail: Optional[str] = None):
         super().__init__(STATUS.HTTP_502_BAD_GATEWAY.value, detail)
 
+class HTTP_503_SERVICE_UNAVAILABLE(HTTPException):
+    """Used when another api is not available"""
+    def __init__(self, detail: Optional[str] = None):
+        super().__init__(STATUS.HTTP_503_SERVICE_UNAVAILABLE.value, detail)
+
 class HTTP_504_GATEWAY_TIMEOUT(HTTPException):
     """Used when a request to another api takes too long to process"""
     def __init__(self, detail: Optional[str] = None):
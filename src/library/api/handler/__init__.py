@@ -1,5 +1,5 @@
-from src.library.api.handler.response import RESPONSE, ResponseHandler, JsonResponse, StreamResponse, StreamFormat
-from src.library.api.handler.request import REQUEST, RequestHandler, JsonRequest, MultiPartRequest
+from src.library.api.handler.response import RESPONSE, ResponseHandler, CacheableResponse, JsonResponse, DecodeResponse, JsonStreamResponse, JsonArrayParser, StreamResponse, StreamFormat, HeadResponse, RangeResponse, RangeNotSatisfied
+from src.library.api.handler.request import REQUEST, RequestHandler, JsonRequest, MultiPartRequest, StreamRequest, UploadStream
 
 DEFAULT_RESPONSE = JsonResponse()
 DEFAULT_REQUEST = JsonRequest()
@@ -7,13 +7,22 @@ DEFAULT_REQUEST = JsonRequest()
 __all__ = [
     "RESPONSE",
     "ResponseHandler",
+    "CacheableResponse",
     "JsonResponse",
+    "DecodeResponse",
+    "JsonStreamResponse",
+    "JsonArrayParser",
     "StreamResponse",
     "StreamFormat",
+    "HeadResponse",
+    "RangeResponse",
+    "RangeNotSatisfied",
     "REQUEST",
     "RequestHandler",
     "JsonRequest",
     "MultiPartRequest",
+    "StreamRequest",
+    "UploadStream",
     "DEFAULT_RESPONSE",
     "DEFAULT_REQUEST"
 ]
\ No newline at end of file
@@ -1,9 +1,16 @@
+import os
+import time
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Optional, Union, TypeVar
+from typing import Any, AsyncIterable, AsyncIterator, Optional, Union, TypeVar
+from aiohttp import MultipartWriter
+from aiohttp.payload import AsyncIterablePayload
 from src.library.api.exceptions import HTTP_400_BAD_REQUEST
 
 REQUEST = TypeVar('REQUEST', bound="RequestHandler")
 
+CHUNK_SIZE = 64 * 1024
+
 class RequestHandler(ABC):
     """Abstract class for handling request data"""
     def set_use_body(self, use_body: bool) -> None:
@@ -30,7 +37,7 @@ class RequestHandler(ABC):
         if body:
             kwargs.update({"data": body})
         elif json:
-            kwargs.update({"json": body})
+            kwargs.update({"json": json})
         return kwargs
 
     @abstractmethod
@@ -65,4 +72,88 @@ class MultiPartRequest(RequestHandler):
 
     async def headers(self, headers: dict = {}) -> dict:
         headers.update({"Content-Type": "multipart/form-data"})
+        return headers
+
+class UploadStream:
+    """Async byte stream over a file path, bytes or an async byte iterator, measuring its throughput
+
+    File paths and bytes can be iterated again, so requests using them can be retried. Async iterators can only be sent once.
+
+    Args:
+        source (Union[str, bytes, AsyncIterable[bytes]]): File path, raw bytes or async byte iterator to send.
+        name (Optional[str], optional): File name of the stream. Defaults to the basename of a file path.
+        chunk_size (int, optional): Size of the chunks read from a file path. Defaults to CHUNK_SIZE.
+    """
+    def __init__(self,
+            source: Union[str, bytes, AsyncIterable[bytes]],
+            name: Optional[str] = None,
+            chunk_size: int = CHUNK_SIZE) -> None:
+        self.source = source
+        self.name = name or (os.path.basename(source) if isinstance(source, str) else "file")
+        self.chunk_size = chunk_size
+        self.sent = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        if isinstance(self.source, bytes):
+            for start in range(0, len(self.source), self.chunk_size):
+                yield self.source[start:start + self.chunk_size]
+        elif isinstance(self.source, str):
+            # File reads run in a worker thread, so a slow disk does not block the event loop between chunks
+            file = await asyncio.to_thread(open, self.source, mode="rb")
+            try:
+                while chunk := await asyncio.to_thread(file.read, self.chunk_size):
+                    yield chunk
+            finally:
+                file.close()
+        else:
+            async for chunk in self.source:
+                yield chunk
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        self.sent = 0
+        self.started = time.perf_counter()
+        self.finished = None
+        async for chunk in self._chunks():
+            self.sent += len(chunk)
+            yield chunk
+        self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rate(self) -> float:
+        """Bytes per second sent so far."""
+        return self.sent / self.elapsed if self.elapsed > 0 else 0.0
+
+class StreamRequest(RequestHandler):
+    """Stream a file path or async byte iterator in the request body, raw or as a multipart form field
+
+    Args:
+        field (Optional[str], optional): Multipart form field of the stream. Defaults to None (raw body).
+    """
+    def __init__(self, field: Optional[str] = None) -> None:
+        self.field = field
+
+    async def kwargs(self, query: dict[str, Any], json: dict[str, Any], body: Any, kwargs: dict) -> dict:
+        if not self.use_body:
+            raise HTTP_400_BAD_REQUEST("StreamRequest requires a method that uses a body")
+        stream = body if isinstance(body, UploadStream) else UploadStream(body)
+        payload = AsyncIterablePayload(stream)
+        if self.field is None:
+            data: Any = payload
+        else:
+            data = MultipartWriter("form-data")
+            part = data.append_payload(payload)
+            part.set_content_disposition("form-data", name=self.field, filename=stream.name)
+        return await super().kwargs(query, {}, data, kwargs)
+
+    async def headers(self, headers: dict = {}) -> dict:
+        if self.field is None:
+            headers.update({"Content-Type": "application/octet-stream"})
         return headers
\ No newline at end of file
@@ -1,10 +1,25 @@
+import os
+import re
+import hashlib
+import tempfile
 from enum import Enum
 from abc import ABC, abstractmethod
-from typing import Any, Optional, TypeVar
+from typing import Any, AsyncIterator, Callable, Hashable, Mapping, Optional, Sequence, TypeVar
 from aiohttp import ClientResponse
+from src.library.api.exceptions import HTTP_501_NOT_IMPLEMENTED, HTTP_502_BAD_GATEWAY
+from src.library.utils import json_loads
+from src.library.utils.hashing import HASH_ALGORITHMS
 
 RESPONSE = TypeVar('RESPONSE', bound="ResponseHandler")
 
+CHUNK_SIZE = 64 * 1024
+STATUS_PARTIAL_CONTENT = 206
+CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+# Everything up to the next bracket outside strings, and the bracket. It does not match while a string is incomplete
+JSON_BRACKET = re.compile(rb'[^"\[\]{}]*+(?:"[^"\\]*+(?:\\.[^"\\]*+)*+"[^"\[\]{}]*+)*+([\[\]{}])')
+JSON_COMMA = re.compile(rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"|,')
+
 class ResponseHandler(ABC):
     """Abstract class for handling response data"""
     FAKE_RESPONSE: Any
@@ -42,10 +57,30 @@ class ResponseHandler(ABC):
         """
         pass
 
+    def key(self) -> Hashable:
+        """Identify how the handler processes a response, so only requests with equivalent handlers share one HTTP call.
+
+        Returns:
+            Hashable: Type of the handler, with the settings changing its result.
+        """
+        return type(self)
+
     def response(self) -> Optional[ClientResponse]:
         return self._response
 
-class JsonResponse(ResponseHandler):
+class CacheableResponse(ResponseHandler):
+    """Abstract class for handlers whose response can be rebuilt from its raw body, so GET responses can be cached"""
+
+    @abstractmethod
+    async def load(self, body: bytes) -> None:
+        """Process a raw response body, used when the response comes from a cache.
+
+        Args:
+            body (bytes): Raw response body.
+        """
+        pass
+
+class JsonResponse(CacheableResponse):
     """Receive JSON data from the response body"""
     FAKE_RESPONSE: Any = {"successful": True, "message": "Fake Response", "data": {}}
 
@@ -56,9 +91,12 @@ class JsonResponse(ResponseHandler):
         self._json = dict(response)
 
     async def handle(self, response: ClientResponse) -> None:
-        self._json = await response.json()
+        self._json = await response.json(loads=json_loads)
         self._response = response
 
+    async def load(self, body: bytes) -> None:
+        self._json = json_loads(body)
+
     async def headers(self, headers: dict = {}) -> dict:
         headers.update({"Accept": "application/json"})
         return headers
@@ -73,29 +111,263 @@ class JsonResponse(ResponseHandler):
             raise ValueError("Response has not data.")
         return self._json
 
+class JsonArrayParser:
+    """Split a JSON array into the raw bodies of its items while it is received.
+
+    The body is scanned from bracket to bracket with a regular expression, commas being looked for only between the items of the array,
+    so each byte is inspected once whatever the chunk boundaries. Only the incomplete item at the end of the received data is buffered.
+    """
+    def __init__(self) -> None:
+        self._buffer = b""
+        self._position = 0
+        self._start = 0
+        self._depth = 0
+        self._done = False
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        """Add a chunk of the body.
+
+        Args:
+            chunk (bytes): Next chunk of the body.
+
+        Raises:
+            ValueError: If the body is not a JSON array.
+
+        Returns:
+            list[bytes]: Raw bodies of the items completed by the chunk.
+        """
+        if self._done:
+            return []
+        buffer = self._buffer + chunk
+        position, start, depth = self._position, self._start, self._depth
+        items: list[bytes] = []
+        while (match := JSON_BRACKET.match(buffer, position)) is not None:
+            bracket, end = match.group(1), match.start(1)
+            if depth == 0:
+                if bracket != b"[" or buffer[position:end].strip():
+                    raise ValueError("Response body is not a JSON array")
+                start = match.end()
+            elif depth == 1:
+                for comma in JSON_COMMA.finditer(buffer, position, end):
+                    if comma.group() == b",":
+                        items.append(buffer[start:comma.start()])
+                        start = comma.end()
+                if bracket == b"]":
+                    if buffer[start:end].strip():
+                        items.append(buffer[start:end])
+                    self._done = True
+                    self._buffer = b""
+                    return items
+            depth += 1 if bracket in b"[{" else -1
+            position = match.end()
+        if depth == 0 and buffer[position:].strip():
+            raise ValueError("Response body is not a JSON array")
+        offset = start if depth else position
+        self._buffer = buffer[offset:]
+        self._position, self._start, self._depth = position - offset, start - offset, depth
+        return items
+
+    def close(self) -> None:
+        """Check that the whole array has been received.
+
+        Raises:
+            ValueError: If the body ended before the end of the array.
+        """
+        if not self._done:
+            raise ValueError("Response body ended before the end of the JSON array")
+
+class JsonStreamResponse(ResponseHandler):
+    """Receive the items of a JSON array response body as they arrive
+
+    With HttpAPI._stream, items are yielded while the body is received, so callers get the first items early and can stop reading at any point.
+    With HttpAPI._request, the items are collected in a list.
+
+    Args:
+        decode (Callable[[bytes], Any], optional): Decoder for the raw body of each item. Defaults to json_loads.
+    """
+    FAKE_RESPONSE: Any = []
+
+    def __init__(self, decode: Callable[[bytes], Any] = json_loads) -> None:
+        self._response = None
+        self.decode = decode
+        self._items: Optional[list] = None
+
+    async def set_response(self, response: Any) -> None:
+        self._items = list(response)
+
+    async def handle(self, response: ClientResponse) -> None:
+        self._response = response
+        self._items = [item async for item in self.iter_items(response)]
+
+    async def headers(self, headers: dict = {}) -> dict:
+        headers.update({"Accept": "application/json"})
+        return headers
+
+    async def iter_items(self, response: ClientResponse) -> AsyncIterator[Any]:
+        """Iterate over the items of the response body as soon as each one is received.
+
+        Args:
+            response (ClientResponse): ClientResponse object from the request.
+
+        Raises:
+            ValueError: If the body is not a complete JSON array.
+
+        Yields:
+            Any: Next decoded item.
+        """
+        self._response = response
+        parser = JsonArrayParser()
+        async for chunk in response.content.iter_any():
+            for item in parser.feed(chunk):
+                yield self.decode(item)
+        parser.close()
+
+    def items(self) -> list:
+        """Return the decoded items of the response body.
+
+        Returns:
+            list: Decoded items.
+        """
+        if self._items is None:
+            raise ValueError("Response has not data.")
+        return self._items
+
 class StreamFormat(Enum):
     """Stream data format for the StreamResponse"""
     OCTET_STREAM = "application/octet-stream"
     XTARGZ = "application/x-targz"
 
+class DecodeResponse(JsonResponse):
+    """Decode the raw JSON response body with a custom decoder, such as a model loader
+
+    Concurrent identical requests only share one HTTP call when their handlers use the same decoder, so declare handlers once instead of building a decoder per call.
+
+    Args:
+        decode (Callable[[bytes], Any]): Decoder for the raw body.
+    """
+    def __init__(self, decode: Callable[[bytes], Any] = json_loads) -> None:
+        super().__init__()
+        self.decode = decode
+        self._value: Any = None
+
+    async def set_response(self, response: Any) -> None:
+        self._value = response
+
+    async def handle(self, response: ClientResponse) -> None:
+        self._response = response
+        await self.load(await response.read())
+
+    async def load(self, body: bytes) -> None:
+        self._value = self.decode(body)
+
+    def key(self) -> Hashable:
+        return (type(self), self.decode)
+
+    def value(self) -> Any:
+        """Return the decoded response body."""
+        return self._value
+
 class StreamResponse(ResponseHandler):
-    """Receive Stream data from the response body"""
+    """Receive Stream data from the response body
+
+    By default the whole body is buffered in memory. Use download_to to get a handler that streams the body to a file instead.
+
+    Args:
+        format (StreamFormat, optional): Expected stream format. Defaults to StreamFormat.OCTET_STREAM.
+        path (Optional[str], optional): Destination file for the body. Defaults to None (keep the body in memory).
+        expected (dict[str, str], optional): Expected digests by hash algorithm, checked before the file is moved into place. Defaults to {}.
+        algorithms (Sequence[str], optional): Hash algorithms computed while streaming. Defaults to HASH_ALGORITHMS.
+        chunk_size (int, optional): Size of the chunks read from the response. Defaults to CHUNK_SIZE.
+    """
     FAKE_RESPONSE: Any = b""
 
-    def __init__(self, format: StreamFormat = StreamFormat.OCTET_STREAM) -> None:
+    def __init__(self,
+            format: StreamFormat = StreamFormat.OCTET_STREAM,
+            path: Optional[str] = None,
+            expected: dict[str, str] = {},
+            algorithms: Sequence[str] = HASH_ALGORITHMS,
+            chunk_size: int = CHUNK_SIZE) -> None:
         self._stream: Optional[bytes] = None
         self._format: StreamFormat = format
+        self._path: Optional[str] = path
+        self._expected: dict[str, str] = dict(expected)
+        self._algorithms: tuple[str, ...] = tuple(dict.fromkeys([*algorithms, *expected]))
+        self._chunk_size: int = chunk_size
+        self._hashes: dict[str, str] = {}
     
+    def download_to(self, path: str, expected: dict[str, str] = {}) -> "StreamResponse":
+        """Create a handler that streams the response body to a file.
+
+        The body is written to a temporary file next to path, hashed while streaming and atomically renamed once complete.
+
+        Args:
+            path (str): Destination file for the body.
+            expected (dict[str, str], optional): Expected digests by hash algorithm, like Modrinth files[].hashes. Defaults to {}.
+
+        Returns:
+            StreamResponse: New handler writing to path.
+        """
+        return StreamResponse(
+            format=self._format,
+            path=path,
+            expected=expected,
+            algorithms=self._algorithms,
+            chunk_size=self._chunk_size)
+
     async def set_response(self, response: Any) -> None:
         self._stream = bytes(response)
 
     async def handle(self, response: ClientResponse) -> None:
-        self._stream = await response.read()
         self._response = response
+        if self._path is None:
+            self._stream = await response.read()
+        else:
+            await self._write(response, self._path)
 
     async def headers(self, headers: dict = {}) -> dict:
         headers.update({"Accept": self._format.value})
         return headers
+
+    async def iter_chunks(self, response: ClientResponse) -> AsyncIterator[bytes]:
+        """Iterate over the response body, updating the digests as chunks arrive.
+
+        Args:
+            response (ClientResponse): ClientResponse object from the request.
+
+        Yields:
+            bytes: Next chunk of the response body.
+        """
+        hashers = {algorithm: hashlib.new(algorithm) for algorithm in self._algorithms}
+        async for chunk in response.content.iter_chunked(self._chunk_size):
+            for hasher in hashers.values():
+                hasher.update(chunk)
+            yield chunk
+        self._hashes = {algorithm: hasher.hexdigest() for algorithm, hasher in hashers.items()}
+
+    async def _write(self, response: ClientResponse, path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".part")
+        try:
+            with os.fdopen(fd, mode="wb") as file:
+                async for chunk in self.iter_chunks(response):
+                    file.write(chunk)
+            self.verify()
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def verify(self) -> None:
+        """Check the computed digests against the expected ones.
+
+        Raises:
+            HTTP_502_BAD_GATEWAY: If any digest does not match.
+        """
+        for algorithm, digest in self._expected.items():
+            if self._hashes.get(algorithm) != digest.lower():
+                raise HTTP_502_BAD_GATEWAY(f"Downloaded file {algorithm} mismatch: expected {digest}, got {self._hashes.get(algorithm)}")
     
     def stream(self) -> bytes:
         """Return the stream data from the response body.
@@ -105,4 +377,111 @@ class StreamResponse(ResponseHandler):
         """
         if self._stream is None:
             raise ValueError("Response has not data.")
-        return self._stream
\ No newline at end of file
+        return self._stream
+
+    def path(self) -> str:
+        """Return the file the response body was written to.
+
+        Returns:
+            str: Destination file of the response body.
+        """
+        if self._path is None or not self._hashes:
+            raise ValueError("Response has not been written to a file.")
+        return self._path
+
+    def hashes(self) -> dict[str, str]:
+        """Return the digests computed while streaming the response body.
+
+        Returns:
+            dict[str, str]: Hex digests by hash algorithm.
+        """
+        return dict(self._hashes)
+
+class HeadResponse(ResponseHandler):
+    """Receive only the headers of the response"""
+    FAKE_RESPONSE: Any = {}
+
+    def __init__(self) -> None:
+        self._headers: Optional[dict[str, str]] = None
+
+    async def set_response(self, response: Any) -> None:
+        self._headers = dict(response)
+
+    async def handle(self, response: ClientResponse) -> None:
+        self._headers = dict(response.headers)
+        self._response = response
+
+    async def headers(self, headers: dict = {}) -> dict:
+        return headers
+
+    def response_headers(self) -> dict[str, str]:
+        """Return the headers of the response.
+
+        Returns:
+            dict[str, str]: Response headers.
+        """
+        if self._headers is None:
+            raise ValueError("Response has not data.")
+        return self._headers
+
+class RangeNotSatisfied(HTTP_501_NOT_IMPLEMENTED):
+    """Used when the server ignores a range request, or answers it with another range"""
+
+class RangeResponse(ResponseHandler):
+    """Write a partial (206) response body at its offset of an existing file
+
+    The Content-Range of the response must start at offset, and announce size as the complete length when it is given, before anything is written.
+
+    Args:
+        path (str): File the body is written into. It must already exist.
+        offset (int): Position of the first byte of the body in the file.
+        progress (Callable[[int], None], optional): Called with the size of every chunk written. Defaults to None.
+        chunk_size (int, optional): Size of the chunks read from the response. Defaults to CHUNK_SIZE.
+        size (Optional[int], optional): Complete length of the file. Defaults to None (not checked).
+        check (Callable[[Mapping[str, str]], None], optional): Called with the response headers before writing, may raise to reject the response. Defaults to None.
+    """
+    FAKE_RESPONSE: Any = b""
+
+    def __init__(self,
+            path: str,
+            offset: int,
+            progress: Optional[Callable[[int], None]] = None,
+            chunk_size: int = CHUNK_SIZE,
+            size: Optional[int] = None,
+            check: Optional[Callable[[Mapping[str, str]], None]] = None) -> None:
+        self._path = path
+        self._offset = offset
+        self._progress = progress
+        self._chunk_size = chunk_size
+        self._size = size
+        self._check = check
+        self._written = 0
+
+    async def set_response(self, response: Any) -> None:
+        self._written = 0
+
+    async def handle(self, response: ClientResponse) -> None:
+        self._response = response
+        if response.status != STATUS_PARTIAL_CONTENT:
+            raise RangeNotSatisfied(f"Server answered a range request with status {response.status}")
+        content_range = response.headers.get("Content-Range", "")
+        match = CONTENT_RANGE.fullmatch(content_range.strip())
+        if match is None or int(match.group(1)) != self._offset or (self._size is not None and match.group(3) != str(self._size)):
+            raise RangeNotSatisfied(f"Server answered a range request from {self._offset} with Content-Range {content_range!r}")
+        if self._check is not None:
+            self._check(response.headers)
+        with open(self._path, mode="r+b") as file:
+            file.seek(self._offset)
+            async for chunk in response.content.iter_chunked(self._chunk_size):
+                file.write(chunk)
+                self._written += len(chunk)
+                if self._progress is not None:
+                    self._progress(len(chunk))
+
+    async def headers(self, headers: dict = {}) -> dict:
+        headers.update({"Accept": StreamFormat.OCTET_STREAM.value})
+        return headers
+
+    def written(self) -> int:
+        """Return the number of bytes written to the file."""
+        return self._written
@@ -0,0 +1,150 @@
+import asyncio
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+from src.library.utils import getenv
+
+__all__ = [
+    "Paginator",
+    "PagePaginator",
+    "OffsetPaginator",
+    "paginate",
+    "PAGE_READ_AHEAD"
+]
+
+PAGE_READ_AHEAD = int(getenv("PAGE_READ_AHEAD", "1"))
+
+class Paginator(ABC):
+    """Describe how a list endpoint splits its results in pages"""
+
+    @abstractmethod
+    def first(self, query: dict[str, Any]) -> dict[str, Any]:
+        """Add the parameters of the first page to the query of the request."""
+        pass
+
+    @abstractmethod
+    def items(self, body: Any) -> list:
+        """Extract the items of a page from its decoded body."""
+        pass
+
+    @abstractmethod
+    def size(self, query: dict[str, Any]) -> int:
+        """Number of items of the page of query, unless it is the last page."""
+        pass
+
+    @abstractmethod
+    def next(self, query: dict[str, Any], body: Any) -> Optional[dict[str, Any]]:
+        """Build the query of the page following query.
+
+        Args:
+            query (dict[str, Any]): Query of a page, not necessarily the one of body.
+            body (Any): Decoded body of any received page, holding the totals of the list.
+
+        Returns:
+            Optional[dict[str, Any]]: Query of the next page, None if query is the last page.
+        """
+        pass
+
+class PagePaginator(Paginator):
+    """Numbered pages with a meta.pagination object, as in the Pterodactyl API
+
+    Args:
+        per_page (int, optional): Items per page. Defaults to 50.
+        key (str, optional): Key of the items in the body. Defaults to "data".
+    """
+    def __init__(self, per_page: int = 50, key: str = "data") -> None:
+        self.per_page = per_page
+        self.key = key
+
+    def first(self, query: dict[str, Any]) -> dict[str, Any]:
+        return {**query, "page": 1, "per_page": self.per_page}
+
+    def items(self, body: Any) -> list:
+        return body[self.key]
+
+    def size(self, query: dict[str, Any]) -> int:
+        return query["per_page"]
+
+    def next(self, query: dict[str, Any], body: Any) -> Optional[dict[str, Any]]:
+        pagination = body.get("meta", {}).get("pagination", {})
+        if query["page"] >= pagination.get("total_pages", 1):
+            return None
+        return {**query, "page": query["page"] + 1}
+
+class OffsetPaginator(Paginator):
+    """Offset and limit pages with the total count in the body, as in the Modrinth search
+
+    Args:
+        limit (int, optional): Items per page. Defaults to 100.
+        key (str, optional): Key of the items in the body. Defaults to "hits".
+        total (str, optional): Key of the total number of items in the body. Defaults to "total_hits".
+    """
+    def __init__(self, limit: int = 100, key: str = "hits", total: str = "total_hits") -> None:
+        self.limit = limit
+        self.key = key
+        self.total = total
+
+    def first(self, query: dict[str, Any]) -> dict[str, Any]:
+        return {**query, "offset": 0, "limit": self.limit}
+
+    def items(self, body: Any) -> list:
+        return body[self.key]
+
+    def size(self, query: dict[str, Any]) -> int:
+        return query["limit"]
+
+    def next(self, query: dict[str, Any], body: Any) -> Optional[dict[str, Any]]:
+        offset = query["offset"] + query["limit"]
+        if offset >= body.get(self.total, 0):
+            return None
+        return {**query, "offset": offset}
+
+async def paginate(
+        fetch: Callable[[dict[str, Any]], Awaitable[Any]],
+        paginator: Paginator,
+        query: dict[str, Any] = {},
+        read_ahead: int = PAGE_READ_AHEAD,
+    ) -> AsyncIterator[Any]:
+    """Iterate over the items of every page of a list, fetching the next pages while the current one is consumed.
+
+    Pending page requests are cancelled when the iterator is closed, like when a consumer using contextlib.aclosing stops early.
+
+    Args:
+        fetch (Callable[[dict[str, Any]], Awaitable[Any]]): Fetch the decoded body of the page for a query.
+        paginator (Paginator): Pagination scheme of the list.
+        query (dict[str, Any], optional): Query of the request, without pagination parameters. Defaults to {}.
+        read_ahead (int, optional): Pages requested ahead of the page being consumed, 0 to fetch pages on demand. Defaults to PAGE_READ_AHEAD.
+
+    Yields:
+        Any: Next item of the list.
+    """
+    last = paginator.first(query)
+    pending: deque[tuple[dict[str, Any], asyncio.Future]] = deque([(last, asyncio.ensure_future(fetch(last)))])
+
+    def schedule(body: Any) -> bool:
+        nonlocal last
+        following = paginator.next(last, body)
+        if following is None:
+            return False
+        last = following
+        pending.append((following, asyncio.ensure_future(fetch(following))))
+        return True
+
+    try:
+        while pending:
+            page, task = pending.popleft()
+            body = await task
+            while len(pending) < read_ahead and schedule(body):
+                pass
+            items = paginator.items(body)
+            for item in items:
+                yield item
+            # An empty or short page ends the list, even if the totals announced more items
+            if len(items) < paginator.size(page):
+                break
+            if not pending:
+                schedule(body)
+    finally:
+        for _, task in pending:
+            task.cancel()
+        await asyncio.gather(*[task for _, task in pending], return_exceptions=True)
@@ -0,0 +1,183 @@
+import math
+import time
+import asyncio
+import logging
+from typing import Mapping, Optional
+from src.library.utils import getenv
+
+__all__ = [
+    "TokenBucket",
+    "RateLimiter",
+    "DEFAULT_RATE_LIMITER"
+]
+
+logger = logging.getLogger("RateLimiter")
+
+RATE_LIMIT_RETRIES = int(getenv("RATE_LIMIT_RETRIES", "3"))
+
+HEADER_LIMIT = "X-Ratelimit-Limit"
+HEADER_REMAINING = "X-Ratelimit-Remaining"
+HEADER_RESET = "X-Ratelimit-Reset"
+HEADER_RETRY_AFTER = "Retry-After"
+STATUS_TOO_MANY_REQUESTS = 429
+THROTTLE_THRESHOLD = 0.001
+
+def header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    try:
+        return float(headers[name])
+    except (KeyError, ValueError):
+        return None
+
+class TokenBucket:
+    """Token bucket that queues callers in FIFO order until a token is available.
+
+    The queue is created in the running event loop, so a bucket can be used by successive event loops.
+
+    Args:
+        per_minute (Optional[float], optional): Tokens refilled per minute, also the bucket capacity. Defaults to None (no limit until the server reports one).
+    """
+    def __init__(self, per_minute: Optional[float] = None) -> None:
+        self.capacity = math.inf
+        self.rate: Optional[float] = None
+        self.tokens = math.inf
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        if per_minute is not None:
+            self.limit(per_minute)
+
+    def limit(self, per_minute: float) -> None:
+        """Set the tokens refilled per minute, also the bucket capacity."""
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = min(self.tokens, per_minute)
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _queue(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    async def acquire(self) -> float:
+        """Take a token, waiting for the bucket to refill or a server block to expire.
+
+        Returns:
+            float: Seconds spent waiting, including the time queued behind other callers.
+        """
+        start = time.monotonic()
+        async with self._queue():
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self.blocked_until - now
+                if self.rate is not None and self.tokens < 1:
+                    delay = max(delay, (1 - self.tokens) / self.rate)
+                if delay <= 0:
+                    self.tokens -= 1
+                    return now - start
+                await asyncio.sleep(delay)
+
+    def update(self, limit: Optional[float], remaining: Optional[float], reset: Optional[float]) -> None:
+        """Adapt the bucket to the budget reported by the server.
+
+        Args:
+            limit (Optional[float]): Requests allowed per window.
+            remaining (Optional[float]): Requests left in the current window.
+            reset (Optional[float]): Seconds until the window resets.
+        """
+        self._refill(time.monotonic())
+        if limit is not None and limit > 0:
+            self.limit(limit)
+        if remaining is not None:
+            self.tokens = min(self.tokens, remaining)
+            if remaining < 1 and reset is not None:
+                self.block(reset)
+
+    def block(self, seconds: float) -> None:
+        """Hold every caller for the given number of seconds."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+class RateLimiter:
+    """Client side rate limiter with one token bucket per host.
+
+    Buckets adapt to the X-Ratelimit-* and Retry-After response headers, and track how long callers were throttled.
+    Hosts without a configured budget are not throttled until their responses report a limit.
+
+    Args:
+        limits (Mapping[str, float], optional): Initial request budget per minute by host. Defaults to {}.
+        per_minute (Optional[float], optional): Initial request budget per minute of the other hosts. Defaults to None (no limit).
+    """
+    def __init__(self, limits: Mapping[str, float] = {}, per_minute: Optional[float] = None) -> None:
+        self.limits = dict(limits)
+        self.per_minute = per_minute
+        self._buckets: dict[str, TokenBucket] = {}
+        self._metrics: dict[str, dict[str, float]] = {}
+
+    def setdefault(self, host: str, per_minute: float) -> None:
+        """Set the initial request budget per minute of host, unless one is already configured.
+
+        Args:
+            host (str): Host of the requests.
+            per_minute (float): Requests allowed per minute.
+        """
+        if host in self.limits:
+            return
+        self.limits[host] = per_minute
+        if host in self._buckets:
+            self._buckets[host].limit(per_minute)
+
+    def bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.limits.get(host, self.per_minute))
+            self._metrics[host] = {"requests": 0, "throttled": 0, "throttled_seconds": 0.0, "rate_limited": 0}
+        return self._buckets[host]
+
+    async def acquire(self, host: str) -> None:
+        """Wait for the budget of host to allow one more request.
+
+        Args:
+            host (str): Host of the request.
+        """
+        waited = await self.bucket(host).acquire()
+        metrics = self._metrics[host]
+        metrics["requests"] += 1
+        if waited > THROTTLE_THRESHOLD:
+            metrics["throttled"] += 1
+            metrics["throttled_seconds"] += waited
+
+    def update(self, host: str, status: int, headers: Optional[Mapping[str, str]]) -> None:
+        """Adapt the budget of host from a response.
+
+        Args:
+            host (str): Host of the request.
+            status (int): Response status code.
+            headers (Optional[Mapping[str, str]]): Response headers.
+        """
+        bucket = self.bucket(host)
+        headers = headers or {}
+        bucket.update(
+            header_float(headers, HEADER_LIMIT),
+            header_float(headers, HEADER_REMAINING),
+            header_float(headers, HEADER_RESET))
+        if status == STATUS_TOO_MANY_REQUESTS:
+            self._metrics[host]["rate_limited"] += 1
+            retry_after = header_float(headers, HEADER_RETRY_AFTER) or header_float(headers, HEADER_RESET) or (1 / bucket.rate if bucket.rate else 1.0)
+            logger.warning(f"Rate limited by {host}, holding requests for {retry_after} seconds")
+            bucket.block(retry_after)
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        """Return the request and throttling counters by host.
+
+        Returns:
+            dict[str, dict[str, float]]: requests, throttled, throttled_seconds and rate_limited counters by host.
+        """
+        return {host: dict(metrics) for host, metrics in self._metrics.items()}
+
+DEFAULT_RATE_LIMITER = RateLimiter()
@@ -0,0 +1,171 @@
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+from aiohttp import ClientConnectionError, ClientPayloadError, ClientResponseError
+from src.library.api.exceptions import HTTPException
+from src.library.utils import getenv
+
+__all__ = [
+    "RetryBudget",
+    "RetryPolicy",
+    "DEFAULT_RETRY_POLICY"
+]
+
+logger = logging.getLogger("RetryPolicy")
+
+RETRY_ATTEMPTS = int(getenv("RETRY_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(getenv("RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(getenv("RETRY_MAX_DELAY", "10"))
+RETRY_DEADLINE = float(getenv("RETRY_DEADLINE", "30"))
+RETRY_BUDGET_RATIO = float(getenv("RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN = float(getenv("RETRY_BUDGET_MIN", "10"))
+RETRY_BUDGET_WINDOW = float(getenv("RETRY_BUDGET_WINDOW", "10"))
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# 429 is not listed, rate limited requests are already queued again by the rate limiter
+RETRYABLE_STATUS = {408, 500, 502, 503, 504}
+
+T = TypeVar("T")
+
+class RetryBudget:
+    """Limit the retries sent to a host to a share of its recent requests, so retries cannot multiply the load of a failing host.
+
+    Over the last window seconds, retries are allowed up to minimum plus ratio times the requests sent.
+    The floor lets a host with little traffic be retried at all, the ratio bounds the retries of a busy host to a share of its traffic.
+
+    Args:
+        ratio (float, optional): Retries allowed per request. Defaults to RETRY_BUDGET_RATIO.
+        minimum (float, optional): Retries allowed per window, even without requests. Defaults to RETRY_BUDGET_MIN.
+        window (float, optional): Seconds during which requests and retries are counted. Defaults to RETRY_BUDGET_WINDOW.
+    """
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, minimum: float = RETRY_BUDGET_MIN, window: float = RETRY_BUDGET_WINDOW) -> None:
+        self.ratio = ratio
+        self.minimum = minimum
+        self.window = window
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+
+    def _expire(self, now: float) -> None:
+        for events in (self._requests, self._retries):
+            while events and events[0] <= now - self.window:
+                events.popleft()
+
+    def capacity(self) -> float:
+        """Return the number of retries allowed in the current window, those already sent included."""
+        self._expire(time.monotonic())
+        return self.minimum + self.ratio * len(self._requests)
+
+    def deposit(self) -> None:
+        now = time.monotonic()
+        self._expire(now)
+        self._requests.append(now)
+
+    def withdraw(self) -> bool:
+        """Count a retry, if the budget allows it.
+
+        Returns:
+            bool: Whether the retry is allowed.
+        """
+        capacity = self.capacity()
+        if len(self._retries) + 1 > capacity:
+            return False
+        self._retries.append(time.monotonic())
+        return True
+
+class RetryPolicy:
+    """Single retry policy for the requests of the HTTP clients.
+
+    Only transient failures are retried: connection errors, timeouts, truncated bodies and 408/5xx statuses.
+    Only idempotent methods are retried, unless a request is explicitly marked as safe to retry.
+    Delays use full jitter exponential backoff, bounded by a deadline for the whole call and by a retry budget per host.
+
+    Args:
+        attempts (int, optional): Maximum attempts per call, the first one included. Defaults to RETRY_ATTEMPTS.
+        base_delay (float, optional): Backoff delay before jitter of the first retry, in seconds. Defaults to RETRY_BASE_DELAY.
+        max_delay (float, optional): Maximum backoff delay before jitter, in seconds. Defaults to RETRY_MAX_DELAY.
+        deadline (float, optional): Time after which a call is not retried anymore, in seconds. Defaults to RETRY_DEADLINE.
+        budget_ratio (float, optional): Retries allowed per request to a host. Defaults to RETRY_BUDGET_RATIO.
+        budget_min (float, optional): Retries allowed per budget window to a host, even without requests. Defaults to RETRY_BUDGET_MIN.
+        budget_window (float, optional): Seconds during which the requests and retries of a host are counted. Defaults to RETRY_BUDGET_WINDOW.
+    """
+    def __init__(self,
+            attempts: int = RETRY_ATTEMPTS,
+            base_delay: float = RETRY_BASE_DELAY,
+            max_delay: float = RETRY_MAX_DELAY,
+            deadline: float = RETRY_DEADLINE,
+            budget_ratio: float = RETRY_BUDGET_RATIO,
+            budget_min: float = RETRY_BUDGET_MIN,
+            budget_window: float = RETRY_BUDGET_WINDOW,
+            ) -> None:
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.budget_ratio = budget_ratio
+        self.budget_min = budget_min
+        self.budget_window = budget_window
+        self._budgets: dict[str, RetryBudget] = {}
+        self.stats: dict[str, int] = {"calls": 0, "retries": 0, "permanent": 0, "exhausted": 0}
+        self.retries: dict[str, int] = {}
+
+    @staticmethod
+    def transient(error: BaseException) -> bool:
+        """Whether an error may not happen again when the request is sent again.
+
+        An HTTPException translated from a client error, as raised by HttpAPI._request, is classified by that client error.
+        """
+        if isinstance(error, HTTPException) and error.__cause__ is not None:
+            return RetryPolicy.transient(error.__cause__)
+        if isinstance(error, ClientResponseError):
+            return error.status in RETRYABLE_STATUS
+        return isinstance(error, (ClientConnectionError, ClientPayloadError, asyncio.TimeoutError))
+
+    def delay(self, attempt: int) -> float:
+        """Full jitter backoff delay before the retry following attempt (0 based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def budget(self, host: str) -> RetryBudget:
+        budget = self._budgets.get(host)
+        if budget is None:
+            budget = self._budgets[host] = RetryBudget(self.budget_ratio, self.budget_min, self.budget_window)
+        return budget
+
+    async def call(self, host: str, method: str, fun: Callable[[], Awaitable[T]], retry: Optional[bool] = None) -> T:
+        """Run a request, retrying it while its failures are transient and the policy allows it.
+
+        Args:
+            host (str): Host of the request, used for the retry budget and the counts.
+            method (str): HTTP method of the request.
+            fun (Callable[[], Awaitable[T]]): Send the request.
+            retry (Optional[bool], optional): True if the request is safe to retry, False to never retry it. Defaults to None (retry idempotent methods).
+
+        Returns:
+            T: Result of the first successful attempt.
+        """
+        retryable = method in IDEMPOTENT_METHODS if retry is None else retry
+        budget = self.budget(host)
+        budget.deposit()
+        self.stats["calls"] += 1
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            try:
+                return await fun()
+            except Exception as e:
+                if not (retryable and self.transient(e)):
+                    self.stats["permanent"] += 1
+                    raise
+                delay = self.delay(attempt)
+                attempt += 1
+                if attempt >= self.attempts or time.monotonic() + delay > deadline or not budget.withdraw():
+                    self.stats["exhausted"] += 1
+                    raise
+                self.stats["retries"] += 1
+                self.retries[host] = self.retries.get(host, 0) + 1
+                logger.warning(f"Retrying {method} request to {host} in {delay:.2f} seconds (attempt {attempt + 1} of {self.attempts}): {e!r}")
+                await asyncio.sleep(delay)
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
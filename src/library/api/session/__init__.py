@@ -1,3 +1,4 @@
+import hashlib
 from abc import ABC, abstractmethod
 from aiohttp import ClientSession
 from pydantic import SecretStr
@@ -18,6 +19,14 @@ class AuthorizedSession(ABC):
         """
         pass
 
+    def identity(self) -> str:
+        """Identify the credentials of the session without revealing them, so responses of different credentials are cached apart.
+
+        Returns:
+            str: Identity of the credentials, "" for anonymous sessions.
+        """
+        return ""
+
 class NoAuthSession(AuthorizedSession):
     """Session class for no authorization"""
     async def headers(self, session: ClientSession, headers: dict = {}) -> dict:
@@ -39,7 +48,11 @@ class TokenSession(AuthorizedSession):
         self.__token: SecretStr = token
         self.__scheme: Optional[str] = scheme
         self.__parameter: str = parameter
+        self.__identity: str = hashlib.sha256(f"{parameter}:{scheme}{token.get_secret_value()}".encode()).hexdigest()[:32]
         super().__init__()
+
+    def identity(self) -> str:
+        return self.__identity
     
     async def headers(self, session: ClientSession, headers: dict = {}) -> dict:
         headers.update({self.__parameter: f"{self.__scheme}{self.__token.get_secret_value()}"})
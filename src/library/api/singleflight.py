@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Mapping, TypeVar
+
+__all__ = [
+    "SingleFlight"
+]
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into a single execution.
+
+    Every caller waiting on a key gets the same result or exception. The shared call runs as its own task, so cancelling one caller does not cancel it for the others.
+    """
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.stats: dict[str, int] = {"calls": 0, "shared": 0}
+
+    @staticmethod
+    def normalize(query: Mapping[str, Any]) -> tuple[tuple[str, str], ...]:
+        """Build a hashable, order independent representation of query parameters."""
+        return tuple(sorted((name, str(value)) for name, value in query.items()))
+
+    async def do(self, key: Hashable, fun: Callable[[], Awaitable[T]]) -> T:
+        """Run fun, or join the call already in flight for key.
+
+        Args:
+            key (Hashable): Identity of the call.
+            fun (Callable[[], Awaitable[T]]): Call to run if none is in flight.
+
+        Returns:
+            T: Result of the shared call.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fun())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+            self.stats["calls"] += 1
+        else:
+            self.stats["shared"] += 1
+        return await asyncio.shield(task)
+
+    def metrics(self) -> dict[str, int]:
+        """Return the number of executed calls and of calls that joined one in flight."""
+        return dict(self.stats)
@@ -1,10 +1,23 @@
 import asyncio
 import backoff
 from functools import wraps
-from aiohttp import ClientResponse, ConnectionTimeoutError, ClientResponseError, ClientConnectionError, ServerConnectionError
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, TypeVar
+from aiohttp import ClientResponse, ConnectionTimeoutError, ClientResponseError, ServerConnectionError
 from src.library.api.exceptions import *
 from src.library.utils import WRAP
 
+GEN = TypeVar("GEN", bound=Callable[..., AsyncIterator])
+
+STATUS_EXCEPTIONS: dict[int, type[HTTPException]] = {
+    STATUS.HTTP_400_BAD_REQUEST.value: HTTP_400_BAD_REQUEST,
+    STATUS.HTTP_401_UNAUTHORIZED.value: HTTP_401_UNAUTHORIZED,
+    STATUS.HTTP_403_FORBIDDEN.value: HTTP_403_FORBIDDEN,
+    STATUS.HTTP_404_NOT_FOUND.value: HTTP_404_NOT_FOUND,
+    STATUS.HTTP_405_METHOD_NOT_ALLOWED.value: HTTP_405_METHOD_NOT_ALLOWED,
+    STATUS.HTTP_408_REQUEST_TIMEOUT.value: HTTP_408_REQUEST_TIMEOUT,
+}
+
 class FakeResponse(Exception): ...
 
 def handle_auth(func: WRAP) -> WRAP:
@@ -18,20 +31,43 @@ def handle_auth(func: WRAP) -> WRAP:
             raise Exception("Authentication has failed") from e
     return wrapper # type: ignore
 
+def http_exception(e: Exception) -> HTTPException:
+    """Translate an exception raised while sending a request into an HTTPException."""
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, ServerConnectionError):
+        return HTTP_502_BAD_GATEWAY(f"Request has failed with connection error: {e}")
+    if isinstance(e, ConnectionTimeoutError):
+        return HTTP_504_GATEWAY_TIMEOUT(f"Request has failed with timeout error: {e}")
+    if isinstance(e, ClientResponseError):
+        exception = STATUS_EXCEPTIONS.get(e.status, HTTP_500_INTERNAL_SERVER_ERROR)
+        return exception(f"Request has failed with status error {e.status}: {e.message}")
+    return HTTP_500_INTERNAL_SERVER_ERROR(f"Request has failed with unhandled: {e}")
+
 def handle_errors(func: WRAP) -> WRAP:
+    """Translate the errors raised by a request into HTTPException. Retries are left to the RetryPolicy of the client."""
     @wraps(func)
-    @backoff.on_exception(backoff.expo, ClientConnectionError, max_time=15)
     async def wrapper(*args, **kwargs): # type: ignore
         try:
             return await func(*args, **kwargs)
-        except ServerConnectionError as e:
-            raise HTTP_502_BAD_GATEWAY(f"Request has failed with connection error: {e}") from e
-        except ConnectionTimeoutError as e:
-            raise HTTP_504_GATEWAY_TIMEOUT(f"Request has failed with timeout error: {e}") from e
-        except ClientResponseError as e:
-            raise HTTP_500_INTERNAL_SERVER_ERROR(f"Request has failed with status error {e.status}: {e.message}") from e
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise http_exception(e) from e
+    return wrapper # type: ignore
+
+def handle_stream_errors(func: GEN) -> GEN:
+    """Same as handle_errors for async generators. Requests are not retried, since items may already have been consumed."""
+    @wraps(func)
+    async def wrapper(*args, **kwargs): # type: ignore
+        try:
+            async with aclosing(func(*args, **kwargs)) as items:
+                async for item in items:
+                    yield item
+        except HTTPException:
+            raise
         except Exception as e:
-            raise HTTP_500_INTERNAL_SERVER_ERROR(f"Request has failed with unhandled: {e}") from e
+            raise http_exception(e) from e
     return wrapper # type: ignore
 
 # This function is not implemented yet, anyways validation already happens in aiohttp
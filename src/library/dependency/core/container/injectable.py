@@ -1,6 +1,13 @@
+from functools import cache
+from typing import Any, Iterable
 from dependency_injector import containers, providers
 from src.library.dependency.core.container import Container
 
+@cache
+def container_class(provider_cls: type) -> type[containers.DynamicContainer]:
+    """Container class of the injectables using a provider type, generated once per type."""
+    return type(f"{getattr(provider_cls, '__name__', 'Provider')}Container", (containers.DynamicContainer,), {})
+
 class Injectable:
     def __init__(self,
             inject_name: str,
@@ -8,13 +15,37 @@ class Injectable:
             provided_cls: type,
             provider_cls: type = providers.Singleton
         ) -> None:
-        class Container(containers.DynamicContainer):
-            config = providers.Configuration()
-            service = provider_cls(provided_cls, config)
+        container = container_class(provider_cls)()
+        container.config = providers.Configuration()
+        container.service = provider_cls(provided_cls, container.config)
         self.inject_name = inject_name
         self.inject_cls = inject_cls
-        self.container = Container
+        self.container = container
     
     def populate_container(self, container: Container) -> None:
-        setattr(container, self.inject_name, providers.Container(self.container, config=container.config))
-        container.wire(modules=[self.inject_cls])
\ No newline at end of file
+        """Register the service in the application container. Wiring is done separately, see wire_injectables."""
+        setattr(container, self.inject_name, providers.Container(type(self.container), container=self.container, config=container.config))
+
+    def initialize(self) -> Any:
+        """Start the service if it is a resource, or create it if it is a singleton.
+
+        Returns:
+            Any: The service, or an awaitable for async resources. None for providers created on demand.
+        """
+        service = self.container.service
+        if isinstance(service, providers.Resource):
+            return service.init()
+        if isinstance(service, providers.BaseSingleton):
+            return service()
+        return None
+
+def wire_injectables(container: Container, injectables: Iterable[Injectable]) -> None:
+    """Wire the components of every injectable with a single wire call, once they are all registered.
+
+    Args:
+        container (Container): Application container.
+        injectables (Iterable[Injectable]): Registered injectables.
+    """
+    modules = list(dict.fromkeys(injectable.inject_cls for injectable in injectables))
+    if modules:
+        container.wire(modules=modules)
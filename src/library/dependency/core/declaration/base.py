@@ -1,4 +1,5 @@
-from abc import ABC
+from abc import ABC, abstractmethod
+from typing import Any
 
 class ABCComponent(ABC):
     def __init__(self, base_cls: type) -> None:
@@ -11,6 +12,11 @@ class ABCProvider(ABC):
     def __init__(self, provided_cls: type) -> None:
         self.provided_cls: type = provided_cls
 
+    @abstractmethod
+    def activate(self, container: Any) -> None:
+        """Register and wire the provider in container on first use."""
+        pass
+
     def __repr__(self) -> str:
         return self.provided_cls.__name__
 
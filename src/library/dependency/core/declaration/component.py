@@ -1,3 +1,4 @@
+import importlib
 from typing import Any, Callable, Optional
 from dependency_injector.wiring import Provide
 from src.library.dependency.core.exceptions import DependencyError
@@ -9,6 +10,8 @@ class Component(ABCComponent):
     def __init__(self, base_cls: type) -> None:
         super().__init__(base_cls=base_cls)
         self.__provider: Optional[ABCProvider] = None
+        self.provider_path: Optional[str] = None
+        self.container: Optional[Any] = None
     
     @property
     def provider(self) -> Optional[ABCProvider]:
@@ -20,6 +23,21 @@ class Component(ABCComponent):
             raise DependencyError(f"Component {self} is already provided by {self.__provider}. Attempted to set new provider: {provider}")
         self.__provider = provider
     
+    def activate(self) -> bool:
+        """Import, register and wire the provider of a lazily resolved component.
+
+        Returns:
+            bool: Whether the component has a provider in a lazy container.
+        """
+        if self.container is None:
+            return False
+        if self.__provider is None and self.provider_path is not None:
+            importlib.import_module(self.provider_path)
+        if self.__provider is None:
+            return False
+        self.__provider.activate(self.container)
+        return True
+
     @staticmethod
     def provide(service: Any = None) -> Any: # TODO: provide signature
         pass
@@ -45,9 +63,12 @@ def component(interface: type) -> Callable[[type[Component]], Component]:
                 super().__init__(base_cls=interface)
 
             def provide(self,
-                    service: Any = Provide[f"{interface.__name__}.service"]
+                    service: Any = Provide[f"{interface.__name__}.service"],
+                    activate: bool = True,
                 ) -> Any:
                 if issubclass(service.__class__, Provide):
+                    if activate and self.activate():
+                        return self.provide(activate=False)
                     raise DependencyError(f"Component {self} was not provided")
                 return service
         return WrapComponent()
@@ -1,7 +1,8 @@
+import threading
 from pprint import pformat
-from typing import Callable, Optional, cast
+from typing import Any, Callable, Optional, cast
 from dependency_injector import providers
-from src.library.dependency.core.container.injectable import Container, Injectable
+from src.library.dependency.core.container.injectable import Container, Injectable, wire_injectables
 from src.library.dependency.core.declaration.base import ABCProvider
 from src.library.dependency.core.declaration.component import Component
 from src.library.dependency.core.declaration.dependent import Dependent
@@ -9,6 +10,8 @@ from src.library.dependency.core.declaration.dependent import Dependent
 class Provider(ABCProvider):
     """Provider Base Class
     """
+    _activation_lock = threading.RLock()
+
     def __init__(self,
             imports: list[Component],
             dependents: list[type[Dependent]],
@@ -21,6 +24,7 @@ class Provider(ABCProvider):
         self.dependents = dependents
 
         self.__providers: list['Provider'] = []
+        self.__active = False
     
     def resolve_dependents(self, dependents: list[type[Dependent]]) -> None:
         self.unresolved_dependents: dict[str, list[str]] = {}
@@ -36,6 +40,23 @@ class Provider(ABCProvider):
         self.__providers = providers
         self.resolve_dependents(self.dependents)
         self.provider.populate_container(container)
+        self.__active = True
+
+    def activate(self, container: Container) -> None:
+        """Register and wire a lazily resolved provider in the container, once.
+
+        Dependents are not checked, as the other providers may not be imported yet.
+        """
+        with self._activation_lock:
+            if self.__active:
+                return
+            self.provider.populate_container(container)
+            wire_injectables(container, [self.provider])
+            self.__active = True
+
+    def initialize(self) -> Any:
+        """Initialize the provided service, see Injectable.initialize."""
+        return self.provider.initialize()
 
 class HasDependent():
     _dependency_provider: Optional[Provider] = None
@@ -1,2 +1,22 @@
+class DependencyError(Exception): ...
 
-class DependencyError(Exception): ...
\ No newline at end of file
+class UnresolvedDependencyError(DependencyError):
+    """Providers that cannot be resolved, with the components nobody provides and the circular imports between providers"""
+    def __init__(self, missing: dict[str, list[str]], cycles: list[list[str]]) -> None:
+        self.missing = missing
+        self.cycles = cycles
+        details = [
+            f"{provider} imports missing {', '.join(components)}"
+            for provider, components in missing.items()
+        ] + [
+            f"circular dependency {' -> '.join(cycle)}"
+            for cycle in cycles
+        ]
+        super().__init__("Dependencies cannot be resolved: " + "; ".join(details))
+
+class StartupTimeoutError(DependencyError):
+    """Startup did not finish before its deadline"""
+    def __init__(self, deadline: float, pending: list[str]) -> None:
+        self.deadline = deadline
+        self.pending = pending
+        super().__init__(f"Startup exceeded its deadline of {deadline} seconds, still initializing: {', '.join(pending)}")
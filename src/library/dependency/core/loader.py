@@ -1,27 +1,163 @@
+import time
+import asyncio
+import inspect
 import logging
 from pprint import pformat
-from typing import cast
+from typing import Any, Callable, Optional, Sequence, cast
+from src.library.dependency.core.exceptions import DependencyError, StartupTimeoutError
 from src.library.dependency.core.module.base import Module
+from src.library.dependency.core.declaration.component import Component
 from src.library.dependency.core.container import Container
+from src.library.dependency.core.container.injectable import wire_injectables
 from src.library.dependency.core.resolver import resolve_dependency_layers
+from src.library.profiler import span
 logger = logging.getLogger("DependencyLoader")
 
-def resolve_dependency(container: Container, appmodule: type[Module]) -> None:
+def resolve_dependency(container: Container, appmodule: type[Module], lazy: bool = False) -> None:
     # Cast due to mypy not supporting class decorators
     _appmodule = cast(Module, appmodule)
+    if lazy:
+        logger.info(f"Lazily resolving dependencies in {_appmodule}")
+        _appmodule.init_lazy(container)
+        _appmodule.init_bootstrap()
+        return
     logger.info(f"Resolving dependencies in {_appmodule}")
 
-    unresolved_layers = _appmodule.init_providers()
-    resolved_layers = resolve_dependency_layers(unresolved_layers)
+    with span("declare providers", "di"):
+        unresolved_layers = _appmodule.init_providers()
+    with span("resolve layers", "di"):
+        resolved_layers = resolve_dependency_layers(unresolved_layers)
 
     named_layers = pformat(resolved_layers)
     logger.info(f"Resolved layers:\n{named_layers}")
 
-    for resolved_layer in resolved_layers:
-        for provider in resolved_layer:
-            provider.resolve(container, unresolved_layers)
+    with span("register providers", "di"):
+        for resolved_layer in resolved_layers:
+            for provider in resolved_layer:
+                provider.resolve(container, unresolved_layers)
+    with span("wire", "di"):
+        wire_injectables(container, [provider.provider for provider in unresolved_layers])
     
     container.check_dependencies()
-    container.init_resources()
-    _appmodule.init_bootstrap()
-    logger.info("Dependencies resolved and injected")
\ No newline at end of file
+    with span("resources", "di"):
+        container.init_resources()
+    with span("bootstrap", "di"):
+        _appmodule.init_bootstrap()
+    logger.info("Dependencies resolved and injected")
+
+async def initialize(name: str, fun: Callable[[], Any], timings: dict[str, float], pending: set[str], threaded: bool, category: str = "provider") -> None:
+    """Run one initialization step, awaiting its result if needed, and record how long it took."""
+    pending.add(name)
+    start = time.perf_counter()
+    try:
+        with span(name, category):
+            result = await asyncio.to_thread(fun) if threaded else fun()
+            if inspect.isawaitable(result):
+                await result
+    except Exception as e:
+        raise DependencyError(f"Failed to initialize {name}: {e}") from e
+    timings[name] = time.perf_counter() - start
+    pending.discard(name)
+
+async def bootstrap_module(module: Module, timings: dict[str, float], pending: set[str]) -> None:
+    """Bootstrap the module layers in order, the components of each layer concurrently."""
+    for layer in module.layers:
+        await asyncio.gather(*[
+            initialize(f"bootstrap {component}", component.provide, timings, pending, threaded=False, category="bootstrap")
+            for imported in layer
+            for component in imported.bootstraps])
+
+async def initialize_layers(container: Container, module: Module, timings: dict[str, float], pending: set[str], threaded: bool) -> None:
+    """Resolve, register and wire every provider, then initialize the providers of each layer concurrently."""
+    with span("declare providers", "di"):
+        unresolved_layers = module.init_providers()
+    with span("resolve layers", "di"):
+        resolved_layers = resolve_dependency_layers(unresolved_layers)
+    logger.info(f"Resolved layers:\n{pformat(resolved_layers)}")
+
+    with span("register providers", "di"):
+        for resolved_layer in resolved_layers:
+            for provider in resolved_layer:
+                provider.resolve(container, unresolved_layers)
+    with span("wire", "di"):
+        wire_injectables(container, [provider.provider for provider in unresolved_layers])
+
+    for index, resolved_layer in enumerate(resolved_layers):
+        with span(f"layer {index}", "di"):
+            await asyncio.gather(*[
+                initialize(repr(provider), provider.initialize, timings, pending, threaded)
+                for provider in dict.fromkeys(resolved_layer)])
+
+    container.check_dependencies()
+    with span("resources", "di"):
+        resources = container.init_resources()
+        if inspect.isawaitable(resources):
+            await resources
+
+async def resolve_dependency_async(
+        container: Container,
+        appmodule: type[Module],
+        deadline: Optional[float] = None,
+        threaded: bool = False,
+        lazy: bool = False,
+    ) -> dict[str, float]:
+    """Resolve and initialize dependencies, initializing the providers of each layer concurrently.
+
+    Singletons are created and resources (including async ones) are started layer by layer, so the startup time is the sum of the slowest provider of each layer.
+    Bootstraps run once every layer is initialized.
+    In lazy mode providers are neither resolved nor initialized: each one is imported, registered and wired the first time its component is provided.
+
+    Args:
+        container (Container): Application container.
+        appmodule (type[Module]): Application module.
+        deadline (Optional[float], optional): Maximum startup time in seconds. Defaults to None (no deadline).
+        threaded (bool, optional): Run synchronous provider initialization in worker threads. Defaults to False.
+        lazy (bool, optional): Defer providers to their first use, only running the bootstraps. Defaults to False.
+
+    Raises:
+        StartupTimeoutError: If the startup takes longer than the deadline.
+        DependencyError: If dependencies cannot be resolved or a provider fails to initialize.
+
+    Returns:
+        dict[str, float]: Initialization time in seconds by provider and bootstrap.
+    """
+    # Cast due to mypy not supporting class decorators
+    _appmodule = cast(Module, appmodule)
+    logger.info(f"{'Lazily resolving' if lazy else 'Resolving'} dependencies in {_appmodule}")
+    timings: dict[str, float] = {}
+    pending: set[str] = set()
+
+    try:
+        async with asyncio.timeout(deadline):
+            if lazy:
+                _appmodule.init_lazy(container)
+            else:
+                await initialize_layers(container, _appmodule, timings, pending, threaded)
+            await bootstrap_module(_appmodule, timings, pending)
+    except TimeoutError:
+        raise StartupTimeoutError(deadline, sorted(pending)) from None # type: ignore
+
+    for name, elapsed in sorted(timings.items(), key=lambda item: item[1], reverse=True):
+        logger.info(f"Initialized {name} in {elapsed:.3f} seconds")
+    logger.info("Dependencies resolved and injected")
+    return timings
+
+def prewarm(components: Sequence[type[Component]], threaded: bool = True) -> "asyncio.Task[dict[str, float]]":
+    """Provide components in the background, so their first use does not pay for their import, wiring and creation.
+
+    Args:
+        components (Sequence[type[Component]]): Components to provide.
+        threaded (bool, optional): Provide synchronous components in worker threads. Defaults to True.
+
+    Returns:
+        asyncio.Task[dict[str, float]]: Task resolving to the time spent providing each component.
+    """
+    # Cast due to mypy not supporting class decorators
+    _components = cast(Sequence[Component], components)
+    async def run() -> dict[str, float]:
+        timings: dict[str, float] = {}
+        await asyncio.gather(*[
+            initialize(f"prewarm {component}", component.provide, timings, set(), threaded)
+            for component in _components])
+        return timings
+    return asyncio.create_task(run())
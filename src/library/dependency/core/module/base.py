@@ -1,5 +1,7 @@
+import importlib
 from abc import ABC
-from typing import Callable, cast
+from typing import Any, Callable, cast
+from functools import cached_property
 from src.library.dependency.core.exceptions import DependencyError
 from src.library.dependency.core.declaration import Component, Provider
 
@@ -17,15 +19,59 @@ class Module(ABC):
         self.declaration = declaration
         self.bootstrap = bootstrap
     
+    @staticmethod
+    def _declare(components: list[Component]) -> None:
+        for component in components:
+            if component.provider is None and component.provider_path is not None:
+                importlib.import_module(component.provider_path)
+
     def declare_providers(self) -> None:
-        pass
+        """Import the modules declaring the providers of lazily imported components."""
+        self._declare(self.declaration)
 
-    @property
-    def modules(self) -> list["Module"]:
-        modules = self.imports
-        for module in self.imports:
-            modules.extend(module.modules)
-        return modules
+    @cached_property
+    def modules(self) -> tuple["Module", ...]:
+        """Every module imported directly or transitively, once each, in depth-first import order."""
+        seen: set[Module] = {self}
+        modules: list[Module] = []
+        stack = list(reversed(self.imports))
+        while stack:
+            module = stack.pop()
+            if module in seen:
+                continue
+            seen.add(module)
+            modules.append(module)
+            stack.extend(reversed(module.imports))
+        return tuple(modules)
+
+    @cached_property
+    def layers(self) -> tuple[tuple["Module", ...], ...]:
+        """This module and its imports grouped in layers, each module after the layers of all its imports.
+
+        Modules of the same layer do not import each other. Circular imports are broken at the import that closes the cycle.
+        """
+        depth: dict[Module, int] = {}
+        visiting: set[Module] = set()
+        stack: list[tuple[Module, bool]] = [(self, False)]
+        while stack:
+            module, expanded = stack.pop()
+            if expanded:
+                visiting.discard(module)
+                depth[module] = 1 + max((depth.get(imported, -1) for imported in module.imports), default=-1)
+                continue
+            if module in depth or module in visiting:
+                continue
+            visiting.add(module)
+            stack.append((module, True))
+            stack.extend(
+                (imported, False)
+                for imported in reversed(module.imports)
+                if imported not in depth and imported not in visiting)
+
+        layers: list[list[Module]] = [[] for _ in range(max(depth.values()) + 1)]
+        for module in (self, *self.modules):
+            layers[depth[module]].append(module)
+        return tuple(tuple(layer) for layer in layers)
     
     @property
     def providers(self) -> list[Provider]:
@@ -37,6 +83,8 @@ class Module(ABC):
     
     @property
     def bootstraps(self) -> list[Component]:
+        """Bootstrapped components that have a provider, importing the providers declared by path first, as they are not declared yet in lazy mode."""
+        self._declare(self.bootstrap)
         return [
             component
             for component in self.bootstrap
@@ -44,20 +92,28 @@ class Module(ABC):
         ]
     
     def init_providers(self) -> list[Provider]:
-        self.declare_providers()
-        providers: list[Provider] = self.providers
-        for module in self.imports:
-            providers.extend(module.init_providers())
-        return providers
+        """Declare and collect the providers of this module and of every imported module, once each."""
+        providers: dict[Provider, None] = {}
+        for module in (self, *self.modules):
+            module.declare_providers()
+            providers.update(dict.fromkeys(module.providers))
+        return list(providers)
     
+    def init_lazy(self, container: Any) -> None:
+        """Attach the container to the components of this module and its imports, so their providers are imported, registered and wired on first use."""
+        for module in (self, *self.modules):
+            for component in module.declaration:
+                component.container = container
+
     def init_bootstrap(self) -> None:
-        for module in self.imports:
-            module.init_bootstrap()
-        for component in self.bootstraps:
-            try:
-                component.provide()
-            except Exception as e:
-                raise DependencyError(f"Failed to bootstrap {component}: {e}") from e
+        """Bootstrap the components of every module once, imported modules first."""
+        for layer in self.layers:
+            for module in layer:
+                for component in module.bootstraps:
+                    try:
+                        component.provide()
+                    except Exception as e:
+                        raise DependencyError(f"Failed to bootstrap {component}: {e}") from e
     
     def __repr__(self) -> str:
         return self.module_cls.__name__
@@ -66,6 +122,7 @@ def module(
         imports: list[type[Module]] = [],
         declaration: list[type[Component]] = [],
         bootstrap: list[type[Component]] = [],
+        providers: dict[type[Component], str] = {},
     ) -> Callable[[type[Module]], Module]:
     """Decorator for Module class
 
@@ -73,6 +130,7 @@ def module(
         imports (list[type[Module]], optional): List of modules to be imported by the module. Defaults to [].
         declaration (list[type[Component]], optional): List of components to be declared by the module. Defaults to [].
         bootstrap (list[type[Component]], optional): List of components to be bootstrapped by the module. Defaults to [].
+        providers (dict[type[Component], str], optional): Components declared by the module whose provider is in another Python module, imported when providers are declared or, in lazy mode, on first use. Defaults to {}.
 
     Raises:
         TypeError: If the wrapped class is not a subclass of Module.
@@ -84,6 +142,10 @@ def module(
     _declaration = cast(list[Component], declaration)
     _imports = cast(list[Module], imports)
     _bootstrap = cast(list[Component], bootstrap)
+    for component, path in cast(dict[Component, str], providers).items():
+        component.provider_path = path
+        if component not in _declaration:
+            _declaration = [*_declaration, component]
     def wrap(cls: type[Module]) -> Module:
         if not issubclass(cls, Module):
             raise TypeError(f"Class {cls} is not a subclass of Module")
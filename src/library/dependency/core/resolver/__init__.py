@@ -1,24 +1,55 @@
 from src.library.dependency.core import Provider
 from src.library.dependency.core.resolver.errors import raise_dependency_error
-from src.library.dependency.core.resolver.utils import provider_is_resolved
+from src.library.dependency.core.resolver.utils import provider_index, dep_providers
 
 def resolve_dependency_layers(unresolved_providers: list[Provider]) -> list[list[Provider]]:
+    """Group providers in layers, each layer only importing components provided by the previous ones.
+
+    Layers are built with Kahn's algorithm over a precomputed component to provider index, in O(P+E) for P providers and E imports.
+    A component is available once any provider of a subclass of it is resolved, and providers keep their relative order inside a layer.
+
+    Args:
+        unresolved_providers (list[Provider]): Providers to resolve.
+
+    Raises:
+        DependencyError: If some providers import components that are never provided.
+
+    Returns:
+        list[list[Provider]]: Resolved layers, in initialization order.
+    """
+    index = provider_index(unresolved_providers)
+    in_degree = [0] * len(unresolved_providers)
+    dependents: dict[type, list[int]] = {}
+    for position, provider in enumerate(unresolved_providers):
+        for base_cls in dict.fromkeys(dep.base_cls for dep in provider.imports):
+            dependents.setdefault(base_cls, []).append(position)
+            in_degree[position] += 1
+
+    satisfies: list[list[type]] = [[] for _ in unresolved_providers]
+    for base_cls in dependents:
+        for position in dep_providers(base_cls, index, unresolved_providers):
+            satisfies[position].append(base_cls)
+
     resolved_layers: list[list[Provider]] = []
+    available: set[type] = set()
+    layer = [position for position, degree in enumerate(in_degree) if degree == 0]
+    while layer:
+        resolved_layers.append([unresolved_providers[position] for position in layer])
+        next_layer: list[int] = []
+        for position in layer:
+            for base_cls in satisfies[position]:
+                if base_cls in available:
+                    continue
+                available.add(base_cls)
+                for dependent in dependents[base_cls]:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        next_layer.append(dependent)
+        next_layer.sort()
+        layer = next_layer
 
-    while unresolved_providers:
-        new_layer = [
-            provider
-            for provider in unresolved_providers
-            if provider_is_resolved(provider, resolved_layers)
-        ]
-        
-        if not new_layer:
-            raise_dependency_error(unresolved_providers, resolved_layers)
-        resolved_layers.append(new_layer)
-        
-        unresolved_providers = [
-            provider
-            for provider in unresolved_providers
-            if provider not in new_layer
-        ]
-    return resolved_layers
\ No newline at end of file
+    if any(in_degree):
+        raise_dependency_error(
+            [provider for provider, degree in zip(unresolved_providers, in_degree) if degree],
+            resolved_layers)
+    return resolved_layers
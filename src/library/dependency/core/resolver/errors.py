@@ -1,27 +1,80 @@
 import logging
-from src.library.dependency.core.exceptions import DependencyError
+from collections import deque
+from src.library.dependency.core.exceptions import UnresolvedDependencyError
 from src.library.dependency.core.declaration import Component
 from src.library.dependency.core.declaration.provider import Provider
-from src.library.dependency.core.resolver.utils import provider_unresolved
+from src.library.dependency.core.resolver.utils import provider_index, dep_providers
+from src.library.utils.graph import strongly_connected
 logger = logging.getLogger("DependencyLoader")
 
-def provider_detect_error(
-        provider: Provider,
-        unresolved_providers: list[Provider],
+def cycle_path(component: list[Provider], edges: dict[Provider, list[Provider]]) -> list[Provider]:
+    """Shortest cycle through the first provider of a strongly connected component, closed on itself."""
+    start = component[0]
+    members = set(component)
+    parents: dict[Provider, Provider] = {}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for successor in edges[node]:
+            if successor is start:
+                path = [node]
+                while path[-1] is not start:
+                    path.append(parents[path[-1]])
+                path.reverse()
+                return path + [start]
+            if successor in members and successor not in parents:
+                parents[successor] = node
+                queue.append(successor)
+    return [start, start]
+
+def detect_dependency_errors(
+        providers: list[Provider],
         resolved_layers: list[list[Provider]]
-    ) -> tuple[list[Component], list[Component]]:
-    deps_circular: list[Component] = []
-    deps_missing: list[Component] = []
+    ) -> tuple[dict[Provider, list[Component]], list[list[Provider]]]:
+    """Find why providers cannot be resolved, in a single pass over their imports.
 
-    for dep in provider_unresolved(provider, resolved_layers):
-        # TODO: Check for circular dependencies
-        deps_missing.append(dep)
+    Args:
+        providers (list[Provider]): Providers left unresolved.
+        resolved_layers (list[list[Provider]]): Layers resolved so far.
 
-    logger.error(f"Provider {provider} has unresolved dependencies: {deps_missing}")
-    return deps_circular, deps_missing
+    Returns:
+        tuple[dict[Provider, list[Component]], list[list[Provider]]]: Components that no provider provides by importing provider, and circular import paths between providers.
+    """
+    every = [provider for layer in resolved_layers for provider in layer] + providers
+    index = provider_index(every)
+    unresolved = set(providers)
+    satisfiers: dict[type, list[Provider]] = {}
+    missing: dict[Provider, list[Component]] = {}
+    edges: dict[Provider, list[Provider]] = {}
 
-def raise_dependency_error(providers: list[Provider], resolved_layers: list[list[Provider]]) -> None:
     for provider in providers:
-        provider_detect_error(provider, providers, resolved_layers)
-    
-    raise DependencyError("Dependencies cannot be resolved")
\ No newline at end of file
+        edges[provider] = []
+        for dep in provider.imports:
+            if dep.base_cls not in satisfiers:
+                satisfiers[dep.base_cls] = [every[position] for position in dep_providers(dep.base_cls, index, every)]
+            found = satisfiers[dep.base_cls]
+            if not found:
+                missing.setdefault(provider, []).append(dep) # type: ignore
+            elif all(satisfier in unresolved for satisfier in found):
+                edges[provider].extend(found)
+
+    cycles = [
+        cycle_path(component, edges)
+        for component in strongly_connected(providers, edges)
+        if len(component) > 1 or component[0] in edges[component[0]]
+    ]
+    return missing, cycles
+
+def raise_dependency_error(providers: list[Provider], resolved_layers: list[list[Provider]]) -> None:
+    missing, cycles = detect_dependency_errors(providers, resolved_layers)
+    for provider, deps in missing.items():
+        logger.error(f"Provider {provider} imports components that are not provided: {deps}")
+    for cycle in cycles:
+        logger.error(f"Circular dependency between providers: {' -> '.join(map(repr, cycle))}")
+    blocked = len(set(providers) - set(missing) - {provider for cycle in cycles for provider in cycle})
+    if blocked > 0:
+        logger.error(f"{blocked} other providers depend on the providers above")
+
+    raise UnresolvedDependencyError(
+        missing={repr(provider): [repr(dep) for dep in deps] for provider, deps in missing.items()},
+        cycles=[[repr(provider) for provider in cycle] for cycle in cycles])
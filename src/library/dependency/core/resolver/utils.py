@@ -1,24 +1,22 @@
-from src.library.dependency.core.declaration import Component, Provider
-from src.library.dependency.core.declaration.component import ABCComponent
+from src.library.dependency.core.declaration import Provider
 
-def dep_in_layers(dep: ABCComponent, layers: list[list[Provider]]) -> bool:
-    return any(
-        issubclass(res.provided_cls, dep.base_cls)
-        for layer in layers
-        for res in layer
-    )
+def provider_index(providers: list[Provider]) -> dict[type, list[int]]:
+    """Index provider positions by every class in the MRO of their provided class."""
+    index: dict[type, list[int]] = {}
+    for position, provider in enumerate(providers):
+        for cls in provider.provided_cls.__mro__:
+            index.setdefault(cls, []).append(position)
+    return index
 
-def provider_is_resolved(provider: Provider, resolved_layers: list[list[Provider]]) -> bool:
-    dependencies = provider.imports
-    return all(
-        dep_in_layers(dep, resolved_layers)
-        for dep in dependencies
-    )
+def dep_providers(base_cls: type, index: dict[type, list[int]], providers: list[Provider]) -> list[int]:
+    """Positions of the providers of a component.
 
-def provider_unresolved(provider: Provider, resolved_layers: list[list[Provider]]) -> list[Component]:
-    dependencies = provider.imports
+    Falls back to issubclass checks when no provider subclasses base_cls nominally, so virtual subclasses (ABC.register) still match.
+    """
+    if base_cls in index:
+        return index[base_cls]
     return [
-        dep
-        for dep in dependencies
-        if not dep_in_layers(dep, resolved_layers)
-    ]
\ No newline at end of file
+        position
+        for position, provider in enumerate(providers)
+        if issubclass(provider.provided_cls, base_cls)
+    ]
@@ -0,0 +1,191 @@
+import sys
+import json
+import time
+import importlib.abc
+import importlib.machinery
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, ContextManager, Iterator, Optional, Sequence
+
+__all__ = [
+    "Span",
+    "StartupProfiler",
+    "StartupBudgetExceeded",
+    "span",
+]
+
+_active: ContextVar[Optional["StartupProfiler"]] = ContextVar("startup_profiler", default=None)
+_parent: ContextVar[Optional[int]] = ContextVar("startup_span", default=None)
+
+class StartupBudgetExceeded(Exception):
+    """Startup took longer than its budget"""
+    def __init__(self, elapsed: float, budget: float) -> None:
+        self.elapsed = elapsed
+        self.budget = budget
+        super().__init__(f"Startup took {elapsed:.3f} seconds, over its budget of {budget:.3f} seconds")
+
+@dataclass
+class Span:
+    """Timed startup step"""
+    id: int
+    name: str
+    category: str
+    start: float
+    end: float = 0.0
+    parent: Optional[int] = None
+    children: list[int] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+class _TimedLoader(importlib.abc.Loader):
+    """Loader proxy timing the execution of a module, restored on the module once it is loaded."""
+    def __init__(self, loader: Any, profiler: "StartupProfiler") -> None:
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec: importlib.machinery.ModuleSpec) -> Optional[ModuleType]:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        with self._profiler.span(module.__name__, "import"):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """Meta path finder wrapping the loaders found by the other finders with a _TimedLoader."""
+    def __init__(self, profiler: "StartupProfiler") -> None:
+        self._profiler = profiler
+
+    def find_spec(self, fullname: str, path: Optional[Sequence[str]], target: Optional[ModuleType] = None) -> Optional[importlib.machinery.ModuleSpec]:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self._profiler)
+            return spec
+        return None
+
+class StartupProfiler:
+    """Record a tree of timed startup steps: module imports, dependency resolution, provider initialization...
+
+    Steps are recorded with span(), either on the profiler or through the module level span() helper, which is a no-op when no profiler is running.
+    Parents are tracked with context variables, so steps running in concurrent tasks are attached to the step that started them.
+
+    Args:
+        imports (bool, optional): Record the execution time of every module imported while running. Defaults to True.
+    """
+    def __init__(self, imports: bool = True) -> None:
+        self.imports = imports
+        self.spans: list[Span] = []
+        self.started = 0.0
+        self.stopped = 0.0
+        self._finder: Optional[_ImportTimer] = None
+
+    def start(self) -> "StartupProfiler":
+        """Start recording, making this profiler the active one."""
+        self.started = time.perf_counter()
+        _active.set(self)
+        if self.imports:
+            self._finder = _ImportTimer(self)
+            sys.meta_path.insert(0, self._finder)
+        return self
+
+    def stop(self) -> float:
+        """Stop recording.
+
+        Returns:
+            float: Seconds elapsed since start.
+        """
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+        if _active.get() is self:
+            _active.set(None)
+        self.stopped = time.perf_counter()
+        return self.elapsed
+
+    @property
+    def elapsed(self) -> float:
+        return (self.stopped or time.perf_counter()) - self.started
+
+    @contextmanager
+    def span(self, name: str, category: str) -> Iterator[Span]:
+        """Time the enclosed block as a child of the current step."""
+        parent = _parent.get()
+        span = Span(id=len(self.spans), name=name, category=category, start=time.perf_counter(), parent=parent)
+        self.spans.append(span)
+        if parent is not None:
+            self.spans[parent].children.append(span.id)
+        token = _parent.set(span.id)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            _parent.reset(token)
+
+    def totals(self, category: str) -> dict[str, float]:
+        """Cumulative seconds by step name for a category."""
+        totals: dict[str, float] = {}
+        for span in self.spans:
+            if span.category == category:
+                totals[span.name] = totals.get(span.name, 0.0) + span.duration
+        return totals
+
+    def to_json(self) -> dict[str, Any]:
+        """Structured profile, with span times in seconds relative to start."""
+        return {
+            "elapsed": self.elapsed,
+            "spans": [
+                {
+                    "id": span.id,
+                    "name": span.name,
+                    "category": span.category,
+                    "start": span.start - self.started,
+                    "duration": span.duration,
+                    "parent": span.parent,
+                }
+                for span in self.spans
+            ]
+        }
+
+    def to_folded(self) -> str:
+        """Profile in the folded stacks format of flamegraph.pl and speedscope, one line per span with its self time in microseconds."""
+        lines: list[str] = []
+        stacks: dict[int, str] = {}
+        for span in self.spans:
+            frame = f"{span.category}:{span.name}".replace(";", ":").replace(" ", "_")
+            stacks[span.id] = frame if span.parent is None else f"{stacks[span.parent]};{frame}"
+            self_time = span.duration - sum(self.spans[child].duration for child in span.children)
+            lines.append(f"{stacks[span.id]} {max(0, round(self_time * 1e6))}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write the profile as path.json and path.folded."""
+        with open(f"{path}.json", mode="w") as file:
+            json.dump(self.to_json(), file, indent=2)
+        with open(f"{path}.folded", mode="w") as file:
+            file.write(self.to_folded())
+
+    def check(self, budget: float) -> None:
+        """Raise StartupBudgetExceeded if startup took longer than budget seconds."""
+        if self.elapsed > budget:
+            raise StartupBudgetExceeded(self.elapsed, budget)
+
+def span(name: str, category: str) -> ContextManager[Optional[Span]]:
+    """Time the enclosed block with the active profiler, if any."""
+    profiler = _active.get()
+    if profiler is None:
+        return nullcontext()
+    return profiler.span(name, category)
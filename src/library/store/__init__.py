@@ -0,0 +1,207 @@
+import os
+import stat
+import time
+import shutil
+import sqlite3
+import uuid
+import logging
+from typing import Optional
+from src.library.api.exceptions import HTTP_502_BAD_GATEWAY
+from src.library.utils import getenv
+from src.library.utils.hashing import HASH_ALGORITHMS, hash_file
+
+__all__ = [
+    "ArtifactStore",
+    "IntegrityError"
+]
+
+logger = logging.getLogger("ArtifactStore")
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+STORE_MAX_SIZE = int(getenv("STORE_MAX_SIZE", str(10 * 1024 * 1024 * 1024)))
+
+# Linux ioctl sharing the blocks of a file copy-on-write (btrfs, XFS)
+FICLONE = 0x40049409
+READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+
+class IntegrityError(HTTP_502_BAD_GATEWAY):
+    """Used when an artifact does not match its expected hashes"""
+
+def clone_file(source: str, destination: str) -> None:
+    """Copy a file, as a reflink sharing its blocks when the filesystem supports it."""
+    if fcntl is not None:
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except OSError:
+                pass
+    shutil.copyfile(source, destination)
+
+class ArtifactStore:
+    """Content-addressed file store keyed by sha512 and indexed by sha1.
+
+    Blobs are read-only and evicted in least recently used order once the store exceeds its size cap.
+    Checkouts are independent copies (reflinks when the filesystem supports them), unless hard links are enabled: a hard link shares the blob, so it must never be written to.
+
+    Args:
+        root (str): Store directory.
+        max_size (int, optional): Maximum total size in bytes of the stored blobs. Defaults to STORE_MAX_SIZE.
+        link (bool, optional): Hand out read-only hard links instead of copies when possible. Defaults to False.
+    """
+    def __init__(self, root: str, max_size: int = STORE_MAX_SIZE, link: bool = False) -> None:
+        self.root = root
+        self.max_size = max_size
+        self.link = link
+        os.makedirs(self.staging, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite"))
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS artifacts (
+                sha512 TEXT PRIMARY KEY,
+                sha1 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS artifacts_sha1 ON artifacts (sha1)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS artifacts_accessed ON artifacts (accessed)")
+        self._db.commit()
+
+    @property
+    def staging(self) -> str:
+        """Directory for in-progress writes, on the same filesystem as the blobs."""
+        return os.path.join(self.root, "staging")
+
+    def blob(self, sha512: str) -> str:
+        return os.path.join(self.root, "blobs", sha512[:2], sha512)
+
+    def lookup(self, sha512: Optional[str] = None, sha1: Optional[str] = None) -> Optional[str]:
+        """Find a stored artifact by its sha512 or sha1 hash.
+
+        Args:
+            sha512 (Optional[str], optional): sha512 hex digest. Defaults to None.
+            sha1 (Optional[str], optional): sha1 hex digest. Defaults to None.
+
+        Returns:
+            Optional[str]: sha512 of the artifact, None if it is not stored.
+        """
+        if sha512 is not None:
+            row = self._db.execute("SELECT sha512, size FROM artifacts WHERE sha512 = ?", (sha512.lower(),)).fetchone()
+        elif sha1 is not None:
+            row = self._db.execute("SELECT sha512, size FROM artifacts WHERE sha1 = ?", (sha1.lower(),)).fetchone()
+        else:
+            return None
+        if row is None:
+            return None
+        blob = self.blob(row[0])
+        try:
+            info = os.stat(blob)
+        except FileNotFoundError:
+            return None
+        # A blob that was made writable or changed size may have been altered through a hard link
+        if info.st_size != row[1] or info.st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH):
+            logger.warning(f"Discarding altered artifact {row[0]}")
+            self._remove(row[0])
+            self._db.commit()
+            return None
+        return row[0]
+
+    def hashes(self, sha512: str) -> dict[str, str]:
+        """Return the sha1 and sha512 digests of a stored artifact."""
+        row = self._db.execute("SELECT sha1 FROM artifacts WHERE sha512 = ?", (sha512,)).fetchone()
+        if row is None:
+            raise KeyError(f"Artifact {sha512} is not stored")
+        return {"sha1": row[0], "sha512": sha512}
+
+    def put(self, path: str, hashes: Optional[dict[str, str]] = None, expected: dict[str, str] = {}) -> str:
+        """Move a file into the store.
+
+        Args:
+            path (str): File to store. It is moved, so it should live in the staging directory.
+            hashes (Optional[dict[str, str]], optional): sha1 and sha512 digests already computed for the file. Defaults to None (hash the file).
+            expected (dict[str, str], optional): Expected digests by algorithm. Defaults to {}.
+
+        Raises:
+            IntegrityError: If the file does not match the expected digests.
+
+        Returns:
+            str: sha512 of the stored artifact.
+        """
+        if hashes is None or not all(algorithm in hashes for algorithm in HASH_ALGORITHMS):
+            hashes = hash_file(path, HASH_ALGORITHMS)
+        for algorithm, digest in expected.items():
+            if algorithm in hashes and hashes[algorithm] != digest.lower():
+                os.remove(path)
+                raise IntegrityError(f"Artifact {algorithm} mismatch: expected {digest}, got {hashes[algorithm]}")
+
+        sha512 = hashes["sha512"]
+        blob = self.blob(sha512)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        os.chmod(path, READ_ONLY)
+        os.replace(path, blob)
+        self._db.execute(
+            "INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?)",
+            (sha512, hashes["sha1"], os.path.getsize(blob), time.time()))
+        self._db.commit()
+        self.evict(keep=sha512)
+        return sha512
+
+    def checkout(self, sha512: str, path: str) -> str:
+        """Place a stored artifact at path, as a copy, or as a read-only hard link if enabled.
+
+        Args:
+            sha512 (str): sha512 of the artifact.
+            path (str): Destination path.
+
+        Returns:
+            str: Destination path.
+        """
+        blob = self.blob(sha512)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = os.path.join(directory, f".{os.path.basename(path)}.{uuid.uuid4().hex}.part")
+        try:
+            if not self.link:
+                raise OSError("Hard links disabled")
+            os.link(blob, temp_path)
+        except OSError:
+            clone_file(blob, temp_path)
+        os.replace(temp_path, path)
+        self._db.execute("UPDATE artifacts SET accessed = ? WHERE sha512 = ?", (time.time(), sha512))
+        self._db.commit()
+        return path
+
+    def size(self) -> int:
+        total, = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()
+        return total
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove least recently used artifacts until the store fits its size cap.
+
+        Args:
+            keep (Optional[str], optional): sha512 of an artifact that must not be evicted. Defaults to None.
+        """
+        total = self.size()
+        if total <= self.max_size:
+            return
+        for sha512, size in self._db.execute("SELECT sha512, size FROM artifacts ORDER BY accessed").fetchall():
+            if total <= self.max_size:
+                break
+            if sha512 == keep:
+                continue
+            self._remove(sha512)
+            total -= size
+            logger.info(f"Evicted artifact {sha512}")
+        self._db.commit()
+
+    def _remove(self, sha512: str) -> None:
+        """Delete a blob and its index row, without committing."""
+        if os.path.exists(self.blob(sha512)):
+            os.remove(self.blob(sha512))
+        self._db.execute("DELETE FROM artifacts WHERE sha512 = ?", (sha512,))
+
+    def close(self) -> None:
+        self._db.close()
@@ -1,12 +1,19 @@
 import os
+import json
 import yaml
 import logging
 import urllib.parse
 from datetime import datetime, timezone
 from pprint import pformat
-from typing import Any, Callable, Optional, TypeVar
+from typing import Any, Callable, Iterable, Optional, TypeVar
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 WRAP = TypeVar("WRAP", bound=Callable[..., Any])
+T = TypeVar("T")
 logger = logging.getLogger("EnvLogger")
 
 def load_env(path: str = ".env", verbose: bool = False):
@@ -30,6 +37,19 @@ def getenv(name: str, default: Optional[str] = None, fail_on_none: bool = True)
         raise Exception(f"Environment variable {name} not found.")
     return var # type: ignore
 
+def json_loads(data: bytes | str) -> Any:
+    """Decode JSON with orjson when it is installed, or the standard json module otherwise.
+
+    Args:
+        data (bytes | str): The JSON document.
+
+    Returns:
+        Any: The decoded value.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 def load_yaml(path: str) -> dict[str, Any]:
     """Loads a yaml file.
     Args:
@@ -80,4 +100,30 @@ def name_from_url(url: str) -> str:
     url_split = url.split("/")
     if len(url_split) < 1:
         raise ValueError("Cannot extract name from URL")
-    return urllib.parse.unquote(url.split("/")[-1])
\ No newline at end of file
+    return urllib.parse.unquote(url.split("/")[-1])
+
+def chunked(items: Iterable[T], max_size: int, size: Callable[[T], int] = lambda item: 1) -> list[list[T]]:
+    """
+    Split items into consecutive chunks whose total size stays within a limit.
+
+    Args:
+        items (Iterable[T]): The items to split, kept in order.
+        max_size (int): The maximum total size of a chunk.
+        size (Callable[[T], int], optional): The size of a single item. Defaults to 1 (chunk by count).
+
+    Returns:
+        list[list[T]]: The chunks. An item that alone exceeds the limit gets its own chunk.
+    """
+    chunks: list[list[T]] = []
+    chunk: list[T] = []
+    chunk_size = 0
+    for item in items:
+        item_size = size(item)
+        if chunk and chunk_size + item_size > max_size:
+            chunks.append(chunk)
+            chunk, chunk_size = [], 0
+        chunk.append(item)
+        chunk_size += item_size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
\ No newline at end of file
@@ -0,0 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Hashable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+class ConcurrencyLimiter:
+    """Bound concurrent work globally and per key (host, node...).
+
+    Args:
+        limit (int): Maximum number of concurrent holders overall.
+        per_key (int): Maximum number of concurrent holders for the same key.
+    """
+    def __init__(self, limit: int, per_key: int) -> None:
+        self.limit = limit
+        self.per_key = per_key
+        self._global = asyncio.Semaphore(limit)
+        self._keys: dict[Hashable, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def acquire(self, key: Hashable) -> AsyncIterator[None]:
+        """Hold a slot for key. The key slot is taken first, so callers waiting on a busy key do not hold global slots."""
+        semaphore = self._keys.setdefault(key, asyncio.Semaphore(self.per_key))
+        async with semaphore:
+            async with self._global:
+                yield
+
+async def as_completed(aws: Iterable[Awaitable[T]]) -> AsyncIterator[T]:
+    """Yield results as the awaitables finish, cancelling the rest if the consumer stops early or is cancelled.
+
+    Args:
+        aws (Iterable[Awaitable[T]]): The awaitables to run concurrently.
+
+    Yields:
+        T: The next finished result.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,57 @@
+from typing import Hashable, Iterable, Iterator, Mapping, Sequence, TypeVar
+
+N = TypeVar("N", bound=Hashable)
+
+def strongly_connected(nodes: Iterable[N], edges: Mapping[N, Sequence[N]]) -> list[list[N]]:
+    """Find the strongly connected components of a directed graph with an iterative Tarjan search.
+
+    Components are returned in reverse topological order: a component comes after every component it has edges to.
+    With edges pointing from a node to its dependencies, this is a valid dependency-first order.
+
+    Args:
+        nodes (Iterable[N]): Nodes to visit, in the order searches are started.
+        edges (Mapping[N, Sequence[N]]): Successors by node. Missing nodes have no successors.
+
+    Returns:
+        list[list[N]]: Components, each one in discovery order.
+    """
+    index: dict[N, int] = {}
+    low: dict[N, int] = {}
+    stack: list[N] = []
+    on_stack: set[N] = set()
+    components: list[list[N]] = []
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work: list[tuple[N, Iterator[N]]] = [(root, iter(edges.get(root, ())))]
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = low[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(edges.get(successor, ()))))
+                    break
+                if successor in on_stack:
+                    low[node] = min(low[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component: list[N] = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    component.reverse()
+                    components.append(component)
+    return components
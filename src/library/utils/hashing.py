@@ -0,0 +1,90 @@
+import os
+import json
+import hashlib
+import tempfile
+from typing import Any, Optional, Sequence
+
+HASH_ALGORITHMS = ("sha1", "sha512")
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def hash_file(path: str, algorithms: Sequence[str] = HASH_ALGORITHMS, chunk_size: int = HASH_CHUNK_SIZE) -> dict[str, str]:
+    """Hash a file in a single pass.
+
+    Args:
+        path (str): The file path.
+        algorithms (Sequence[str], optional): The hashlib algorithms to compute. Defaults to HASH_ALGORITHMS.
+        chunk_size (int, optional): The size of the chunks read from the file. Defaults to HASH_CHUNK_SIZE.
+
+    Returns:
+        dict[str, str]: The hex digests by algorithm.
+    """
+    hashers = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+    with open(path, mode="rb") as file:
+        while chunk := file.read(chunk_size):
+            for hasher in hashers.values():
+                hasher.update(chunk)
+    return {algorithm: hasher.hexdigest() for algorithm, hasher in hashers.items()}
+
+class HashIndex:
+    """On-disk memo of file data keyed by (path, size, mtime).
+
+    An entry is only returned while the size and mtime it was stored with still match, so changed files are transparently invalidated.
+
+    Args:
+        path (Optional[str], optional): JSON file backing the index. Defaults to None (in memory only).
+    """
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+        if path is not None and os.path.exists(path):
+            with open(path) as file:
+                self._entries = json.load(file)
+
+    def get(self, key: str, size: int, mtime: Any) -> Optional[dict[str, Any]]:
+        """Return the data stored for key, if the file is unchanged.
+
+        Args:
+            key (str): The file path or any unique file key.
+            size (int): The current file size.
+            mtime (Any): The current file modification time.
+
+        Returns:
+            Optional[dict[str, Any]]: The stored data, or None if missing or stale.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry["size"] != size or entry["mtime"] != mtime:
+            return None
+        return entry["data"]
+
+    def set(self, key: str, size: int, mtime: Any, data: dict[str, Any]) -> dict[str, Any]:
+        """Store data for key, replacing any previous entry.
+
+        Args:
+            key (str): The file path or any unique file key.
+            size (int): The current file size.
+            mtime (Any): The current file modification time.
+            data (dict[str, Any]): JSON serializable data for the file.
+
+        Returns:
+            dict[str, Any]: The stored data. Later changes to it are saved with the index.
+        """
+        self._entries[key] = {"size": size, "mtime": mtime, "data": data}
+        self._dirty = True
+        return data
+
+    def touch(self) -> None:
+        """Mark the index as changed after mutating stored data in place."""
+        self._dirty = True
+
+    def save(self) -> None:
+        """Atomically write the index to disk if it has changed."""
+        if self.path is None or not self._dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, mode="w") as file:
+            json.dump(self._entries, file)
+        os.replace(temp_path, self.path)
+        self._dirty = False
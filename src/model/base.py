@@ -0,0 +1,89 @@
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, ClassVar, Generic, Iterable, Optional, TypeVar, Union
+from src.library.utils import json_loads
+
+MODEL = TypeVar("MODEL", bound="Model")
+
+def interned(values: Optional[Iterable[str]]) -> tuple[str, ...]:
+    """Intern repeated strings (loaders, game versions...) so every model shares one copy."""
+    return tuple(map(sys.intern, values or ()))
+
+def intern_or_none(value: Optional[str]) -> Optional[str]:
+    return None if value is None else sys.intern(value)
+
+@dataclass(slots=True)
+class Model:
+    """Base class for compact API models.
+
+    Subclasses declare in FIELDS, in field order, the function converting each field from the decoded JSON object.
+    The same functions build full models and convert the fields of lazy views.
+    KEYS lists the keys of the JSON object read by these functions besides the field names, lazy views dropping every other key.
+    """
+    FIELDS: ClassVar[dict[str, Callable[[dict[str, Any]], Any]]] = {}
+    KEYS: ClassVar[tuple[str, ...]] = ()
+
+    @classmethod
+    def from_dict(cls: type[MODEL], data: dict[str, Any]) -> MODEL:
+        """Build a model from a decoded JSON object.
+
+        Args:
+            data (dict[str, Any]): Decoded JSON object.
+
+        Returns:
+            MODEL: The model.
+        """
+        return cls(*[convert(data) for convert in cls.FIELDS.values()])
+
+    @classmethod
+    def loads(cls: type[MODEL], body: Union[bytes, str], lazy: bool = False) -> list[Union[MODEL, "Lazy[MODEL]"]]:
+        """Decode a JSON array of objects, or an object of objects keyed by id or hash.
+
+        Args:
+            body (Union[bytes, str]): Raw JSON body.
+            lazy (bool, optional): Convert fields on first access instead of upfront. Defaults to False.
+
+        Returns:
+            list[Union[MODEL, Lazy[MODEL]]]: Models in document order.
+        """
+        data = json_loads(body)
+        items = data.values() if isinstance(data, dict) else data
+        if lazy:
+            return [Lazy(cls, item) for item in items]
+        return [cls.from_dict(item) for item in items]
+
+class Lazy(Generic[MODEL]):
+    """Model view over a decoded JSON object, converting each field the first time it is read.
+
+    Properties of the model work on the view too. Use materialize to get the full model.
+    Only the keys read by the model are kept, so the view does not retain the fields the model drops, like the changelog of versions.
+
+    Args:
+        model (type[MODEL]): Model class.
+        data (dict[str, Any]): Decoded JSON object.
+    """
+    __slots__ = ("_model", "_data", "_values")
+
+    def __init__(self, model: type[MODEL], data: dict[str, Any]) -> None:
+        self._model = model
+        self._data = {name: data[name] for name in (*model.FIELDS, *model.KEYS) if name in data}
+        self._values: dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self._values:
+            return self._values[name]
+        convert = self._model.FIELDS.get(name)
+        if convert is not None:
+            value = self._values[name] = convert(self._data)
+            return value
+        attribute = getattr(self._model, name, None)
+        if isinstance(attribute, property) and attribute.fget is not None:
+            return attribute.fget(self)
+        raise AttributeError(f"{self._model.__name__} has no field {name}")
+
+    def materialize(self) -> MODEL:
+        """Convert every field, returning the full model."""
+        return self._model.from_dict(self._data)
+
+    def __repr__(self) -> str:
+        return f"Lazy[{self._model.__name__}]({self._data.get('id')})"
@@ -0,0 +1,9 @@
+from src.model.modrinth.project import Project
+from src.model.modrinth.version import Dependency, Version, VersionFile
+
+__all__ = [
+    "Project",
+    "Dependency",
+    "Version",
+    "VersionFile",
+]
@@ -1,28 +1,47 @@
-from pydantic import BaseModel
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, Callable, ClassVar, Optional
+from src.model.base import Model, interned, intern_or_none
 
-class Project(BaseModel):
+@dataclass(slots=True)
+class Project(Model):
+    """Modrinth project, from the project endpoints or a search hit"""
+    id: str
     slug: str
     title: str
     description: str
-    categories: list[str]
-    display_categories: list[str]
+    project_type: str
     client_side: str
     server_side: str
-    project_type: str
+    categories: tuple[str, ...]
+    loaders: tuple[str, ...]
+    game_versions: tuple[str, ...]
+    versions: tuple[str, ...]
     downloads: int
-    project_id: str
-    author: str
-    versions: list[str]
-    follows: int
-    date_created: str
-    date_modified: str
-    latest_version: str
-    license: str
-
+    followers: int
+    license: Optional[str]
     icon_url: Optional[str]
-    color: Optional[str]
-    thread_id: str
-    monetization_status: str
-    gallery: list[str]
-    featured_gallery: str
\ No newline at end of file
+    color: Optional[int]
+    published: Optional[str]
+    updated: Optional[str]
+
+    FIELDS: ClassVar[dict[str, Callable[[dict[str, Any]], Any]]] = {
+        "id": lambda data: data.get('id') or data['project_id'],
+        "slug": lambda data: data['slug'],
+        "title": lambda data: data['title'],
+        "description": lambda data: data.get('description', ''),
+        "project_type": lambda data: intern_or_none(data['project_type']),
+        "client_side": lambda data: intern_or_none(data.get('client_side', 'unknown')),
+        "server_side": lambda data: intern_or_none(data.get('server_side', 'unknown')),
+        "categories": lambda data: interned(data.get('categories')),
+        "loaders": lambda data: interned(data.get('loaders')),
+        "game_versions": lambda data: interned(data.get('game_versions')),
+        "versions": lambda data: tuple(data.get('versions') or ()),
+        "downloads": lambda data: data.get('downloads', 0),
+        "followers": lambda data: data.get('followers', data.get('follows', 0)),
+        "license": lambda data: data['license']['id'] if isinstance(data.get('license'), dict) else data.get('license'),
+        "icon_url": lambda data: data.get('icon_url'),
+        "color": lambda data: data.get('color'),
+        "published": lambda data: data.get('published', data.get('date_created')),
+        "updated": lambda data: data.get('updated', data.get('date_modified')),
+    }
+    KEYS: ClassVar[tuple[str, ...]] = ("project_id", "follows", "date_created", "date_modified")
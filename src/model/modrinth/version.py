@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from typing import Any, Callable, ClassVar, Optional
+from src.model.base import Model, interned, intern_or_none
+
+@dataclass(slots=True)
+class Dependency(Model):
+    """Dependency of a Modrinth version"""
+    project_id: Optional[str]
+    version_id: Optional[str]
+    file_name: Optional[str]
+    dependency_type: str
+
+    FIELDS: ClassVar[dict[str, Callable[[dict[str, Any]], Any]]] = {
+        "project_id": lambda data: intern_or_none(data.get('project_id')),
+        "version_id": lambda data: data.get('version_id'),
+        "file_name": lambda data: data.get('file_name'),
+        "dependency_type": lambda data: intern_or_none(data['dependency_type']),
+    }
+
+@dataclass(slots=True)
+class VersionFile(Model):
+    """File of a Modrinth version"""
+    url: str
+    filename: str
+    primary: bool
+    size: int
+    sha1: str
+    sha512: str
+    file_type: Optional[str]
+
+    FIELDS: ClassVar[dict[str, Callable[[dict[str, Any]], Any]]] = {
+        "url": lambda data: data['url'],
+        "filename": lambda data: data['filename'],
+        "primary": lambda data: bool(data.get('primary')),
+        "size": lambda data: data.get('size', 0),
+        "sha1": lambda data: data['hashes']['sha1'],
+        "sha512": lambda data: data['hashes']['sha512'],
+        "file_type": lambda data: intern_or_none(data.get('file_type')),
+    }
+    KEYS: ClassVar[tuple[str, ...]] = ("hashes",)
+
+    @property
+    def hashes(self) -> dict[str, str]:
+        return {"sha1": self.sha1, "sha512": self.sha512}
+
+@dataclass(slots=True)
+class Version(Model):
+    """Modrinth version. The changelog is not kept, as it is usually the largest field and is not needed to compare versions."""
+    id: str
+    project_id: str
+    name: str
+    version_number: str
+    version_type: str
+    status: Optional[str]
+    featured: bool
+    date_published: str
+    downloads: int
+    loaders: tuple[str, ...]
+    game_versions: tuple[str, ...]
+    dependencies: tuple[Dependency, ...]
+    files: tuple[VersionFile, ...]
+
+    FIELDS: ClassVar[dict[str, Callable[[dict[str, Any]], Any]]] = {
+        "id": lambda data: data['id'],
+        "project_id": lambda data: intern_or_none(data['project_id']),
+        "name": lambda data: data.get('name', ''),
+        "version_number": lambda data: data['version_number'],
+        "version_type": lambda data: intern_or_none(data.get('version_type', 'release')),
+        "status": lambda data: intern_or_none(data.get('status')),
+        "featured": lambda data: bool(data.get('featured')),
+        "date_published": lambda data: data.get('date_published', ''),
+        "downloads": lambda data: data.get('downloads', 0),
+        "loaders": lambda data: interned(data.get('loaders')),
+        "game_versions": lambda data: interned(data.get('game_versions')),
+        "dependencies": lambda data: tuple(map(Dependency.from_dict, data.get('dependencies') or ())),
+        "files": lambda data: tuple(map(VersionFile.from_dict, data.get('files') or ())),
+    }
+
+    @property
+    def primary_file(self) -> Optional[VersionFile]:
+        """The primary file of the version, or its first file. None if the version has no file."""
+        return next((file for file in self.files if file.primary), self.files[0] if self.files else None)
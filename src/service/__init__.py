@@ -0,0 +1,17 @@
+from src.service.dependencies import DependencyConflict, DependencyGraph, DependencyResolver
+from src.service.identify import InstalledFile, ModIdentifier
+from src.service.scan import ServerScan, ScanEngine
+from src.service.sync import SyncFile, SyncPlan, SyncPlanner
+
+__all__ = [
+    "DependencyConflict",
+    "DependencyGraph",
+    "DependencyResolver",
+    "InstalledFile",
+    "ModIdentifier",
+    "ServerScan",
+    "ScanEngine",
+    "SyncFile",
+    "SyncPlan",
+    "SyncPlanner",
+]
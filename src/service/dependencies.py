@@ -0,0 +1,187 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from src.library.api.client.modrinth import ModrinthAPI
+from src.library.utils import getenv
+from src.library.utils.graph import strongly_connected
+
+logger = logging.getLogger("DependencyResolver")
+
+RESOLVE_CONCURRENCY = int(getenv("RESOLVE_CONCURRENCY", "8"))
+
+DEPENDENCY_REQUIRED = "required"
+DEPENDENCY_INCOMPATIBLE = "incompatible"
+
+Target = tuple[tuple[str, ...], tuple[str, ...]]
+
+@dataclass
+class DependencyConflict:
+    """Dependency that cannot be satisfied together with the resolved graph"""
+    project_id: str
+    reason: str
+    required_by: Optional[str] = None
+    version_id: Optional[str] = None
+
+@dataclass
+class DependencyGraph:
+    """Transitive required dependencies of a set of projects"""
+    nodes: dict[str, dict] = field(default_factory=dict)
+    edges: dict[str, list[str]] = field(default_factory=dict)
+    order: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+    conflicts: list[DependencyConflict] = field(default_factory=list)
+    cycles: list[list[str]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.missing or self.conflicts)
+
+    @property
+    def versions(self) -> list[dict]:
+        """Resolved versions in install order, dependencies first."""
+        return [self.nodes[project_id] for project_id in self.order]
+
+class DependencyResolver:
+    """Expand projects into their transitive required dependencies for a loader and game version.
+
+    The graph is explored one frontier level at a time: pinned versions of a level are fetched with bulk /versions requests,
+    and the latest compatible version of the other projects is looked up concurrently. Versions and per-project lookups are
+    memoized by the resolver, so the subgraphs shared by several servers are fetched once.
+
+    Args:
+        modrinth (ModrinthAPI): Client used to fetch versions.
+        concurrency (int, optional): Maximum number of concurrent project version lookups. Defaults to RESOLVE_CONCURRENCY.
+    """
+    def __init__(self, modrinth: ModrinthAPI, concurrency: int = RESOLVE_CONCURRENCY) -> None:
+        self.modrinth = modrinth
+        self.concurrency = concurrency
+        self._versions: dict[str, dict] = {}
+        self._latest: dict[tuple[str, Target], Optional[str]] = {}
+
+    async def resolve(self,
+            projects: list[str] = [],
+            versions: list[dict] = [],
+            loaders: list[str] = [],
+            game_versions: list[str] = [],
+            ) -> DependencyGraph:
+        """Build the dependency graph of projects and versions, and its install order.
+
+        Explicit versions take precedence over the versions required by dependencies; a dependency pinned to another version is reported as a conflict.
+
+        Args:
+            projects (list[str], optional): Root project ids, resolved to their latest compatible version. Defaults to [].
+            versions (list[dict], optional): Root Modrinth versions. Defaults to [].
+            loaders (list[str], optional): Accepted loaders. Defaults to [].
+            game_versions (list[str], optional): Accepted game versions. Defaults to [].
+
+        Returns:
+            DependencyGraph: Resolved versions by project, install order, missing projects, conflicts and cycles.
+        """
+        target: Target = (tuple(loaders), tuple(game_versions))
+        graph = DependencyGraph()
+        incompatible: list[tuple[str, dict]] = []
+        unresolved: dict[str, Optional[str]] = {}
+
+        frontier: list[tuple[Optional[str], dict[str, Any]]] = []
+        for version in versions:
+            self._versions[version["id"]] = version
+            frontier.append((None, {"project_id": version["project_id"], "version_id": version["id"]}))
+        frontier.extend((None, {"project_id": project_id}) for project_id in projects)
+
+        while frontier:
+            await self._fetch(frontier, target, graph)
+            next_frontier: list[tuple[Optional[str], dict[str, Any]]] = []
+            for requester, dependency in frontier:
+                version = self._lookup(dependency, target, graph)
+                if version is None:
+                    unresolved.setdefault(dependency.get("project_id") or dependency["version_id"], requester)
+                    continue
+                project_id = version["project_id"]
+                if requester is not None:
+                    graph.edges[requester].append(project_id)
+                current = graph.nodes.get(project_id)
+                if current is not None:
+                    if dependency.get("version_id") and current["id"] != version["id"]:
+                        graph.conflicts.append(DependencyConflict(project_id, "version", requester, version["id"]))
+                    continue
+                graph.nodes[project_id] = version
+                graph.edges[project_id] = []
+                for child in version.get("dependencies") or []:
+                    if not (child.get("project_id") or child.get("version_id")):
+                        continue
+                    if child["dependency_type"] == DEPENDENCY_REQUIRED:
+                        next_frontier.append((project_id, child))
+                    elif child["dependency_type"] == DEPENDENCY_INCOMPATIBLE:
+                        incompatible.append((project_id, child))
+            frontier = next_frontier
+
+        graph.missing = [project_id for project_id in unresolved if project_id not in graph.nodes]
+        for requester, dependency in incompatible:
+            conflict = self._incompatible(graph, requester, dependency)
+            if conflict is not None:
+                graph.conflicts.append(conflict)
+
+        for component in strongly_connected(graph.nodes, graph.edges):
+            graph.order.extend(component)
+            if len(component) > 1 or component[0] in graph.edges[component[0]]:
+                graph.cycles.append(component)
+
+        logger.info(f"Resolved {len(graph.nodes)} projects: {len(graph.missing)} missing, {len(graph.conflicts)} conflicts, {len(graph.cycles)} cycles")
+        return graph
+
+    def clear(self) -> None:
+        """Forget the memoized versions, so the next resolution fetches fresh data."""
+        self._versions.clear()
+        self._latest.clear()
+
+    def _lookup(self, dependency: dict[str, Any], target: Target, graph: DependencyGraph) -> Optional[dict]:
+        version_id = dependency.get("version_id")
+        if version_id is None:
+            # Any version of a project already in the graph satisfies an unpinned dependency, so its latest version is not fetched
+            resolved = graph.nodes.get(dependency["project_id"])
+            if resolved is not None:
+                return resolved
+            version_id = self._latest.get((dependency["project_id"], target))
+        if version_id is None:
+            return None
+        return self._versions.get(version_id)
+
+    async def _fetch(self, frontier: list[tuple[Optional[str], dict[str, Any]]], target: Target, graph: DependencyGraph) -> None:
+        """Fetch every version of a frontier level that is not memoized yet."""
+        version_ids: dict[str, None] = {}
+        project_ids: dict[str, None] = {}
+        for _, dependency in frontier:
+            version_id = dependency.get("version_id")
+            if version_id is not None:
+                if version_id not in self._versions:
+                    version_ids[version_id] = None
+            elif dependency["project_id"] not in graph.nodes and (dependency["project_id"], target) not in self._latest:
+                project_ids[dependency["project_id"]] = None
+        if not (version_ids or project_ids):
+            return
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async def latest(project_id: str) -> None:
+            async with semaphore:
+                version = await self.modrinth.latest_version(project_id, list(target[0]), list(target[1]))
+            if version is not None:
+                self._versions.setdefault(version["id"], version)
+            self._latest[(project_id, target)] = version and version["id"]
+
+        async def pinned() -> None:
+            if version_ids:
+                for version in await self.modrinth.versions(list(version_ids)):
+                    self._versions[version["id"]] = version
+
+        await asyncio.gather(pinned(), *[latest(project_id) for project_id in project_ids])
+
+    def _incompatible(self, graph: DependencyGraph, requester: str, dependency: dict[str, Any]) -> Optional[DependencyConflict]:
+        version_id = dependency.get("version_id")
+        project_id = dependency.get("project_id")
+        if project_id is None and version_id in self._versions:
+            project_id = self._versions[version_id]["project_id"]
+        installed = graph.nodes.get(project_id) if project_id is not None else None
+        if installed is None or (version_id is not None and installed["id"] != version_id):
+            return None
+        return DependencyConflict(project_id, "incompatible", requester, installed["id"]) # type: ignore
@@ -0,0 +1,148 @@
+import os
+import asyncio
+import logging
+import posixpath
+import tempfile
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+from src.library.api.client.modrinth import ModrinthAPI
+from src.library.api.client.pterodactyl import PterodactylAPI
+from src.library.utils import getenv
+from src.library.utils.hashing import HashIndex, hash_file
+
+logger = logging.getLogger("ModIdentifier")
+
+IDENTIFY_INDEX = getenv("IDENTIFY_INDEX", ".cache/hash_index.json")
+IDENTIFY_DOWNLOADS = int(getenv("IDENTIFY_DOWNLOADS", "4"))
+IDENTIFY_EXTENSIONS = (".jar",)
+
+def server_key(server_id: str, filepath: str) -> str:
+    """Hash index key of a server file."""
+    return f"{server_id}:{filepath}"
+
+def is_mod_file(attributes: dict[str, Any]) -> bool:
+    """Whether a server_files_list entry is a mod file."""
+    return attributes["is_file"] and attributes["name"].endswith(IDENTIFY_EXTENSIONS)
+
+@dataclass
+class InstalledFile:
+    """Mod file identified from its hashes"""
+    path: str
+    hashes: dict[str, str]
+    version: Optional[dict]
+
+class ModIdentifier:
+    """Identify the Modrinth version of mod files from their hashes.
+
+    Hashes and resolved versions are memoized in a HashIndex, so unchanged files are neither hashed nor queried again.
+    All unknown hashes of a call are resolved with a single bulk version_files lookup.
+
+    Args:
+        modrinth (ModrinthAPI): Client used to resolve hashes.
+        pterodactyl (Optional[PterodactylAPI], optional): Client used to fetch server files. Defaults to None.
+        index (Optional[HashIndex], optional): Hash index. Defaults to a HashIndex backed by IDENTIFY_INDEX.
+        algorithm (str, optional): Hash algorithm used for the lookup. Defaults to "sha1".
+        executor (Optional[ThreadPoolExecutor], optional): Executor for local hashing. Defaults to None (event loop default executor).
+    """
+    def __init__(self,
+            modrinth: ModrinthAPI,
+            pterodactyl: Optional[PterodactylAPI] = None,
+            index: Optional[HashIndex] = None,
+            algorithm: str = "sha1",
+            executor: Optional[ThreadPoolExecutor] = None,
+            ) -> None:
+        self.modrinth = modrinth
+        self.pterodactyl = pterodactyl
+        self.index = index or HashIndex(IDENTIFY_INDEX)
+        self.algorithm = algorithm
+        self.executor = executor
+
+    async def identify_paths(self, paths: list[str]) -> dict[str, InstalledFile]:
+        """Identify local mod files.
+
+        Args:
+            paths (list[str]): Local file paths.
+
+        Returns:
+            dict[str, InstalledFile]: Identified files by path, with a None version if the file is unknown to Modrinth.
+        """
+        loop = asyncio.get_running_loop()
+        entries: dict[str, dict[str, Any]] = {}
+        pending: list[tuple[str, os.stat_result]] = []
+        for path in paths:
+            stat = os.stat(path)
+            entry = self.index.get(path, stat.st_size, stat.st_mtime_ns)
+            if entry is None:
+                pending.append((path, stat))
+            else:
+                entries[path] = entry
+
+        hashes = await asyncio.gather(*[
+            loop.run_in_executor(self.executor, hash_file, path)
+            for path, _ in pending])
+        for (path, stat), digests in zip(pending, hashes):
+            entries[path] = self.index.set(path, stat.st_size, stat.st_mtime_ns, {"hashes": digests})
+        return await self._resolve(entries)
+
+    async def identify_server(self, server_id: str, directory: str = "mods", listing: Optional[dict] = None) -> dict[str, InstalledFile]:
+        """Identify the mod files of a Pterodactyl server directory.
+
+        Only files missing from the index, or changed since, are downloaded and hashed.
+
+        Args:
+            server_id (str): Server identifier.
+            directory (str, optional): Server directory holding the mods. Defaults to "mods".
+            listing (Optional[dict], optional): server_files_list response for directory, if already fetched. Defaults to None.
+
+        Returns:
+            dict[str, InstalledFile]: Identified files by server file path, with a None version if the file is unknown to Modrinth.
+        """
+        if self.pterodactyl is None:
+            raise ValueError("ModIdentifier requires a PterodactylAPI to identify server files")
+
+        if listing is None:
+            listing = await self.pterodactyl.server_files_list(server_id, directory)
+        files = [
+            item["attributes"]
+            for item in listing["data"]
+            if is_mod_file(item["attributes"])
+        ]
+
+        entries: dict[str, dict[str, Any]] = {}
+        pending: list[dict[str, Any]] = []
+        for file in files:
+            filepath = posixpath.join(directory, file["name"])
+            entry = self.index.get(server_key(server_id, filepath), file["size"], file["modified_at"])
+            if entry is None:
+                pending.append(file)
+            else:
+                entries[filepath] = entry
+
+        semaphore = asyncio.Semaphore(IDENTIFY_DOWNLOADS)
+        async def download(file: dict[str, Any]) -> None:
+            filepath = posixpath.join(directory, file["name"])
+            async with semaphore:
+                with tempfile.TemporaryDirectory() as folder:
+                    digests = await self.pterodactyl.server_files_download_to( # type: ignore
+                        server_id, filepath, os.path.join(folder, file["name"]))
+            entries[filepath] = self.index.set(server_key(server_id, filepath), file["size"], file["modified_at"], {"hashes": digests})
+
+        await asyncio.gather(*[download(file) for file in pending])
+        logger.info(f"Server {server_id}: {len(pending)} of {len(files)} files hashed")
+        return await self._resolve(entries)
+
+    async def _resolve(self, entries: dict[str, dict[str, Any]]) -> dict[str, InstalledFile]:
+        unresolved = [entry for entry in entries.values() if "version" not in entry]
+        if unresolved:
+            versions = await self.modrinth.version_files(
+                [entry["hashes"][self.algorithm] for entry in unresolved],
+                self.algorithm)
+            for entry in unresolved:
+                entry["version"] = versions.get(entry["hashes"][self.algorithm])
+            self.index.touch()
+        self.index.save()
+        return {
+            path: InstalledFile(path=path, hashes=entry["hashes"], version=entry["version"])
+            for path, entry in entries.items()
+        }
@@ -0,0 +1,139 @@
+import time
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterable, Optional
+from src.library.api.client.modrinth import ModrinthAPI
+from src.library.api.client.pterodactyl import PterodactylAPI
+from src.library.utils import getenv
+from src.library.utils.concurrency import ConcurrencyLimiter, as_completed
+from src.service.identify import InstalledFile, ModIdentifier
+
+logger = logging.getLogger("ScanEngine")
+
+SCAN_CONCURRENCY = int(getenv("SCAN_CONCURRENCY", "16"))
+SCAN_NODE_CONCURRENCY = int(getenv("SCAN_NODE_CONCURRENCY", "4"))
+SCAN_DIRECTORY = getenv("SCAN_DIRECTORY", "mods")
+
+@dataclass
+class ServerScan:
+    """Update scan result of a single server"""
+    server_id: str
+    name: str
+    installed: dict[str, InstalledFile] = field(default_factory=dict)
+    updates: dict[str, dict] = field(default_factory=dict)
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+def server_target(installed: Iterable[InstalledFile]) -> tuple[list[str], list[str]]:
+    """Guess the loader and game version of a server from its identified mods.
+
+    Args:
+        installed (Iterable[InstalledFile]): Identified mod files.
+
+    Returns:
+        tuple[list[str], list[str]]: Most common loader and game version, empty if nothing is known.
+    """
+    loaders: Counter[str] = Counter()
+    game_versions: Counter[str] = Counter()
+    for file in installed:
+        if file.version is None:
+            continue
+        loaders.update(file.version["loaders"])
+        game_versions.update(file.version["game_versions"])
+    return (
+        [loader for loader, _ in loaders.most_common(1)],
+        [game_version for game_version, _ in game_versions.most_common(1)]
+    )
+
+class ScanEngine:
+    """Fan out update checks across every Pterodactyl server and its mods.
+
+    Servers are scanned concurrently, bounded by a global limit and a limit per Pterodactyl node, and results are yielded as each server finishes.
+
+    Args:
+        pterodactyl (PterodactylAPI): Client used to list servers and their files.
+        modrinth (ModrinthAPI): Client used to look up updates.
+        identifier (Optional[ModIdentifier], optional): Identifier for installed mods. Defaults to a ModIdentifier over both clients.
+        concurrency (int, optional): Maximum number of servers scanned at once. Defaults to SCAN_CONCURRENCY.
+        node_concurrency (int, optional): Maximum number of servers of the same node scanned at once. Defaults to SCAN_NODE_CONCURRENCY.
+        directory (str, optional): Server directory holding the mods. Defaults to SCAN_DIRECTORY.
+    """
+    def __init__(self,
+            pterodactyl: PterodactylAPI,
+            modrinth: ModrinthAPI,
+            identifier: Optional[ModIdentifier] = None,
+            concurrency: int = SCAN_CONCURRENCY,
+            node_concurrency: int = SCAN_NODE_CONCURRENCY,
+            directory: str = SCAN_DIRECTORY,
+            ) -> None:
+        self.pterodactyl = pterodactyl
+        self.modrinth = modrinth
+        self.identifier = identifier or ModIdentifier(modrinth, pterodactyl)
+        self.limiter = ConcurrencyLimiter(concurrency, node_concurrency)
+        self.directory = directory
+
+    async def servers(self) -> list[dict]:
+        """List the servers available to the Pterodactyl client.
+
+        Returns:
+            list[dict]: Server attributes.
+        """
+        return [server["attributes"] async for server in self.pterodactyl.servers()]
+
+    async def scan(self, servers: Optional[list[dict]] = None) -> AsyncIterator[ServerScan]:
+        """Scan servers concurrently, yielding each result as soon as it is ready.
+
+        Breaking out of the iteration, or cancelling the consumer, cancels the pending scans.
+
+        Args:
+            servers (Optional[list[dict]], optional): Server attributes to scan. Defaults to None (every server).
+
+        Yields:
+            ServerScan: Result of the next finished server.
+        """
+        if servers is None:
+            servers = await self.servers()
+        async for result in as_completed(self._scan_limited(server) for server in servers):
+            yield result
+
+    async def _scan_limited(self, server: dict) -> ServerScan:
+        async with self.limiter.acquire(server.get("node")):
+            return await self.scan_server(server["identifier"], server.get("name", server["identifier"]))
+
+    async def scan_server(self, server_id: str, name: str = "") -> ServerScan:
+        """Identify the mods of a server and look up their updates.
+
+        Errors are captured in the result, so one failing server does not stop a fleet scan.
+
+        Args:
+            server_id (str): Server identifier.
+            name (str, optional): Server display name. Defaults to "".
+
+        Returns:
+            ServerScan: Installed files and available updates by server file path.
+        """
+        result = ServerScan(server_id=server_id, name=name or server_id)
+        start = time.perf_counter()
+        try:
+            result.installed = await self.identifier.identify_server(server_id, self.directory)
+            known = [file for file in result.installed.values() if file.version is not None]
+            loaders, game_versions = server_target(known)
+            algorithm = self.identifier.algorithm
+            latest = await self.modrinth.version_files_update(
+                [file.hashes[algorithm] for file in known],
+                algorithm, loaders, game_versions)
+            result.updates = {
+                file.path: latest[file.hashes[algorithm]]
+                for file in known
+                if file.hashes[algorithm] in latest
+                and latest[file.hashes[algorithm]]["id"] != file.version["id"] # type: ignore
+            }
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Scan of server {result.name} has failed: {e}")
+            result.error = e
+        result.elapsed = time.perf_counter() - start
+        return result
@@ -0,0 +1,199 @@
+import os
+import json
+import asyncio
+import logging
+import posixpath
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from src.library.api.client.modrinth import ModrinthCDN
+from src.library.api.client.pterodactyl import PterodactylAPI
+from src.library.utils import getenv
+from src.service.identify import ModIdentifier, is_mod_file, server_key
+
+logger = logging.getLogger("SyncPlanner")
+
+SYNC_STATE = getenv("SYNC_STATE", ".cache/sync_state.json")
+SYNC_UPLOADS = int(getenv("SYNC_UPLOADS", "4"))
+
+def primary_file(version: dict) -> dict:
+    """Return the primary file of a Modrinth version, or its first file."""
+    files: list[dict] = version["files"]
+    return next((file for file in files if file.get("primary")), files[0])
+
+def snapshot(listing: dict) -> dict[str, list]:
+    """Reduce a server_files_list response to the name, size and mtime of its mod files."""
+    return {
+        item["attributes"]["name"]: [item["attributes"]["size"], item["attributes"]["modified_at"]]
+        for item in listing["data"]
+        if is_mod_file(item["attributes"])
+    }
+
+@dataclass
+class SyncFile:
+    """Modrinth version file to install"""
+    version: dict
+    file: dict
+
+    @property
+    def filename(self) -> str:
+        return self.file["filename"]
+
+@dataclass
+class SyncPlan:
+    """Minimal set of changes bringing a server directory to the desired versions"""
+    server_id: str
+    directory: str
+    desired: list[str]
+    snapshot: dict[str, list] = field(default_factory=dict)
+    add: list[SyncFile] = field(default_factory=list)
+    replace: list[tuple[str, SyncFile]] = field(default_factory=list)
+    delete: list[str] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.add or self.replace or self.delete)
+
+    @property
+    def uploads(self) -> list[SyncFile]:
+        return self.add + [new for _, new in self.replace]
+
+    @property
+    def removals(self) -> list[str]:
+        """Server files to delete, excluding replaced files overwritten by an upload of the same name."""
+        uploaded = {file.filename for file in self.uploads}
+        return [
+            name
+            for name in self.delete + [old for old, _ in self.replace]
+            if name not in uploaded
+        ]
+
+class SyncPlanner:
+    """Plan and apply incremental mod synchronization of Pterodactyl servers.
+
+    The directory listing and desired versions of the last synchronization are persisted by server, so an unchanged server is planned from a single listing call.
+    Plans are applied with one upload per changed file and a single batched delete.
+
+    Args:
+        pterodactyl (PterodactylAPI): Client used to list, upload and delete server files.
+        cdn (ModrinthCDN): Client used to download the mod files.
+        identifier (ModIdentifier): Identifier for installed mods.
+        state_path (Optional[str], optional): JSON file with the last-known server states. Defaults to SYNC_STATE.
+        prune (bool, optional): Delete identified Modrinth mods that are not desired. Defaults to False.
+    """
+    def __init__(self,
+            pterodactyl: PterodactylAPI,
+            cdn: ModrinthCDN,
+            identifier: ModIdentifier,
+            state_path: Optional[str] = SYNC_STATE,
+            prune: bool = False,
+            ) -> None:
+        self.pterodactyl = pterodactyl
+        self.cdn = cdn
+        self.identifier = identifier
+        self.state_path = state_path
+        self.prune = prune
+        self._states: dict[str, dict[str, Any]] = {}
+        if state_path is not None and os.path.exists(state_path):
+            with open(state_path) as file:
+                self._states = json.load(file)
+
+    async def plan(self, server_id: str, versions: list[dict], directory: str = "mods") -> SyncPlan:
+        """Compute the changes needed for a server directory to hold exactly the desired versions.
+
+        Args:
+            server_id (str): Server identifier.
+            versions (list[dict]): Desired Modrinth versions, at most one per project.
+            directory (str, optional): Server directory holding the mods. Defaults to "mods".
+
+        Returns:
+            SyncPlan: Files to add, replace and delete.
+        """
+        listing = await self.pterodactyl.server_files_list(server_id, directory)
+        plan = SyncPlan(
+            server_id=server_id,
+            directory=directory,
+            desired=sorted(version["id"] for version in versions),
+            snapshot=snapshot(listing))
+        state = self._states.get(server_key(server_id, directory))
+        if state is not None and state["snapshot"] == plan.snapshot and state["desired"] == plan.desired:
+            logger.info(f"Server {server_id}:{directory} is unchanged since the last synchronization")
+            return plan
+
+        installed = await self.identifier.identify_server(server_id, directory, listing)
+        by_hash = {file.hashes["sha1"]: file for file in installed.values()}
+        by_project = {
+            file.version["project_id"]: posixpath.basename(file.path)
+            for file in installed.values()
+            if file.version is not None
+        }
+
+        desired_projects = set()
+        for version in versions:
+            desired_projects.add(version["project_id"])
+            target = SyncFile(version=version, file=primary_file(version))
+            if target.file["hashes"]["sha1"] in by_hash:
+                continue
+            if version["project_id"] in by_project:
+                plan.replace.append((by_project[version["project_id"]], target))
+            else:
+                plan.add.append(target)
+
+        if self.prune:
+            plan.delete = [
+                name
+                for project_id, name in by_project.items()
+                if project_id not in desired_projects
+            ]
+        logger.info(f"Server {server_id}:{directory} plan: {len(plan.add)} add, {len(plan.replace)} replace, {len(plan.delete)} delete")
+        return plan
+
+    async def apply(self, plan: SyncPlan) -> None:
+        """Apply a plan: upload new files, then delete the old ones in a single call.
+
+        The resulting directory listing is persisted, and the uploaded files are recorded in the hash index so they are not downloaded again to be identified.
+
+        Args:
+            plan (SyncPlan): Plan to apply.
+        """
+        if plan.empty:
+            self._remember(plan, plan.snapshot)
+            return
+
+        semaphore = asyncio.Semaphore(SYNC_UPLOADS)
+        async def upload(target: SyncFile) -> None:
+            async with semaphore:
+                with tempfile.TemporaryDirectory() as folder:
+                    path = os.path.join(folder, target.filename)
+                    await self.cdn.download_file_to(target.file["url"], path, target.file["hashes"], target.file.get("size"))
+                    await self.pterodactyl.server_files_upload(plan.server_id, plan.directory, path)
+        await asyncio.gather(*[upload(target) for target in plan.uploads])
+
+        removals = plan.removals
+        if removals:
+            await self.pterodactyl.server_files_delete(plan.server_id, plan.directory, removals)
+
+        listing = await self.pterodactyl.server_files_list(plan.server_id, plan.directory)
+        uploaded = {target.filename: target for target in plan.uploads}
+        for item in listing["data"]:
+            attributes = item["attributes"]
+            target = uploaded.get(attributes["name"])
+            if target is not None:
+                self.identifier.index.set(
+                    server_key(plan.server_id, posixpath.join(plan.directory, attributes["name"])),
+                    attributes["size"], attributes["modified_at"],
+                    {"hashes": target.file["hashes"], "version": target.version})
+        self.identifier.index.save()
+
+        self._remember(plan, snapshot(listing))
+
+    def _remember(self, plan: SyncPlan, listing_snapshot: dict[str, list]) -> None:
+        self._states[server_key(plan.server_id, plan.directory)] = {"snapshot": listing_snapshot, "desired": plan.desired}
+        if self.state_path is None:
+            return
+        directory = os.path.dirname(os.path.abspath(self.state_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, mode="w") as file:
+            json.dump(self._states, file)
+        os.replace(temp_path, self.state_path)
@@ -4,28 +4,36 @@ from pprint import pprint
 from src.library.utils import load_env, name_from_url
 load_env(".env.yaml")
 
+from src.library.api import ConnectionPool
 from src.library.api.client.pterodactyl import PterodactylAPI
 from src.library.api.client.modrinth import ModrinthAPI, ModrinthCDN
-pterodactylAPI = PterodactylAPI()
-modrinthAPI = ModrinthAPI()
-modrinthCDN = ModrinthCDN()
 
-response = asyncio.run(modrinthAPI.project_dependencies("oh-the-biomes-weve-gone"))
-parsed = [mod["slug"] for mod in response["projects"]]
-pprint(parsed)
+async def main() -> None:
+    async with ConnectionPool() as pool:
+        pterodactylAPI = PterodactylAPI(pool=pool)
+        modrinthAPI = ModrinthAPI(pool=pool)
+        modrinthCDN = ModrinthCDN(pool=pool)
 
-response = asyncio.run(modrinthAPI.project_versions("oh-the-biomes-weve-gone", loaders=["forge", "neoforge"], game_versions=["1.20.1"]))
-pprint(response)
+        response = await modrinthAPI.project_dependencies("oh-the-biomes-weve-gone")
+        parsed = [mod["slug"] for mod in response["projects"]]
+        pprint(parsed)
 
-folder: str = "downloads"
-os.makedirs(folder, exist_ok=True)
+        response = await modrinthAPI.project_versions("oh-the-biomes-weve-gone", loaders=["forge", "neoforge"], game_versions=["1.20.1"])
+        pprint(response)
 
-url: str = response[0]["files"][0]["url"]
-filename = os.path.join(folder, name_from_url(url))
+        folder: str = "downloads"
+        os.makedirs(folder, exist_ok=True)
 
-file = asyncio.run(modrinthCDN.download_file(url))
-with open(filename, mode="wb") as f:
-    f.write(file)
+        file: dict = response[0]["files"][0]
+        filename = os.path.join(folder, name_from_url(file["url"]))
 
-# response = asyncio.run(pterodactylAPI.servers_list())
-# pprint(response)
\ No newline at end of file
+        hashes = await modrinthCDN.download_file_to(file["url"], filename, hashes=file["hashes"], size=file.get("size"))
+        pprint(hashes)
+
+        # response = await pterodactylAPI.servers_list()
+        # pprint(response)
+
+        for client in (pterodactylAPI, modrinthAPI, modrinthCDN):
+            await client.aclose()
+
+asyncio.run(main())
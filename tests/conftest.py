@@ -0,0 +1,10 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Required settings of the service modules, the tests never reach these servers
+os.environ.setdefault("PTERODACTYL_API_URL", "http://127.0.0.1/api")
+os.environ.setdefault("PTERODACTYL_TOKEN", "test")
@@ -0,0 +1,46 @@
+import asyncio
+import pytest
+from aiohttp import web, ClientConnectionError
+from src.library.api import HttpAPI, METHOD, CircuitBreaker, CircuitOpenError, RateLimiter
+from src.library.api.cache import MemoryCache
+
+async def start_server() -> tuple[web.AppRunner, str]:
+    async def item(request: web.Request) -> web.Response:
+        return web.json_response({"ok": True}, headers={"Cache-Control": "max-age=60"})
+    app = web.Application()
+    app.router.add_get("/item", item)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}/"
+
+def test_fresh_cache_hits_bypass_open_circuit():
+    async def main() -> None:
+        runner, base_url = await start_server()
+        breaker = CircuitBreaker(threshold=1)
+        async with HttpAPI(base_url, cache=MemoryCache(), circuit_breaker=breaker) as api:
+            handler = await api._request(METHOD.GET, "item")
+            assert handler.json() == {"ok": True}
+            breaker.record("127.0.0.1", ClientConnectionError())
+
+            handler = await api._request(METHOD.GET, "item")
+            assert handler.json() == {"ok": True}
+            assert api.cache.metrics()["hit"] == 1 # type: ignore
+            with pytest.raises(CircuitOpenError):
+                await api._request(METHOD.GET, "item", query={"other": 1})
+        await runner.cleanup()
+    asyncio.run(main())
+
+def test_stream_uses_circuit_key_before_rate_limiter():
+    async def main() -> None:
+        breaker = CircuitBreaker(threshold=1)
+        limiter = RateLimiter()
+        breaker.record("node:1", ClientConnectionError())
+        async with HttpAPI("http://127.0.0.1:9/", circuit_breaker=breaker, rate_limiter=limiter) as api:
+            with pytest.raises(CircuitOpenError) as error:
+                async for _ in api._stream(METHOD.GET, "items", circuit="node:1"):
+                    pass
+        assert error.value.key == "node:1"
+        assert limiter.metrics() == {}
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+import os
+import time
+import asyncio
+import sqlite3
+from src.library.api import HttpAPI
+from src.library.api.cache import ResponseCache, SQLiteCache
+from src.library.api.session import NoAuthSession, TokenSession
+
+HEADERS = {"Cache-Control": "max-age=60"}
+
+def test_key_depends_on_authorization():
+    url = "https://api.modrinth.com/v2/project/sodium"
+    anonymous = ResponseCache.key("GET", url, {}, NoAuthSession().identity())
+    first = ResponseCache.key("GET", url, {}, TokenSession("first").identity())
+    second = ResponseCache.key("GET", url, {}, TokenSession("second").identity())
+    assert len({anonymous, first, second}) == 3
+    assert ResponseCache.key("GET", url, {}, TokenSession("first").identity()) == first
+    assert "first" not in first
+
+def test_sqlite_size_and_eviction(tmp_path):
+    cache = SQLiteCache(os.path.join(tmp_path, "cache.db"), max_size=30)
+    cache.store("a", b"a" * 10, HEADERS)
+    cache.store("b", b"b" * 10, HEADERS)
+    cache.store("a", b"a" * 5, HEADERS)
+    assert cache.size == 15
+    # "a" was used last, so "b" is evicted first
+    assert cache.get("a") is not None
+    cache.store("c", b"c" * 20, HEADERS)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.size == 25
+    cache.close()
+
+    reopened = SQLiteCache(os.path.join(tmp_path, "cache.db"), max_size=30)
+    assert reopened.size == 25
+    reopened.close()
+
+def test_sqlite_hits_do_not_commit(tmp_path):
+    cache = SQLiteCache(os.path.join(tmp_path, "cache.db"), flush_every=3)
+    for key in "abc":
+        cache.store(key, b"body", HEADERS)
+    changes = cache._db.total_changes
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")
+    assert cache._db.total_changes == changes
+    cache.get("c")
+    assert cache._db.total_changes == changes + 3
+    cache.close()
+
+def test_key_encodes_query():
+    url = "https://api.modrinth.com/v2/search"
+    assert ResponseCache.key("GET", url, {"a": "1&b=2"}) != ResponseCache.key("GET", url, {"a": "1", "b": "2"})
+    assert ResponseCache.key("GET", url, {"b": 2, "a": 1}) == ResponseCache.key("GET", url, {"a": "1", "b": "2"})
+
+def test_client_closes_cache(tmp_path):
+    path = os.path.join(tmp_path, "cache.db")
+    cache = SQLiteCache(path)
+    cache.store("a", b"body", HEADERS)
+    stored, = cache._db.execute("SELECT accessed FROM responses WHERE key = 'a'").fetchone()
+    time.sleep(0.01)
+    cache.get("a")
+    asyncio.run(HttpAPI("http://127.0.0.1/", cache=cache).aclose())
+    assert cache.closed
+    with sqlite3.connect(path) as db:
+        accessed, = db.execute("SELECT accessed FROM responses WHERE key = 'a'").fetchone()
+    # The access time of the hit was only pending in memory
+    assert accessed > stored
@@ -0,0 +1,48 @@
+import asyncio
+from typing import Optional
+from src.service.dependencies import DependencyResolver
+
+def version(project_id: str, version_id: Optional[str] = None, *dependencies: dict) -> dict:
+    return {"id": version_id or f"{project_id}-latest", "project_id": project_id, "dependencies": list(dependencies)}
+
+def required(project_id: str, version_id: Optional[str] = None) -> dict:
+    return {"project_id": project_id, "version_id": version_id, "dependency_type": "required"}
+
+class FakeModrinth:
+    """Stand-in for the version lookups of ModrinthAPI used by the resolver"""
+    def __init__(self, *versions: dict) -> None:
+        self.by_id = {version["id"]: version for version in versions}
+        self.calls = {"versions": 0, "latest_version": 0}
+
+    async def versions(self, ids: list[str]) -> list[dict]:
+        self.calls["versions"] += 1
+        return [self.by_id[id] for id in ids if id in self.by_id]
+
+    async def latest_version(self, slug: str, loaders: list[str] = [], game_versions: list[str] = []) -> Optional[dict]:
+        self.calls["latest_version"] += 1
+        return self.by_id.get(f"{slug}-latest")
+
+def test_unpinned_dependency_on_resolved_project_keeps_its_edge():
+    # A pins P, then B requires P without a version in a later level
+    modrinth = FakeModrinth(
+        version("A", None, required("P", "P-1"), required("B")),
+        version("B", None, required("P")),
+        version("P", "P-1"),
+        version("P"))
+    graph = asyncio.run(DependencyResolver(modrinth).resolve(["A"]))
+
+    assert graph.edges == {"A": ["P", "B"], "P": [], "B": ["P"]}
+    assert graph.order.index("P") < graph.order.index("B") < graph.order.index("A")
+    assert graph.nodes["P"]["id"] == "P-1"
+    assert graph.missing == []
+    assert graph.conflicts == []
+    assert modrinth.calls["latest_version"] == 2
+
+def test_missing_and_cycles():
+    modrinth = FakeModrinth(
+        version("A", None, required("B"), required("X")),
+        version("B", None, required("A")))
+    graph = asyncio.run(DependencyResolver(modrinth).resolve(["A"]))
+
+    assert graph.missing == ["X"]
+    assert sorted(graph.cycles[0]) == ["A", "B"]
@@ -0,0 +1,108 @@
+import os
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Optional
+from aiohttp import web
+from src.library.api import HttpAPI, RetryPolicy, CircuitBreaker
+from src.library.api.download import RangedDownloader
+
+CONTENT = os.urandom(256 * 1024 + 123)
+HASHES = {"sha1": hashlib.sha1(CONTENT).hexdigest(), "sha512": hashlib.sha512(CONTENT).hexdigest()}
+
+class RangeServer:
+    """Stand-in file server answering range requests, with switches to misbehave"""
+    def __init__(self) -> None:
+        self.requests: list[tuple[str, Optional[str]]] = []
+        self.ranges = True
+        self.shift = 0
+        self.drop_once: set[int] = set()
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        self.requests.append((request.method, request.headers.get("Range")))
+        header = request.headers.get("Range")
+        if not self.ranges or header is None:
+            return web.Response(body=CONTENT, headers={"ETag": '"v1"'})
+        start, end = (int(value) for value in header.removeprefix("bytes=").split("-"))
+        body = CONTENT[start:end + 1]
+        response = web.StreamResponse(status=206, headers={
+            "ETag": '"v1"',
+            "Content-Range": f"bytes {start + self.shift}-{end + self.shift}/{len(CONTENT)}",
+            "Content-Length": str(len(body))})
+        await response.prepare(request)
+        if start in self.drop_once:
+            self.drop_once.discard(start)
+            await response.write(body[:len(body) // 2])
+            request.transport.close() # type: ignore
+            return response
+        await response.write(body)
+        return response
+
+def run(test: Callable[[RangeServer, RangedDownloader, str], Awaitable[Any]]) -> Any:
+    async def main() -> Any:
+        server = RangeServer()
+        app = web.Application()
+        app.router.add_route("*", "/file.jar", server.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = runner.addresses[0][:2]
+        api = HttpAPI(None, retry_policy=RetryPolicy(base_delay=0.01), circuit_breaker=CircuitBreaker())
+        downloader = RangedDownloader(api, segments=4, min_size=1024)
+        try:
+            return await test(server, downloader, f"http://{host}:{port}/file.jar")
+        finally:
+            await api.aclose()
+            await runner.cleanup()
+    return asyncio.run(main())
+
+def test_parallel_segments_without_head(tmp_path):
+    path = os.path.join(tmp_path, "file.jar")
+    async def test(server: RangeServer, downloader: RangedDownloader, url: str) -> None:
+        assert await downloader.download(url, path, expected=HASHES, size=len(CONTENT)) == HASHES
+        assert [method for method, _ in server.requests] == ["GET"] * 4
+    run(test)
+    with open(path, "rb") as file:
+        assert file.read() == CONTENT
+    assert os.listdir(tmp_path) == ["file.jar"]
+
+def test_small_or_unknown_size_sends_nothing(tmp_path):
+    path = os.path.join(tmp_path, "file.jar")
+    async def test(server: RangeServer, downloader: RangedDownloader, url: str) -> None:
+        assert await downloader.download(url, path, size=None) is None
+        assert await downloader.download(url, path, size=100) is None
+        assert server.requests == []
+    run(test)
+
+def test_dropped_segment_is_resumed(tmp_path):
+    path = os.path.join(tmp_path, "file.jar")
+    async def test(server: RangeServer, downloader: RangedDownloader, url: str) -> None:
+        step = -(-len(CONTENT) // 4)
+        server.drop_once = {step}
+        assert await downloader.download(url, path, expected=HASHES, size=len(CONTENT)) == HASHES
+        ranges = [header for _, header in server.requests]
+        # The retry asks only for the part of the segment that was not received
+        assert len(ranges) == 5
+        resumed = ranges[-1]
+        assert resumed is not None and int(resumed.removeprefix("bytes=").split("-")[0]) > step
+    run(test)
+    with open(path, "rb") as file:
+        assert file.read() == CONTENT
+
+def test_mismatched_content_range_is_rejected(tmp_path):
+    path = os.path.join(tmp_path, "file.jar")
+    async def test(server: RangeServer, downloader: RangedDownloader, url: str) -> None:
+        server.shift = 1
+        assert await downloader.download(url, path, size=len(CONTENT)) is None
+        # The probe failed, so the other segments were never requested
+        assert len(server.requests) == 1
+    run(test)
+    assert os.listdir(tmp_path) == []
+
+def test_server_without_ranges_falls_back(tmp_path):
+    path = os.path.join(tmp_path, "file.jar")
+    async def test(server: RangeServer, downloader: RangedDownloader, url: str) -> None:
+        server.ranges = False
+        assert await downloader.download(url, path, size=len(CONTENT)) is None
+    run(test)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,26 @@
+from dependency_injector import providers
+from src.library.dependency.core.container.injectable import Injectable, wire_injectables
+
+class RecordingContainer:
+    def __init__(self) -> None:
+        self.calls: list[list[type]] = []
+
+    def wire(self, modules: list[type]) -> None:
+        self.calls.append(modules)
+
+class First: ...
+class Second: ...
+
+def test_container_classes_are_generated_once_per_provider_type():
+    first = Injectable("first", First, First)
+    second = Injectable("second", Second, Second)
+    factory = Injectable("factory", Second, Second, providers.Factory)
+    assert type(first.container) is type(second.container)
+    assert type(factory.container) is not type(first.container)
+    assert first.container is not second.container
+
+def test_wiring_is_one_call_over_distinct_modules():
+    container = RecordingContainer()
+    injectables = [Injectable("first", First, First), Injectable("second", Second, Second), Injectable("again", First, First)]
+    wire_injectables(container, injectables) # type: ignore
+    assert container.calls == [[First, Second]]
@@ -0,0 +1,43 @@
+import sys
+import pytest
+from src.library.dependency.core.container import Container
+from src.library.dependency.core.loader import resolve_dependency
+
+DECLARATION = """
+from src.library.dependency.core import Component, component, module, Module
+
+class Service: ...
+
+@component(Service)
+class ServiceComponent(Component): ...
+
+@module(bootstrap=[ServiceComponent], providers={{ServiceComponent: "{name}_provider"}})
+class Main(Module): ...
+"""
+
+PROVIDER = """
+from src.library.dependency.core import provider
+from {name}_declaration import Service, ServiceComponent
+
+created = []
+
+@provider(ServiceComponent)
+class ServiceImpl(Service):
+    def __init__(self, config) -> None:
+        created.append(self)
+"""
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_bootstrap_provider_declared_by_path(tmp_path, monkeypatch, lazy):
+    # Components keep their provider once declared, so every run gets its own modules
+    name = f"bootstrap_{'lazy' if lazy else 'eager'}"
+    (tmp_path / f"{name}_declaration.py").write_text(DECLARATION.format(name=name))
+    (tmp_path / f"{name}_provider.py").write_text(PROVIDER.format(name=name))
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    declaration = __import__(f"{name}_declaration")
+    resolve_dependency(Container.empty(), declaration.Main, lazy=lazy)
+
+    created = sys.modules[f"{name}_provider"].created
+    assert len(created) == 1
+    assert declaration.ServiceComponent.provide() is created[0]
@@ -0,0 +1,53 @@
+import json
+from src.model.base import Lazy
+from src.model.modrinth import Project, Version
+
+VERSION = {
+    "id": "IZskON6d",
+    "project_id": "AANobbMI",
+    "name": "Sodium 0.5.8",
+    "version_number": "mc1.20.1-0.5.8",
+    "version_type": "release",
+    "status": "listed",
+    "featured": True,
+    "date_published": "2024-02-12T00:00:00.000000Z",
+    "downloads": 1000,
+    "changelog": "Fixes",
+    "loaders": ["fabric", "quilt"],
+    "game_versions": ["1.20.1"],
+    "dependencies": [{"project_id": "P7dR8mSH", "version_id": None, "file_name": None, "dependency_type": "required"}],
+    "files": [
+        {"url": "https://cdn.modrinth.com/a.jar", "filename": "a.jar", "primary": False, "size": 1, "hashes": {"sha1": "1", "sha512": "5"}},
+        {"url": "https://cdn.modrinth.com/b.jar", "filename": "b.jar", "primary": True, "size": 2, "hashes": {"sha1": "2", "sha512": "6"}},
+    ],
+}
+
+def test_from_dict_converts_every_field():
+    version = Version.from_dict(VERSION)
+    assert version.loaders == ("fabric", "quilt")
+    assert version.dependencies[0].project_id == "P7dR8mSH"
+    assert version.primary_file is not None and version.primary_file.filename == "b.jar"
+    assert version.primary_file.hashes == {"sha1": "2", "sha512": "6"}
+
+def test_lazy_view_matches_model():
+    body = json.dumps({"b.jar": VERSION})
+    lazy, = Version.loads(body, lazy=True)
+    assert isinstance(lazy, Lazy)
+    assert lazy.version_number == "mc1.20.1-0.5.8"
+    assert lazy.primary_file.filename == "b.jar"
+    assert lazy.materialize() == Version.loads(body)[0]
+
+def test_primary_file_without_files():
+    assert Version.from_dict({**VERSION, "files": []}).primary_file is None
+    assert Version.from_dict({**VERSION, "files": [{**VERSION["files"][0]}]}).primary_file.filename == "a.jar" # type: ignore
+
+def test_lazy_view_drops_unused_keys():
+    lazy, = Version.loads(json.dumps([VERSION]), lazy=True)
+    assert "changelog" not in lazy._data
+    assert lazy.primary_file.sha1 == "2"
+
+def test_lazy_project_keeps_aliased_keys():
+    hit = {"project_id": "AANobbMI", "slug": "sodium", "title": "Sodium", "project_type": "mod", "follows": 12, "date_modified": "2024-02-12"}
+    lazy, = Project.loads(json.dumps([hit]), lazy=True)
+    assert (lazy.id, lazy.followers, lazy.updated) == ("AANobbMI", 12, "2024-02-12")
+    assert lazy.materialize() == Project.from_dict(hit)
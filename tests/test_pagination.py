@@ -0,0 +1,88 @@
+import asyncio
+from contextlib import aclosing
+from typing import Any, Optional
+from src.library.api.pagination import OffsetPaginator, PagePaginator, paginate
+
+class FakeList:
+    """Stand-in list endpoint with offset pagination, logging the pages requested and those still running"""
+    def __init__(self, total: int, items: Optional[int] = None, delay: float = 0.01) -> None:
+        self.total = total
+        self.items = total if items is None else items
+        self.delay = delay
+        self.requested: list[int] = []
+        self.running: set[int] = set()
+        self.cancelled: list[int] = []
+
+    async def fetch(self, query: dict[str, Any]) -> dict[str, Any]:
+        offset, limit = query["offset"], query["limit"]
+        self.requested.append(offset)
+        self.running.add(offset)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(offset)
+            raise
+        finally:
+            self.running.discard(offset)
+        return {"hits": list(range(offset, min(offset + limit, self.items))), "total_hits": self.total}
+
+def collect(endpoint: FakeList, limit: int = 10, read_ahead: int = 1) -> list[int]:
+    async def main() -> list[int]:
+        return [item async for item in paginate(endpoint.fetch, OffsetPaginator(limit=limit), read_ahead=read_ahead)]
+    return asyncio.run(main())
+
+def test_every_item_in_order():
+    endpoint = FakeList(35)
+    assert collect(endpoint) == list(range(35))
+    assert endpoint.requested == [0, 10, 20, 30]
+
+def test_next_pages_are_fetched_while_consuming():
+    async def main() -> None:
+        endpoint = FakeList(50)
+        async with aclosing(paginate(endpoint.fetch, OffsetPaginator(limit=10), read_ahead=2)) as items:
+            assert await items.__anext__() == 0
+            await asyncio.sleep(0)
+            # The first page is being consumed, the next two are already requested
+            assert endpoint.requested == [0, 10, 20]
+            assert endpoint.running == {10, 20}
+    asyncio.run(main())
+
+def test_read_ahead_zero_fetches_on_demand():
+    async def main() -> None:
+        endpoint = FakeList(50)
+        async with aclosing(paginate(endpoint.fetch, OffsetPaginator(limit=10), read_ahead=0)) as items:
+            assert await items.__anext__() == 0
+            await asyncio.sleep(0)
+            assert endpoint.requested == [0]
+    asyncio.run(main())
+
+def test_empty_page_ends_the_list():
+    # The totals announce 100 items, but the list stops after 20
+    endpoint = FakeList(100, items=20)
+    assert collect(endpoint, read_ahead=0) == list(range(20))
+    assert endpoint.requested == [0, 10, 20]
+
+def test_short_page_ends_the_list():
+    endpoint = FakeList(100, items=15)
+    assert collect(endpoint, read_ahead=0) == list(range(15))
+    assert endpoint.requested == [0, 10]
+
+def test_closing_early_cancels_prefetch():
+    async def main() -> None:
+        endpoint = FakeList(100, delay=0.05)
+        async with aclosing(paginate(endpoint.fetch, OffsetPaginator(limit=10), read_ahead=3)) as items:
+            async for item in items:
+                # Let the requests of the next pages start
+                await asyncio.sleep(0.01)
+                break
+        assert endpoint.cancelled == [10, 20, 30]
+        assert endpoint.running == set()
+    asyncio.run(main())
+
+def test_page_paginator_follows_total_pages():
+    async def main() -> list[int]:
+        async def fetch(query: dict[str, Any]) -> dict[str, Any]:
+            page, per_page = query["page"], query["per_page"]
+            return {"data": list(range((page - 1) * per_page, min(page * per_page, 25))), "meta": {"pagination": {"total_pages": 3}}}
+        return [item async for item in paginate(fetch, PagePaginator(per_page=10))]
+    assert asyncio.run(main()) == list(range(25))
@@ -0,0 +1,67 @@
+import json
+import time
+import logging
+import pytest
+from src.library.profiler import StartupBudgetExceeded, StartupProfiler, span
+
+def profile() -> StartupProfiler:
+    profiler = StartupProfiler(imports=False).start()
+    with span("dependencies", "app"):
+        with span("layer 0", "resolve"):
+            time.sleep(0.01)
+        with span("Provider;A", "init"):
+            time.sleep(0.02)
+    profiler.stop()
+    return profiler
+
+def test_json_output():
+    profiler = profile()
+    output = json.loads(json.dumps(profiler.to_json()))
+    assert output["elapsed"] == pytest.approx(profiler.elapsed)
+    names = [(item["name"], item["category"], item["parent"]) for item in output["spans"]]
+    assert names == [("dependencies", "app", None), ("layer 0", "resolve", 0), ("Provider;A", "init", 0)]
+    root, layer, provider = output["spans"]
+    assert root["duration"] >= layer["duration"] + provider["duration"]
+    assert 0 <= root["start"] <= layer["start"] <= provider["start"]
+    assert profiler.totals("init") == {"Provider;A": provider["duration"]}
+
+def test_folded_output():
+    profiler = profile()
+    lines = profiler.to_folded().splitlines()
+    stacks = [line.rsplit(" ", 1)[0] for line in lines]
+    # Frames are separated by ";", so names cannot hold one, and spaces end the stack
+    assert stacks == ["app:dependencies", "app:dependencies;resolve:layer_0", "app:dependencies;init:Provider:A"]
+    root, layer, provider = (int(line.rsplit(" ", 1)[1]) for line in lines)
+    # Self times in microseconds, children excluded from their parent
+    assert layer >= 10000 and provider >= 20000
+    assert root == pytest.approx(round((profiler.spans[0].duration - profiler.spans[1].duration - profiler.spans[2].duration) * 1e6), abs=1)
+
+def test_write(tmp_path):
+    profiler = profile()
+    path = str(tmp_path / "startup")
+    profiler.write(path)
+    with open(f"{path}.json") as file:
+        assert json.load(file)["spans"][0]["name"] == "dependencies"
+    with open(f"{path}.folded") as file:
+        assert file.read() == profiler.to_folded()
+
+def test_budget_check():
+    profiler = profile()
+    profiler.check(profiler.elapsed + 1)
+    with pytest.raises(StartupBudgetExceeded) as error:
+        profiler.check(0.001)
+    assert error.value.budget == 0.001
+    assert error.value.elapsed == profiler.elapsed
+
+def test_span_without_profiler_is_noop():
+    with span("anything", "app") as item:
+        assert item is None
+
+def test_application_reports_profiler_total(caplog):
+    from src.app import MainApplication
+    profiler = StartupProfiler(imports=False).start()
+    profiler.started -= 2
+    with caplog.at_level(logging.INFO, logger="MainApplication"):
+        MainApplication(profiler=profiler).report(profiler)
+    message, = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Application started")]
+    assert message.startswith(f"Application started in {profiler.elapsed:.3f} seconds")
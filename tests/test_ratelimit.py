@@ -0,0 +1,37 @@
+import asyncio
+from src.library.api.ratelimit import RateLimiter
+
+def test_bucket_is_usable_from_successive_event_loops():
+    limiter = RateLimiter(per_minute=6000)
+
+    async def burst() -> None:
+        # Callers queue behind the first one while it waits for the block to expire
+        limiter.bucket("example.com").block(0.01)
+        await asyncio.gather(*(limiter.acquire("example.com") for _ in range(5)))
+
+    asyncio.run(burst())
+    asyncio.run(burst())
+    assert limiter.metrics()["example.com"]["requests"] == 10
+
+def test_hosts_without_budget_are_not_throttled():
+    limiter = RateLimiter({"api.modrinth.com": 1})
+
+    async def burst(host: str) -> None:
+        await asyncio.wait_for(asyncio.gather(*(limiter.acquire(host) for _ in range(50))), 1)
+
+    asyncio.run(burst("127.0.0.1"))
+    assert limiter.metrics()["127.0.0.1"]["throttled"] == 0
+    assert limiter.bucket("api.modrinth.com").capacity == 1
+
+def test_setdefault_keeps_configured_budget():
+    limiter = RateLimiter({"api.modrinth.com": 60})
+    limiter.setdefault("api.modrinth.com", 300)
+    limiter.setdefault("cdn.modrinth.com", 300)
+    assert limiter.bucket("api.modrinth.com").capacity == 60
+    assert limiter.bucket("cdn.modrinth.com").capacity == 300
+
+def test_reported_limit_throttles_unconfigured_host():
+    limiter = RateLimiter()
+    limiter.update("example.com", 200, {"X-Ratelimit-Limit": "60", "X-Ratelimit-Remaining": "0", "X-Ratelimit-Reset": "30"})
+    assert limiter.bucket("example.com").blocked_until > 0
+    assert limiter.bucket("example.com").rate == 1
@@ -0,0 +1,40 @@
+import abc
+import pytest
+from src.library.dependency.core.declaration.component import ABCComponent
+from src.library.dependency.core.declaration.provider import Provider
+from src.library.dependency.core.exceptions import UnresolvedDependencyError
+from src.library.dependency.core.resolver import resolve_dependency_layers
+
+def make_provider(provided_cls: type, *imports: type) -> Provider:
+    return Provider([ABCComponent(cls) for cls in imports], [], provided_cls, None) # type: ignore
+
+class Config: ...
+class Database: ...
+class Cache: ...
+class Api: ...
+
+def test_layers_keep_order_inside_each_layer():
+    api = make_provider(type("ApiImpl", (Api,), {}), Database, Cache)
+    cache = make_provider(type("CacheImpl", (Cache,), {}), Config)
+    database = make_provider(type("DatabaseImpl", (Database,), {}), Config)
+    config = make_provider(type("ConfigImpl", (Config,), {}))
+    assert resolve_dependency_layers([api, cache, database, config]) == [[config], [cache, database], [api]]
+
+def test_virtual_subclasses_and_duplicates():
+    class Interface(abc.ABC): ...
+    class Implementation: ...
+    Interface.register(Implementation)
+    implementation = make_provider(Implementation)
+    dependent = make_provider(type("Dependent", (), {}), Interface)
+    assert resolve_dependency_layers([dependent, implementation, implementation]) == [[implementation, implementation], [dependent]]
+
+def test_missing_component_and_cycle_are_reported():
+    class First: ...
+    class Second: ...
+    first = make_provider(First, Second)
+    second = make_provider(Second, First)
+    missing = make_provider(type("Orphan", (), {}), Api)
+    with pytest.raises(UnresolvedDependencyError) as error:
+        resolve_dependency_layers([first, second, missing, make_provider(type("ConfigImpl", (Config,), {}))])
+    assert error.value.missing == {"Orphan": ["Api"]}
+    assert [sorted(set(cycle)) for cycle in error.value.cycles] == [["First", "Second"]]
@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+from aiohttp import ClientConnectionError, ClientPayloadError, ClientResponseError
+from src.library.api.retry import RetryBudget, RetryPolicy
+from src.library.api.utils import http_exception
+
+def status_error(status: int) -> ClientResponseError:
+    return ClientResponseError(None, (), status=status) # type: ignore
+
+def translated(error: Exception) -> Exception:
+    try:
+        raise http_exception(error) from error
+    except Exception as e:
+        return e
+
+@pytest.mark.parametrize("error, transient", [
+    (ClientConnectionError(), True),
+    (ClientPayloadError(), True),
+    (asyncio.TimeoutError(), True),
+    (status_error(408), True),
+    (status_error(503), True),
+    (status_error(404), False),
+    (status_error(429), False),
+    (ValueError(), False),
+    (translated(status_error(502)), True),
+    (translated(status_error(404)), False),
+    (translated(ClientConnectionError()), True),
+])
+def test_transient_classification(error, transient):
+    assert RetryPolicy.transient(error) is transient
+
+class Flaky:
+    """Request failing with error a number of times before succeeding"""
+    def __init__(self, error: Exception, failures: int) -> None:
+        self.error = error
+        self.failures = failures
+        self.attempts = 0
+
+    async def __call__(self) -> str:
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise self.error
+        return "ok"
+
+def fast_policy(**kwargs) -> RetryPolicy:
+    return RetryPolicy(base_delay=0.001, max_delay=0.001, **kwargs)
+
+def test_idempotent_requests_are_retried():
+    policy = fast_policy(attempts=3)
+    request = Flaky(ClientConnectionError(), 2)
+    assert asyncio.run(policy.call("host", "GET", request)) == "ok"
+    assert request.attempts == 3
+    assert policy.retries == {"host": 2}
+
+def test_permanent_errors_are_not_retried():
+    policy = fast_policy()
+    request = Flaky(status_error(404), 1)
+    with pytest.raises(ClientResponseError):
+        asyncio.run(policy.call("host", "GET", request))
+    assert request.attempts == 1
+    assert policy.stats["permanent"] == 1
+
+def test_non_idempotent_requests_are_retried_only_when_safe():
+    policy = fast_policy()
+    request = Flaky(ClientConnectionError(), 1)
+    with pytest.raises(ClientConnectionError):
+        asyncio.run(policy.call("host", "POST", request))
+    assert request.attempts == 1
+
+    request = Flaky(ClientConnectionError(), 1)
+    assert asyncio.run(policy.call("host", "POST", request, retry=True)) == "ok"
+    assert request.attempts == 2
+
+    request = Flaky(ClientConnectionError(), 1)
+    with pytest.raises(ClientConnectionError):
+        asyncio.run(policy.call("host", "GET", request, retry=False))
+    assert request.attempts == 1
+
+def test_retries_stop_at_the_deadline():
+    policy = RetryPolicy(attempts=10, deadline=0.05)
+    # Waiting 0.1 seconds before the next attempt would end after the deadline
+    policy.delay = lambda attempt: 0.1 # type: ignore
+    request = Flaky(ClientConnectionError(), 5)
+    with pytest.raises(ClientConnectionError):
+        asyncio.run(policy.call("host", "GET", request))
+    assert request.attempts == 1
+    assert policy.stats["exhausted"] == 1
+
+def test_budget_follows_recent_requests():
+    budget = RetryBudget(ratio=0.5, minimum=1, window=10)
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    for _ in range(4):
+        budget.deposit()
+    assert budget.capacity() == 3
+    assert budget.withdraw() and budget.withdraw()
+    assert not budget.withdraw()
+
+def test_budget_window_expires():
+    budget = RetryBudget(ratio=0, minimum=1, window=0.02)
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    asyncio.run(asyncio.sleep(0.03))
+    assert budget.withdraw()
+
+def test_exhausted_budget_stops_retries():
+    # Only 2 retries for 10 requests to a failing host
+    policy = fast_policy(attempts=3, budget_ratio=0.2, budget_min=0)
+    requests = [Flaky(ClientConnectionError(), 10) for _ in range(10)]
+    async def main() -> None:
+        for request in requests:
+            with pytest.raises(ClientConnectionError):
+                await policy.call("host", "GET", request)
+    asyncio.run(main())
+    assert sum(request.attempts for request in requests) == 12
+    assert policy.retries == {"host": 2}
@@ -0,0 +1,82 @@
+import json
+import asyncio
+from aiohttp import web
+from src.library.api import HttpAPI, METHOD, RateLimiter
+from src.library.api.client.modrinth import ModrinthAPI
+from src.library.api.singleflight import SingleFlight
+from src.model.base import Lazy
+from src.model.modrinth import Version
+from tests.test_models import VERSION
+
+async def start_server(calls: list[str]) -> tuple[web.AppRunner, str]:
+    async def versions(request: web.Request) -> web.Response:
+        calls.append(request.path)
+        await asyncio.sleep(0.05)
+        return web.Response(body=json.dumps([VERSION]), content_type="application/json")
+    app = web.Application()
+    app.router.add_get("/versions", versions)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}/"
+
+def test_requests_with_other_decoders_are_not_shared():
+    async def main() -> None:
+        calls: list[str] = []
+        runner, base_url = await start_server(calls)
+        async with HttpAPI(base_url, rate_limiter=RateLimiter()) as api:
+            full, lazy, same = await asyncio.gather(
+                api._request(METHOD.GET, "versions", response=ModrinthAPI.versionsResponse),
+                api._request(METHOD.GET, "versions", response=ModrinthAPI.lazyVersionsResponse),
+                api._request(METHOD.GET, "versions", response=ModrinthAPI.versionsResponse))
+        await runner.cleanup()
+        assert isinstance(full.value()[0], Version)
+        assert isinstance(lazy.value()[0], Lazy)
+        assert same.value() == full.value()
+        assert len(calls) == 2
+    asyncio.run(main())
+
+def test_concurrent_calls_share_one_execution():
+    async def main() -> None:
+        flight = SingleFlight()
+        calls = 0
+        async def fetch() -> int:
+            nonlocal calls
+            calls += 1
+            call = calls
+            await asyncio.sleep(0.01)
+            return call
+        results = await asyncio.gather(*[flight.do(("GET", "a"), fetch) for _ in range(5)], flight.do(("GET", "b"), fetch))
+        assert results == [1, 1, 1, 1, 1, 2]
+        assert flight.metrics() == {"calls": 2, "shared": 4}
+        # Once done, the key runs again
+        assert await flight.do(("GET", "a"), fetch) == 3
+    asyncio.run(main())
+
+def test_exception_reaches_every_waiter():
+    async def main() -> None:
+        flight = SingleFlight()
+        async def fail() -> None:
+            await asyncio.sleep(0.01)
+            raise ValueError("down")
+        results = await asyncio.gather(*[flight.do("key", fail) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert results[0] is results[1] is results[2]
+    asyncio.run(main())
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    async def main() -> None:
+        flight = SingleFlight()
+        async def fetch() -> str:
+            await asyncio.sleep(0.05)
+            return "body"
+        leader = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await follower == "body"
+        assert leader.cancelled()
+        assert flight.metrics() == {"calls": 1, "shared": 1}
+    asyncio.run(main())
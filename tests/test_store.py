@@ -0,0 +1,45 @@
+import os
+import stat
+import pytest
+from src.library.api.exceptions import HTTPException
+from src.library.store import ArtifactStore, IntegrityError
+from src.library.utils.hashing import HASH_ALGORITHMS, hash_file
+
+def stage(store: ArtifactStore, content: bytes) -> str:
+    path = os.path.join(store.staging, "artifact")
+    with open(path, "wb") as file:
+        file.write(content)
+    return path
+
+def test_checkout_is_an_independent_copy(tmp_path):
+    store = ArtifactStore(os.path.join(tmp_path, "store"))
+    sha512 = store.put(stage(store, b"original"))
+    target = os.path.join(tmp_path, "mods", "mod.jar")
+    store.checkout(sha512, target)
+    with open(target, "ab") as file:
+        file.write(b" changed")
+
+    assert hash_file(store.blob(sha512), HASH_ALGORITHMS)["sha512"] == sha512
+    assert store.lookup(sha512) == sha512
+    store.close()
+
+def test_linked_checkout_is_read_only(tmp_path):
+    store = ArtifactStore(os.path.join(tmp_path, "store"), link=True)
+    sha512 = store.put(stage(store, b"original"))
+    target = store.checkout(sha512, os.path.join(tmp_path, "mod.jar"))
+    assert os.stat(target).st_ino == os.stat(store.blob(sha512)).st_ino
+    assert not os.stat(target).st_mode & stat.S_IWUSR
+
+    # A blob altered through its hard link is not handed out again
+    os.chmod(target, 0o644)
+    assert store.lookup(sha512) is None
+    assert not os.path.exists(store.blob(sha512))
+    store.close()
+
+def test_integrity_error_is_an_http_exception(tmp_path):
+    store = ArtifactStore(os.path.join(tmp_path, "store"))
+    with pytest.raises(IntegrityError) as error:
+        store.put(stage(store, b"original"), expected={"sha1": "0" * 40})
+    assert isinstance(error.value, HTTPException)
+    assert error.value.status_code == 502
+    store.close()
@@ -0,0 +1,121 @@
+import json
+import asyncio
+import pytest
+from contextlib import aclosing
+from aiohttp import web, ClientConnectionError
+from src.library.api import HttpAPI, METHOD, ConnectionPool, CircuitBreaker, RateLimiter
+from src.library.api.breaker import CircuitState
+from src.library.api.exceptions import HTTPException
+from src.library.api.handler import JsonArrayParser
+
+ITEMS = [
+    {"id": "a", "name": "quote \" and backslash \\ in [brackets] {braces}, commas"},
+    {"id": "b", "nested": [[1, 2], {"deep": [{"x": "]"}]}], "empty": [], "object": {}},
+    "plain, string",
+    12.5,
+    None,
+    [{"id": "c"}, "é☃"],
+]
+BODY = json.dumps(ITEMS, ensure_ascii=False).encode()
+
+def parse(chunks: list[bytes]) -> list:
+    parser = JsonArrayParser()
+    items = [json.loads(item) for chunk in chunks for item in parser.feed(chunk)]
+    parser.close()
+    return items
+
+def test_parser_whole_body():
+    assert parse([BODY]) == ITEMS
+    assert parse([b" [ ] "]) == []
+
+def test_parser_every_chunk_boundary():
+    # Every split point falls once inside a string, an escape sequence, a nested array or object, or a multi-byte character
+    for split in range(1, len(BODY)):
+        assert parse([BODY[:split], BODY[split:]]) == ITEMS, split
+
+def test_parser_byte_by_byte():
+    assert parse([BODY[index:index + 1] for index in range(len(BODY))]) == ITEMS
+
+@pytest.mark.parametrize("body", [b'{"id": "a"}', b'"[1, 2]"', b'x[1]', b'42'])
+def test_parser_rejects_non_array(body):
+    with pytest.raises(ValueError):
+        parse([body])
+
+@pytest.mark.parametrize("body", [b'[{"id": "a"}, {"id": ', b'[1, 2', b'["unterminated]'])
+def test_parser_rejects_truncated_body(body):
+    with pytest.raises(ValueError):
+        parse([body])
+
+class StreamServer:
+    """Stand-in list endpoint sending a long array slowly, or a truncated one"""
+    def __init__(self) -> None:
+        self.disconnected = asyncio.Event()
+
+    async def slow(self, request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        await response.prepare(request)
+        try:
+            await response.write(b"[")
+            for index in range(1000):
+                await response.write(json.dumps({"id": index}).encode() + b",")
+                await asyncio.sleep(0.01)
+            await response.write(b"{}]")
+        except (ConnectionResetError, ClientConnectionError):
+            self.disconnected.set()
+        return response
+
+    async def truncated(self, request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "application/json", "Content-Length": "1000"})
+        await response.prepare(request)
+        await response.write(b'[{"id": 1}, {"id": ')
+        request.transport.close() # type: ignore
+        return response
+
+    async def item(self, request: web.Request) -> web.Response:
+        return web.json_response({"ok": True})
+
+async def start_server(server: StreamServer) -> tuple[web.AppRunner, str]:
+    app = web.Application()
+    app.router.add_get("/slow", server.slow)
+    app.router.add_get("/truncated", server.truncated)
+    app.router.add_get("/item", server.item)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}/"
+
+def test_closing_stream_early_releases_connection():
+    async def main() -> None:
+        server = StreamServer()
+        runner, base_url = await start_server(server)
+        breaker = CircuitBreaker()
+        async with HttpAPI(base_url, pool=ConnectionPool(limit_per_host=1), rate_limiter=RateLimiter(), circuit_breaker=breaker) as api:
+            async with aclosing(api._stream(METHOD.GET, "slow")) as items:
+                async for item in items:
+                    assert item == {"id": 0}
+                    break
+            # With a single connection per host, this request waits forever if the stream kept its connection
+            handler = await asyncio.wait_for(api._request(METHOD.GET, "item"), 5)
+            assert handler.json() == {"ok": True}
+            await asyncio.wait_for(server.disconnected.wait(), 5)
+        await runner.cleanup()
+    asyncio.run(main())
+
+def test_failed_body_is_recorded_once():
+    async def main() -> None:
+        server = StreamServer()
+        runner, base_url = await start_server(server)
+        breaker = CircuitBreaker(threshold=2, probe_interval=0)
+        host = base_url.split("/")[2].split(":")[0]
+        for _ in range(2):
+            breaker.record(host, ClientConnectionError())
+        async with HttpAPI(base_url, rate_limiter=RateLimiter(), circuit_breaker=breaker) as api:
+            # The probe gets an answer but its body fails: a single failure of the probe opens the circuit again,
+            # where a success followed by a failure would leave it closed
+            with pytest.raises(HTTPException):
+                async for _ in api._stream(METHOD.GET, "truncated"):
+                    pass
+        await runner.cleanup()
+        assert breaker.state(host) is CircuitState.OPEN
+    asyncio.run(main())
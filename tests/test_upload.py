@@ -0,0 +1,53 @@
+import os
+import asyncio
+from aiohttp import web
+from src.library.api import HttpAPI, METHOD, RateLimiter
+from src.library.api.handler import StreamRequest, UploadStream
+
+CONTENT = os.urandom(10 * 1024 + 17)
+
+def test_file_chunks_do_not_block_the_loop(tmp_path):
+    path = os.path.join(tmp_path, "mod.jar")
+    with open(path, mode="wb") as file:
+        file.write(CONTENT)
+
+    async def main() -> tuple[bytes, int]:
+        ticks = 0
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+        task = asyncio.create_task(ticker())
+        stream = UploadStream(path, chunk_size=1024)
+        chunks = [chunk async for chunk in stream]
+        task.cancel()
+        assert stream.sent == len(CONTENT) and stream.rate > 0
+        return b"".join(chunks), ticks
+    body, ticks = asyncio.run(main())
+    assert body == CONTENT
+    # Other tasks ran while the file was read
+    assert ticks > 1
+
+def test_stream_request_sends_file_as_multipart(tmp_path):
+    path = os.path.join(tmp_path, "mod.jar")
+    with open(path, mode="wb") as file:
+        file.write(CONTENT)
+
+    async def main() -> dict:
+        received: dict = {}
+        async def upload(request: web.Request) -> web.Response:
+            field = (await request.post())["files"]
+            received.update(name=field.filename, body=field.file.read()) # type: ignore
+            return web.json_response({})
+        app = web.Application()
+        app.router.add_post("/upload", upload)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        host, port = runner.addresses[0][:2]
+        async with HttpAPI(f"http://{host}:{port}/", rate_limiter=RateLimiter()) as api:
+            await api._request(METHOD.POST, "upload", body=UploadStream(path), request=StreamRequest(field="files"))
+        await runner.cleanup()
+        return received
+    assert asyncio.run(main()) == {"name": "mod.jar", "body": CONTENT}